@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Benchmarks of spice.lib hot paths.
+
+Benchmarks live in BENCH_MODULES, asv style: every time_<name>() function
+is a benchmark, an optional module setup() is called once before them. setup()
+raises Skip if the module cannot run on this host, e.g. a missing library.
+
+Every benchmark is run in a loop long enough to last MIN_TIME; the best of
+REPEAT loops is the result, in seconds per call. Results can be saved as
+a named baseline to BASELINE_DIR and later compared against it:
+
+    $ python -m spice.bench --save before
+    $ python -m spice.bench --compare before
+
+Baseline "reference" is kept in the tree. Its numbers are from one host, so
+compare the ratios of a change rather than absolute times. bench_dispatch and
+bench_parse import only the measured modules, they run without virttest.
+
+"""
+
+import os
+import re
+import json
+import time
+import socket
+import logging
+import importlib
+
+logger = logging.getLogger(__name__)
+
+BENCH_MODULES = ("spice.bench.bench_dispatch",
+                 "spice.bench.bench_parse",
+                 "spice.bench.bench_media",
+                 "spice.bench.bench_clipboard")
+"""Modules with benchmarks."""
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "baselines")
+"""Directory with saved results, <name>.json."""
+REPEAT = 5
+"""Number of timed loops, the best one counts."""
+MIN_TIME = 0.2
+"""Minimal duration of one loop in seconds."""
+THRESHOLD = 0.10
+"""Relative change reported as a regression or an improvement."""
+
+
+class Skip(Exception):
+    """Benchmarks of a module cannot run on this host."""
+
+
+def discover(pattern=None):
+    """Import benchmark modules and call their setup().
+
+    Parameters
+    ----------
+    pattern : str
+        Regex; only benchmarks with matching name are returned.
+
+    Returns
+    -------
+    list
+        (name, function or None, skip reason or None) in module order.
+    """
+    found = []
+    for mod_name in BENCH_MODULES:
+        short = mod_name.rpartition('.')[2]
+        try:
+            module = importlib.import_module(mod_name)
+            names = sorted(name for name in dir(module)
+                           if name.startswith("time_"))
+            names = ["%s.%s" % (short, name[5:]) for name in names]
+            if pattern:
+                names = [name for name in names if re.search(pattern, name)]
+            if names and hasattr(module, "setup"):
+                module.setup()
+        except (Skip, ImportError) as excp:
+            found.append(("%s.*" % short, None, str(excp)))
+            continue
+        for name in names:
+            func = getattr(module, "time_" + name.partition('.')[2])
+            found.append((name, func, None))
+    return found
+
+
+def measure(func, repeat=REPEAT, min_time=MIN_TIME):
+    """Return the best time of one call of func in seconds."""
+    number = 1
+    while True:
+        start = time.time()
+        for _ in range(number):
+            func()
+        elapsed = time.time() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.time()
+        for _ in range(number):
+            func()
+        best = min(best, time.time() - start)
+    return best / number
+
+
+def run(pattern=None, repeat=REPEAT, min_time=MIN_TIME):
+    """Run benchmarks.
+
+    Returns
+    -------
+    dict
+        Benchmark name -> seconds per call, None for skipped ones.
+    """
+    results = {}
+    for name, func, reason in discover(pattern):
+        if func is None:
+            logger.info("%s: skipped, %s", name, reason)
+            results[name] = None
+            continue
+        results[name] = measure(func, repeat, min_time)
+        logger.info("%s: %s", name, _fmt(results[name]))
+    return results
+
+
+def _path(name):
+    return os.path.join(BASELINE_DIR, "%s.json" % name)
+
+
+def save(results, name):
+    """Save results as baseline `name`."""
+    if not os.path.isdir(BASELINE_DIR):
+        os.makedirs(BASELINE_DIR)
+    with open(_path(name), 'w') as fd:
+        json.dump({"host": socket.gethostname(), "time": time.time(),
+                   "results": results}, fd, indent=4, sort_keys=True)
+    return _path(name)
+
+
+def load(name):
+    """Return results of baseline `name`."""
+    with open(_path(name)) as fd:
+        return json.load(fd)["results"]
+
+
+def _fmt(seconds):
+    if seconds is None:
+        return "-"
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return "%.2f %s" % (seconds / scale, unit)
+    return "%.0f ns" % (seconds / 1e-9)
+
+
+def compare(baseline, results, threshold=THRESHOLD):
+    """Compare results with baseline.
+
+    Returns
+    -------
+    tuple
+        (lines of report, number of regressions)
+    """
+    names = sorted(set(baseline) | set(results))
+    width = max([len(name) for name in names] + [9])
+    lines = ["%-*s %12s %12s %7s" % (width, "benchmark", "baseline",
+                                     "current", "ratio")]
+    regressions = 0
+    for name in names:
+        old, new = baseline.get(name), results.get(name)
+        mark = ratio = ""
+        if old and new:
+            ratio = "%6.2fx" % (new / old)
+            if new > old * (1 + threshold):
+                mark = "  slower"
+                regressions += 1
+            elif new < old * (1 - threshold):
+                mark = "  faster"
+        lines.append("%-*s %12s %12s %7s%s" % (width, name, _fmt(old),
+                                               _fmt(new), ratio, mark))
+    return lines, regressions
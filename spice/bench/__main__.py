@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Run benchmarks: python -m spice.bench --help"""
+
+import sys
+import logging
+import argparse
+
+from spice import bench
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m spice.bench",
+                                     description=__doc__)
+    parser.add_argument("-k", dest="pattern",
+                        help="run benchmarks matching regex")
+    parser.add_argument("--save", metavar="NAME",
+                        help="save results as baseline NAME")
+    parser.add_argument("--compare", metavar="NAME",
+                        help="compare with baseline NAME, exit with 1 if "
+                        "something is slower")
+    parser.add_argument("--repeat", type=int, default=bench.REPEAT)
+    parser.add_argument("--min-time", type=float, default=bench.MIN_TIME)
+    parser.add_argument("--threshold", type=float, default=bench.THRESHOLD)
+    args = parser.parse_args(argv)
+    # Benchmarked code logs a lot, keep only the report.
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    bench.logger.setLevel(logging.INFO)
+    results = bench.run(args.pattern, args.repeat, args.min_time)
+    if args.save:
+        bench.logger.info("Saved: %s", bench.save(results, args.save))
+    if args.compare:
+        lines, regressions = bench.compare(bench.load(args.compare), results,
+                                           args.threshold)
+        bench.logger.info("\n".join(lines))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
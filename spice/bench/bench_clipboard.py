@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Payload generation of helper_cb. Needs pygtk and numpy."""
+
+import os
+
+from spice.bench import bench_media
+
+helper_cb = None
+
+
+def setup():
+    global helper_cb  # pylint: disable=W0603
+    helper_cb = bench_media.load("helper_cb",
+                                 os.path.join("deps", "helper_cb.py"))
+
+
+def time_genimg_512():
+    return helper_cb.genimg((512, 512), 1)
+
+
+def time_genimg_2048():
+    return helper_cb.genimg((2048, 2048), 1)
+
+
+def time_img_size():
+    return helper_cb.img_size("1920x1080")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Action dispatch and config access."""
+
+from spice import bench
+
+try:
+    from spice.lib import act
+    from spice.lib import stest
+except ImportError as excp:
+    raise bench.Skip("spice.lib cannot be imported: %s" % excp)
+
+CFG = None
+VMI = None
+
+
+class _VmInfo(object):
+    """Enough of stest.VmInfo for act2.Action."""
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.vm_name = "bench"
+        self.test = None
+
+
+def setup():
+    global CFG, VMI  # pylint: disable=W0603
+    CFG = stest.AttributeDict(
+        ("key_%d" % idx, str(idx)) for idx in range(300))
+    CFG.update(interface_os="rhel", interface_os_version="7",
+               interface_os_mversion="6", interface_os_arch="64bits",
+               interface_ovirt_version="", vms="client guest",
+               spice_secure_channels="main inputs cursor",
+               login_timeout="360", rv_debug="yes")
+    VMI = _VmInfo(CFG)
+    act.info(VMI, "warm up")  # Import action modules once.
+
+
+def time_dispatch():
+    act.info(VMI, "bench")
+
+
+def time_cfg_attr():
+    return CFG.login_timeout
+
+
+def time_cfg_missing():
+    return CFG.no_such_key
+
+
+def time_cfg_as_int():
+    return CFG.as_int("login_timeout")
+
+
+def time_cfg_as_bool():
+    return CFG.as_bool("rv_debug")
+
+
+def time_cfg_as_list():
+    return CFG.as_list("spice_secure_channels")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Audio verification of rv_audio."""
+
+import os
+import imp
+import math
+import wave
+import atexit
+import struct
+import shutil
+import tempfile
+
+from spice import bench
+
+SPICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RATE = 44100
+"""Sample rate of synthetic WAVs."""
+SECONDS = 2
+"""Length of synthetic WAVs."""
+
+rv_audio = None
+WAV_SINE = None
+WAV_PAUSES = None
+CFG = None
+
+
+def load(name, path):
+    """Import a script that is not in a package, path is relative to spice/.
+    """
+    try:
+        return imp.load_source(name, os.path.join(SPICE_DIR, path))
+    except ImportError as excp:
+        raise bench.Skip("%s cannot be imported: %s" % (path, excp))
+
+
+def _write_wav(path, silent_every=0):
+    """16 bit mono 800 Hz sine; every silent_every-th 1/10 s is silent."""
+    frames = []
+    chunk = RATE // 10
+    for idx in range(RATE * SECONDS):
+        if silent_every and (idx // chunk) % silent_every == 0:
+            frames.append(0)
+        else:
+            frames.append(int(16000 * math.sin(2 * math.pi * 800 * idx /
+                                               RATE)) & 0xffff)
+    wav = wave.open(path, 'w')
+    wav.setparams((1, 2, RATE, len(frames), 'NONE', 'not compressed'))
+    wav.writeframes(struct.pack("<%dH" % len(frames), *frames))
+    wav.close()
+
+
+def setup():
+    global rv_audio, WAV_SINE, WAV_PAUSES, CFG  # pylint: disable=W0603
+    rv_audio = load("rv_audio", os.path.join("tests", "rv_audio.py"))
+    from spice.lib import stest
+    CFG = stest.AttributeDict(disable_audio="no")
+    tmpdir = tempfile.mkdtemp(prefix="spice-bench-")
+    atexit.register(shutil.rmtree, tmpdir, True)
+    WAV_SINE = os.path.join(tmpdir, "sine.wav")
+    WAV_PAUSES = os.path.join(tmpdir, "pauses.wav")
+    _write_wav(WAV_SINE)
+    _write_wav(WAV_PAUSES, silent_every=3)
+
+
+def time_verify_recording_sine():
+    return rv_audio.verify_recording(WAV_SINE, CFG)
+
+
+def time_verify_recording_pauses():
+    return rv_audio.verify_recording(WAV_PAUSES, CFG)
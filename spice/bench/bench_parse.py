@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Command building and parsing of command output."""
+
+from spice import bench
+
+try:
+    from spice.lib import utils
+    from spice.lib import parsers
+except ImportError as excp:
+    raise bench.Skip("spice.lib cannot be imported: %s" % excp)
+
+SS_LINE = ("ESTAB      0      0      10.0.0.2:%d    10.0.0.1:%s    "
+           "users:((\"remote-viewer\",pid=2301,fd=%d))")
+SS_OUT = "\n".join(SS_LINE % (41000 + idx, port, 20 + idx)
+                   for idx, port in enumerate(["3000"] * 4 + ["3200"] * 4))
+"""ss output of one RV session: 4 plaintext and 4 TLS links."""
+
+XEV_EVENT = """KeyPress event, serial 33, synthetic NO, window 0x1e00001,
+    root 0x2b1, subw 0x0, time 4112430, (59,59), root:(1022,543),
+    state 0x0, keycode %d (keysym 0x%x, %s), same_screen YES,
+    XLookupString gives 1 bytes: (61) "a"
+    XmbLookupString gives 1 bytes: (61) "a"
+    XFilterEvent returns: False
+
+KeyRelease event, serial 33, synthetic NO, window 0x1e00001,
+    root 0x2b1, subw 0x0, time 4112510, (59,59), root:(1022,543),
+    state 0x0, keycode %d (keysym 0x%x, %s), same_screen YES,
+    XLookupString gives 1 bytes: (61) "a"
+    XFilterEvent returns: False
+"""
+XEV_OUT = "\n".join(XEV_EVENT % ((38 + idx, 0x61 + idx, chr(0x61 + idx)) * 2)
+                    for idx in range(26))
+"""xev output for 26 typed letters."""
+
+URLS = ("http://10.34.58.1:3128", "https://[2620:52:0:2280::1]:3128",
+        "10.34.58.1", "spice://10.34.58.1:5900")
+
+
+def time_cmd_build():
+    cmd = utils.Cmd("ss", "-n", "-p", "-t", "state", "all")
+    cmd.append("dst")
+    cmd.append("10.0.0.1:3000")
+    return str(cmd)
+
+
+def time_cmd_quote():
+    return str(utils.Cmd("grep", "-e", "10.0.0.1.*remote-viewer",
+                         "it's a file with spaces"))
+
+
+def time_cmd_combine():
+    return utils.combine(utils.Cmd("ss", "-n"), "|",
+                         utils.Cmd("grep", "-e", "x.*y"), "|",
+                         utils.Cmd("grep", "-v", "CLOSE-WAIT"))
+
+
+def time_rv_chk_con_parse():
+    return parsers.ss_links(SS_OUT, ("3000", "3200", None))
+
+
+def time_klogger_parse():
+    return parsers.parse_xev_keys(XEV_OUT)
+
+
+def time_url_parse():
+    for url in URLS:
+        utils.URL_parse(url, "3128")
@@ -20,21 +20,85 @@
 
 
 import os
+import hashlib
 import logging
 import argparse
+import numpy
+from PIL import Image
 # Unable to import gi and gtk in virtualenv,
 # nevertheless deps scripts wont be run in virtualenv.
 #pylint: disable=F0401
 import gi
 gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk, Gdk, GdkPixbuf
-
-from PIL import Image, ImageDraw
+from gi.repository import Gtk, Gdk, GdkPixbuf  # noqa
 
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+MAX_IMG_SIDE = 8192
+"""Max side of generated image. 8K."""
+
+
+def img_size(arg):
+    """Parse image size: INT or WIDTHxHEIGHT."""
+    try:
+        sides = [int(x) for x in arg.lower().split('x')]
+    except ValueError:
+        raise argparse.ArgumentTypeError("Bad image size: %s" % arg)
+    if len(sides) == 1:
+        sides *= 2
+    if len(sides) != 2 or not all(0 < x <= MAX_IMG_SIDE for x in sides):
+        raise argparse.ArgumentTypeError("Bad image size: %s" % arg)
+    return tuple(sides)
+
+
+def genimg(size, seed):
+    """Generate deterministic RGB image. The same seed gives the same image.
+
+    Red: diagonal stripes, green: XOR pattern, blue: tiled noise. All
+    channels are computed as whole arrays, uint8 arithmetic wraps at 256.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of uint8 with shape (height, width, 3).
+
+    """
+    width, height = size
+    rng = numpy.random.RandomState(seed)
+    ax, ay, bx, by = rng.randint(1, 256, size=4).astype(numpy.uint8)
+    xs = numpy.arange(width, dtype=numpy.uint8)
+    ys = numpy.arange(height, dtype=numpy.uint8)
+    red = (xs * ax)[None, :] + (ys * ay)[:, None]
+    green = (xs * bx)[None, :] ^ (ys * by)[:, None]
+    tile = rng.randint(0, 256, size=(64, 64)).astype(numpy.uint8)
+    blue = tile[(ys % 64)[:, None], (xs % 64)[None, :]]
+    return numpy.dstack((red, green, blue))
+
+
+def pixbuf_digest(pixbuf):
+    """SHA-256 of decoded RGBA pixels. Row padding is dropped, digest depends
+    only on image content, not on image format or encoder settings.
+
+    Returns
+    -------
+    str
+        WIDTHxHEIGHT:HEXDIGEST
+
+    """
+    if not pixbuf.get_has_alpha():
+        pixbuf = pixbuf.add_alpha(False, 0, 0, 0)
+    width = pixbuf.get_width()
+    height = pixbuf.get_height()
+    pixels = numpy.frombuffer(pixbuf.get_pixels(), dtype=numpy.uint8)
+    # The last row is not padded to rowstride.
+    rows = numpy.lib.stride_tricks.as_strided(
+        pixels, shape=(height, width * 4), strides=(pixbuf.get_rowstride(), 1))
+    digest = hashlib.sha256(numpy.ascontiguousarray(rows)).hexdigest()
+    return "%dx%d:%s" % (width, height, digest)
+
+
 parser = argparse.ArgumentParser(
     description='Helper to operate on X clipboard.')
 
@@ -58,8 +122,13 @@ group.add_argument("-d", "--cb2txtf", metavar='FILE',
                    help="Dump text from clipboard to file.")
 group.add_argument("-o", "--cb2stdout", action='store_true',
                    help="Dump clipboard to stdout.")
-group.add_argument("-g", "--genimg", metavar='INT', nargs='?', type=int,
-                   help="Generate an image of side size INT pixels.")
+group.add_argument("-g", "--genimg", metavar='SIZE', nargs='?', type=img_size,
+                   help="Generate an image of SIZE: INT or WIDTHxHEIGHT "
+                   "pixels, up to %s." % MAX_IMG_SIDE)
+group.add_argument("-x", "--cb2digest", action='store_true',
+                   help="Print digest of image pixels from clipboard.")
+parser.add_argument("--seed", metavar='INT', type=int, default=0,
+                    help="Seed of generated image.")
 parser.add_argument("file_n", nargs='?', metavar='FILE', default="test.png",
                     type=str, help="Specify file name.")
 
@@ -76,16 +145,10 @@ if args.clear:
     clipboard.clear()                # Now we can clear it.
     logger.info("Clear clipboard.")
 elif args.genimg:
-    size_img = args.genimg
-    img = Image.new('RGB', size=(size_img, size_img), color='yellow')
-    draw = ImageDraw.Draw(img)
-    for i in range(0, size_img, 3):
-        draw.line([(i, 0), (size_img, size_img)], fill='green')
-        draw.line([(0, i), (size_img, size_img)], fill='red')
-        draw.line([(size_img, 0), (0, i)], fill='blue')
-    draw.ellipse((0.6*size_img, 0.15*size_img, 0.8*size_img, 0.3*size_img),
-                 fill='red')
+    img = Image.fromarray(genimg(args.genimg, args.seed), 'RGB')
     img.save(args.file_n, args.file_n.split(".")[-1])
+    logger.info('Image file of size %sx%s generated and saved as %s',
+                args.genimg[0], args.genimg[1], args.file_n)
 elif args.txt2cb:
     clipboard.clear()
     clipboard.set_text(args.txt2cb, -1)
@@ -143,6 +206,10 @@ elif args.cb2stdout:
     elif 'STRING' in tarlist:
         selectiondata = clipboard.wait_for_text()
         print(selectiondata)
+elif args.cb2digest:
+    if not clipboard.wait_is_image_available():
+        raise Exception("Clipboard doesn't have an image.")
+    print("DIGEST " + pixbuf_digest(clipboard.wait_for_image()))
 elif args.query:
     targets = clipboard.wait_for_targets()
     logger.info(targets)
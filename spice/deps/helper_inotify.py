@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Helper to watch a directory for new files with inotify. It doesn't need
+inotify-tools, libc is called through ctypes.
+
+"READY" is printed when the watch is set. Then a line per event:
+
+    EVENT <kind> <time> <size> <name>
+
+kind is one of CREATE, CLOSE_WRITE, MOVED_TO. Time is a value of time.time()
+when the event was read. Size is -1 if the file is already absent.
+
+    man 7 inotify
+
+"""
+
+
+import os
+import sys
+import time
+import struct
+import ctypes
+import ctypes.util
+import logging
+import argparse
+
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+EVENTS = ((IN_CREATE, "CREATE"),
+          (IN_CLOSE_WRITE, "CLOSE_WRITE"),
+          (IN_MOVED_TO, "MOVED_TO"))
+EVENT_HDR = struct.Struct("iIII")
+"""struct inotify_event without name: wd, mask, cookie, len."""
+
+parser = argparse.ArgumentParser(
+    description='Helper to watch a directory for new files.')
+parser.add_argument("dir_n", metavar='DIR', help="Directory to watch.")
+args = parser.parse_args()
+
+libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+inotify_fd = libc.inotify_init()
+if inotify_fd < 0:
+    raise OSError(ctypes.get_errno(), "inotify_init() failed.")
+mask = 0
+for flag, _ in EVENTS:
+    mask |= flag
+if libc.inotify_add_watch(inotify_fd, args.dir_n.encode(), mask) < 0:
+    raise OSError(ctypes.get_errno(), "Cannot watch: %s." % args.dir_n)
+
+
+def reply(line):
+    sys.stdout.write(line + "\n")
+    sys.stdout.flush()
+
+
+reply("READY")
+try:
+    while True:
+        buf = os.read(inotify_fd, 65536)
+        now = time.time()
+        pos = 0
+        while pos < len(buf):
+            _, ev_mask, _, length = EVENT_HDR.unpack_from(buf, pos)
+            pos += EVENT_HDR.size
+            name = buf[pos:pos + length].rstrip(b"\0").decode("utf-8",
+                                                              "replace")
+            pos += length
+            try:
+                size = os.stat(os.path.join(args.dir_n, name)).st_size
+            except OSError:
+                size = -1
+            for flag, kind in EVENTS:
+                if ev_mask & flag:
+                    reply("EVENT %s %.6f %d %s" % (kind, now, size, name))
+except KeyboardInterrupt:
+    logger.info("Stop watching: %s.", args.dir_n)
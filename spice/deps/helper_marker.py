@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Helper to show full-screen marker pattern. It is used to measure display
+update latency.
+
+Commands are read from stdin, one per line:
+
+    t       Print: "T <time>".
+    0, 1    Paint marker with color 0 or 1. When frame is painted print:
+            "M <color> <time>".
+    q       Quit.
+
+"READY" is printed when the first frame is painted.
+Time is a value of time.time() at guest.
+
+    https://developer.gnome.org/gdk3/stable/GdkFrameClock.html
+
+"""
+
+
+import sys
+import time
+import logging
+# Unable to import gi and gtk in virtualenv,
+# nevertheless deps scripts wont be run in virtualenv.
+#pylint: disable=F0401
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk, GLib  # noqa
+
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+MARKER_COLORS = ((0, 0, 255), (255, 255, 0))
+"""RGB colors of marker. Keep in sync with spice/lib/vm_actions_linux.py"""
+
+
+class Marker(Gtk.Window):
+
+    def __init__(self):
+        super(Marker, self).__init__(title="Marker")
+        self.color = 0
+        self.pending = False
+        self.ready = False
+        self.connect("destroy", Gtk.main_quit)
+        self.connect("draw", self.on_draw)
+        self.connect("realize", self.on_realize)
+        self.set_decorated(False)
+        self.fullscreen()
+        GLib.io_add_watch(sys.stdin, GLib.IO_IN | GLib.IO_HUP, self.on_stdin)
+
+    def on_realize(self, _):
+        clock = self.get_frame_clock()
+        clock.connect("after-paint", self.on_after_paint)
+
+    def on_draw(self, _, ctx):
+        red, green, blue = MARKER_COLORS[self.color]
+        ctx.set_source_rgb(red / 255.0, green / 255.0, blue / 255.0)
+        ctx.paint()
+        return True
+
+    def on_after_paint(self, _):
+        if not self.ready:
+            self.ready = True
+            self.reply("READY")
+        elif self.pending:
+            self.pending = False
+            self.reply("M %d %.6f" % (self.color, time.time()))
+
+    def on_stdin(self, source, condition):
+        if condition & GLib.IO_HUP:
+            Gtk.main_quit()
+            return False
+        cmd = source.readline().strip()
+        if cmd == "t":
+            self.reply("T %.6f" % time.time())
+        elif cmd in ("0", "1"):
+            self.color = int(cmd)
+            self.pending = True
+            self.queue_draw()
+        elif cmd == "q":
+            Gtk.main_quit()
+            return False
+        return True
+
+    @staticmethod
+    def reply(line):
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+
+
+win = Marker()
+win.show_all()
+Gtk.main()
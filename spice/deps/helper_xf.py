@@ -11,6 +11,7 @@
 #
 # See LICENSE for more details.
 
+import sys
 import logging
 import argparse
 import time
@@ -18,41 +19,85 @@ import time
 from dogtail import tree
 from dogtail.rawinput import press, release, absoluteMotion, keyCombo
 
-from PIL import Image, ImageDraw
+import numpy
+from PIL import Image
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+DIALOG_WAIT = 5
+"""Progress dialog is expected in this time after drop, in seconds."""
+
+MAX_IMG_SIDE = 8192
+"""Max side of generated image. 8K."""
+
+
+def img_size(arg):
+    """Parse image size: INT or WIDTHxHEIGHT."""
+    try:
+        sides = [int(x) for x in arg.lower().split('x')]
+    except ValueError:
+        raise argparse.ArgumentTypeError("Bad image size: %s" % arg)
+    if len(sides) == 1:
+        sides *= 2
+    if len(sides) != 2 or not all(0 < x <= MAX_IMG_SIDE for x in sides):
+        raise argparse.ArgumentTypeError("Bad image size: %s" % arg)
+    return tuple(sides)
+
+
+def genimg(size, seed):
+    """Generate deterministic RGB image. The same seed gives the same image.
+
+    Red: diagonal stripes, green: XOR pattern, blue: tiled noise. All
+    channels are computed as whole arrays, uint8 arithmetic wraps at 256.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of uint8 with shape (height, width, 3).
+
+    """
+    width, height = size
+    rng = numpy.random.RandomState(seed)
+    ax, ay, bx, by = rng.randint(1, 256, size=4).astype(numpy.uint8)
+    xs = numpy.arange(width, dtype=numpy.uint8)
+    ys = numpy.arange(height, dtype=numpy.uint8)
+    red = (xs * ax)[None, :] + (ys * ay)[:, None]
+    green = (xs * bx)[None, :] ^ (ys * by)[:, None]
+    tile = rng.randint(0, 256, size=(64, 64)).astype(numpy.uint8)
+    blue = tile[(ys % 64)[:, None], (xs % 64)[None, :]]
+    return numpy.dstack((red, green, blue))
+
+
 parser = argparse.ArgumentParser(
     description='Helper to operate on file transfer.')
 
-parser.add_argument("file_n", nargs='?', metavar='FILE', default="test.png",
-                    help="Specify file name.")
+parser.add_argument("file_n", nargs='*', metavar='FILE', default=["test.png"],
+                    help="Specify file names. Several files are dragged as "
+                    "a selection of all files in the nautilus window.")
+
+parser.add_argument("--seed", metavar='INT', type=int, default=0,
+                    help="Seed of generated image.")
 
 group = parser.add_mutually_exclusive_group()
-group.add_argument("-g", "--genimg", metavar='INT', nargs='?', type=int,
-                   help="Generate an image of side size INT pixels.")
+group.add_argument("-g", "--genimg", metavar='SIZE', nargs='?', type=img_size,
+                   help="Generate an image of SIZE: INT or WIDTHxHEIGHT "
+                   "pixels, up to %s." % MAX_IMG_SIDE)
 group.add_argument("-p", "--progress", help="Check progress bar visibility.",
                    action='store_true')
 group.add_argument("-n", "--negative", help="Negative test, check for error "
                    "message dialog.", action='store_true')
+group.add_argument("-l", "--timeline", metavar='SECONDS', type=float,
+                   help="Print when the progress dialog is shown and hidden. "
+                   "Watch it for SECONDS at most.")
 
 args = parser.parse_args()
 
 if args.genimg:
-    size_img = args.genimg
-    img = Image.new('RGB', size=(size_img, size_img), color='yellow')
-    draw = ImageDraw.Draw(img)
-    for i in range(0, size_img, 3):
-        draw.line([(i, 0), (size_img, size_img)], fill='green')
-        draw.line([(0, i), (size_img, size_img)], fill='red')
-        draw.line([(size_img, 0), (0, i)], fill='blue')
-    draw.ellipse((0.6*size_img, 0.15*size_img, 0.8*size_img, 0.3*size_img),
-                 fill='red')
-    with open(args.file_n, 'w') as fd:
-        img.save(fd, args.file_n.split(".")[-1])
-    logger.info('Image file of size %s generated and saved as %s', size_img,
-                args.file_n)
+    img = Image.fromarray(genimg(args.genimg, args.seed), 'RGB')
+    img.save(args.file_n[0], args.file_n[0].split(".")[-1])
+    logger.info('Image file of size %sx%s generated and saved as %s',
+                args.genimg[0], args.genimg[1], args.file_n[0])
 else:
     app_nau = tree.root.application('nautilus')[0]
     app_rv = tree.root.application('remote-viewer')
@@ -60,7 +105,11 @@ else:
     time.sleep(0.6)
     keyCombo('<Super_L>Left')
     time.sleep(0.6)
-    srcf = app_nau.findChildren(lambda x: x.name == args.file_n)[0]
+    srcf = app_nau.findChildren(lambda x: x.name == args.file_n[0])[0]
+    if len(args.file_n) > 1:
+        srcf.click()
+        keyCombo('<Control>a')
+        time.sleep(0.6)
     src_position = (srcf.position[0] + srcf.size[0] / 2,
                     srcf.position[1] + srcf.size[1] / 2)
     press(*src_position)
@@ -78,5 +127,25 @@ else:
         logger.info('Progress bar detected.')
     if args.negative:
         err_msg = 'An error caused the following file transfers to fail:\n%s'
-        app_rv.findChildren(lambda x: x.text == err_msg % args.file_n)
+        app_rv.findChildren(lambda x: x.text == err_msg % args.file_n[0])
         logger.info('Error message detected.')
+    if args.timeline:
+        # Lines: DIALOG SHOWN|HIDDEN <time>.
+        shown = False
+        start = time.time()
+        end = start + args.timeline
+        while time.time() < end:
+            if not shown and time.time() > start + DIALOG_WAIT:
+                logger.info('Progress dialog was not shown.')
+                break
+            dlgs = app_rv.findChildren(lambda x: x.name == 'File Transfers' and
+                                       x.roleName == 'dialog',
+                                       recursive=False)
+            if bool(dlgs) != shown:
+                shown = not shown
+                print("DIALOG %s %.6f" % ("SHOWN" if shown else "HIDDEN",
+                                          time.time()))
+                sys.stdout.flush()
+                if not shown:
+                    break
+            time.sleep(0.1)
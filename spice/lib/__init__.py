@@ -15,8 +15,5 @@
 # Author: Andrei Stepanov <astepano@redhat.com>
 #
 
-# Populate zope registry
-from . import vm_actions
-from . import vm_actions_linux
-from . import vm_actions_rv
-from . import vm_actions_ovirt
+# Zope registry is populated on demand: action modules are imported on first
+# dispatch of their action, see reg.load_actions().
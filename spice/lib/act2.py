@@ -23,6 +23,7 @@ import logging
 from spice.lib import reg
 from spice.lib import ios
 from spice.lib import utils
+from spice.lib import trace
 
 
 logger = logging.getLogger(__name__)
@@ -33,42 +34,50 @@ class Action(object):
     def __init__(self, action_name):
         self.name = action_name
 
-    def __call__(self, vmi, *args, **kwargs):
-        os = registry.lookup([], ios.IOSystem,
-                             vmi.cfg.interface_os)
-        ver = registry.lookup([], ios.IVersionMajor,
-                              vmi.cfg.interface_os_version)
-        mver = registry.lookup([], ios.IVersionMinor,
-                               vmi.cfg.interface_os_mversion)
-        arch = registry.lookup([], ios.IArch,
-                               vmi.cfg.interface_os_arch)
-        ovirt_ver = registry.lookup([], ios.IArch,
-                                    vmi.cfg.interface_ovirt_version)
-        os_info = ",".join(map(repr, [os, ver, mver, arch, ovirt_ver]))
-        msg = "OS info: %s" % os_info
-        utils.debug(vmi, msg)
-        lookup_order = [[os, ver, mver, arch, ovirt_ver],
-                        [os, ver, mver, ovirt_ver],
-                        [os, ver, arch, ovirt_ver],
-                        [os, ver, ovirt_ver],
-                        [os, ovirt_ver],
-                        [os, ver, mver, arch],
-                        [os, ver, mver],
-                        [os, ver, arch],
-                        [os, ver],
-                        [os]]
-        action = None
-        iset = None
+    def _lookup(self, lookup_order):
         for iset in lookup_order:
             if not all(iset):
                 continue
             action = registry.lookup(iset, reg.IVmAction, self.name)
             if action:
-                break
-        if not action:
-            msg = "Cannot find suitable implementation for: %s." % self.name
-            raise utils.SpiceTestFail(vmi.test, msg)
-        act_reqs = ",".join(map(repr, iset))
-        msg = "Call: %s, for OS interface: %s" % (self.name, act_reqs)
-        utils.debug(vmi, msg)
-        return action(vmi, *args, **kwargs)
+                return action, iset
+        return None, None
+
+    def __call__(self, vmi, *args, **kwargs):
+        with trace.span(self.name, vm=vmi.vm_name) as span:
+            os = registry.lookup([], ios.IOSystem,
+                                 vmi.cfg.interface_os)
+            ver = registry.lookup([], ios.IVersionMajor,
+                                  vmi.cfg.interface_os_version)
+            mver = registry.lookup([], ios.IVersionMinor,
+                                   vmi.cfg.interface_os_mversion)
+            arch = registry.lookup([], ios.IArch,
+                                   vmi.cfg.interface_os_arch)
+            ovirt_ver = registry.lookup([], ios.IArch,
+                                        vmi.cfg.interface_ovirt_version)
+            os_info = ",".join(map(repr, [os, ver, mver, arch, ovirt_ver]))
+            msg = "OS info: %s" % os_info
+            utils.debug(vmi, msg)
+            lookup_order = [[os, ver, mver, arch, ovirt_ver],
+                            [os, ver, mver, ovirt_ver],
+                            [os, ver, arch, ovirt_ver],
+                            [os, ver, ovirt_ver],
+                            [os, ovirt_ver],
+                            [os, ver, mver, arch],
+                            [os, ver, mver],
+                            [os, ver, arch],
+                            [os, ver],
+                            [os]]
+            reg.load_actions(self.name)
+            action, iset = self._lookup(lookup_order)
+            if not action and reg.load_all():
+                action, iset = self._lookup(lookup_order)
+            if not action:
+                msg = ("Cannot find suitable implementation for: %s." %
+                       self.name)
+                raise utils.SpiceTestFail(vmi.test, msg)
+            act_reqs = ",".join(map(repr, iset))
+            msg = "Call: %s, for OS interface: %s" % (self.name, act_reqs)
+            utils.debug(vmi, msg)
+            span.set("iface", act_reqs)
+            return action(vmi, *args, **kwargs)
@@ -0,0 +1,119 @@
+"""Action index generated by: python -m spice.lib.reg
+Do not edit.
+"""
+
+DIGEST = '5b9f6a688e56cd96da673370aa3f2ec4be106f1d'
+"""SHA1 of sources the index is built from."""
+INDEX = {
+    '_is_pid_alive': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'add_usb_policy': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'cb2digest': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'cb2file': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'cb2img': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'cb2text': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'check_usb_policy': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'chk_deps': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'clear_cb': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'cp2vm': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'cp_deps': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'cp_file': [('spice.lib.vm_actions', ('ILinux',))],
+    'deploy_epel_repo': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'dst_dir': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'error': [('spice.lib.vm_actions', ('IOSystem',))],
+    'export_dbus': [
+        ('spice.lib.vm_actions_linux', ('IRhel', 'IVersionMajor6')),
+    ],
+    'export_vars': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'export_x2ssh': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'firefox_auto_open_vv': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'gen_rnd_file': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'gen_text2cb': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'gen_vv_file': [('spice.lib.vm_actions_rv', ('IOSystem',))],
+    'get_connected_displays': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'get_corners': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'get_display_resolution': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'get_geom': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'get_ip': [('spice.lib.vm_actions_ovirt', ('IOvirt4',))],
+    'get_open_window_ids': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'get_res': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'get_window_geometry': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'get_window_props': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'get_windows': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'get_wininfo': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'get_x_var': [
+        ('spice.lib.vm_actions_linux',
+         ('ILinux', 'IVersionMajor7', 'IVersionMinorDevel')),
+        ('spice.lib.vm_actions_linux', ('ILinux',)),
+    ],
+    'home_dir': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'img2cb': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'imggen': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'info': [('spice.lib.vm_actions', ('IOSystem',))],
+    'install_rpm': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'is_fullscreen_xprop': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'kill_by_name': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'klogger_start': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'klogger_stop': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'lock_scr_off': [
+        ('spice.lib.vm_actions_linux', ('IRhel', 'IVersionMajor7')),
+        ('spice.lib.vm_actions_linux', ('IRhel', 'IVersionMajor6')),
+    ],
+    'marker_clock': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'marker_painted': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'marker_set': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'marker_start': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'marker_stop': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'md5sum': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'new_admin_ssn': [('spice.lib.vm_actions', ('IOSystem',))],
+    'new_ssn': [
+        ('spice.lib.vm_actions', ('IOSystem',)),
+        ('spice.lib.vm_actions_ovirt', ('IOvirt4', 'ILinux')),
+    ],
+    'new_ssn_context': [('spice.lib.vm_actions', ('IOSystem',))],
+    'ovirt_engine': [('spice.lib.vm_actions_ovirt', ('IOvirt4',))],
+    'ovirt_vms': [('spice.lib.vm_actions_ovirt', ('IOvirt4',))],
+    'print_rv_version': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'proc_is_active': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'python_bin': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'reset_gui': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'rpm_version': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'rstatus': [('spice.lib.vm_actions', ('IOSystem',))],
+    'run': [('spice.lib.vm_actions', ('IOSystem',))],
+    'run_selenium': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'rv_auth': [('spice.lib.vm_actions_rv', ('ILinux',))],
+    'rv_basic_opts': [('spice.lib.vm_actions_rv', ('ILinux',))],
+    'rv_chk_con': [('spice.lib.vm_actions_rv', ('ILinux',))],
+    'rv_connect': [('spice.lib.vm_actions_rv', ('IOSystem',))],
+    'rv_connect_cmd': [('spice.lib.vm_actions_rv', ('ILinux',))],
+    'rv_connect_file': [('spice.lib.vm_actions_rv', ('ILinux',))],
+    'rv_connect_menu': [('spice.lib.vm_actions_rv', ('ILinux',))],
+    'rv_disconnect': [('spice.lib.vm_actions_rv', ('ILinux',))],
+    'rv_run': [('spice.lib.vm_actions_rv', ('ILinux',))],
+    'rv_url': [('spice.lib.vm_actions_rv', ('ILinux',))],
+    'selenium_ready': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'service_vdagent': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'set_alt_python': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'set_resolution': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'str_input': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'text2cb': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'turn_accessibility': [
+        ('spice.lib.vm_actions_linux', ('IRhel', 'IVersionMajor7')),
+        ('spice.lib.vm_actions_linux', ('IRhel', 'IVersionMajor8')),
+        ('spice.lib.vm_actions_linux', ('IRhel', 'IVersionMajor6')),
+    ],
+    'turn_firewall': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'verify_listen': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'verify_vdagent': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'verify_virtio': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'wait_for_prog': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'wait_for_win': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'wait_selenium': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'window_resolution': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'workdir': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'x_active': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'x_turn_off': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'x_turn_on': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'xfer_watch_start': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'xfer_watch_stop': [('spice.lib.vm_actions_linux', ('ILinux',))],
+    'xfer_watch_wait': [('spice.lib.vm_actions_linux', ('ILinux',))],
+}
@@ -0,0 +1,434 @@
+#!/usr/bin/env python
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Grab VM frames and compare what the guest renders with what the client
+shows.
+
+Frames are taken by QEMU monitor command ``screendump``. QEMU stores frame on
+host as binary PPM (P6). PPM file is mapped into memory and exposed as NumPy
+array of shape (height, width, 3). There is no decoding step at all.
+
+Client frame contains the whole client desktop. The part of client frame that
+belongs to remote-viewer drawing area is found from the X windows inventory
+of the client.
+
+Example
+-------
+
+    frame_g = capture.grab(test.vmi_g)
+    view_c = capture.client_view(test.vmi_c, frame_g)
+    sim = capture.similarity(frame_g, view_c)
+
+"""
+
+import os
+import re
+import time
+import logging
+import tempfile
+
+import numpy  # pylint: disable=F0401
+
+from virttest import data_dir
+
+from spice.lib import act
+from spice.lib import utils
+
+logger = logging.getLogger(__name__)
+
+PPM_HEADER_RE = re.compile(
+    br'P6(?:\s+|#[^\n]*\n)+(\d+)(?:\s+|#[^\n]*\n)+(\d+)'
+    br'(?:\s+|#[^\n]*\n)+(\d+)\s')
+"""Binary PPM header: magic, width, height, maxval. Comments are allowed."""
+PPM_HEADER_MAX = 1024
+"""Read not more than this bytes to find PPM header."""
+RV_WIN_NAME = "Remote Viewer"
+"""remote-viewer window title suffix."""
+BLOCK = 16
+"""Default side of a square block for region-level comparison."""
+COLOR_TOLERANCE = 24
+"""Max difference of a color channel to treat colors as the same."""
+
+
+class CaptureError(utils.SpiceUtilsError):
+    """Cannot grab or interpret a frame."""
+
+
+def read_ppm(path):
+    """Map binary PPM file to NumPy array. Pixels are not copied.
+
+    Parameters
+    ----------
+    path : str
+        Path to PPM file.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of uint8 with shape (height, width, 3).
+
+    Raises
+    ------
+    CaptureError
+        File is not a binary 8-bit PPM.
+
+    """
+    with open(path, 'rb') as ppm:
+        head = ppm.read(PPM_HEADER_MAX)
+    match = PPM_HEADER_RE.match(head)
+    if not match:
+        raise CaptureError("Not a binary PPM file: %s." % path)
+    width, height, maxval = [int(x) for x in match.groups()]
+    if maxval > 255:
+        raise CaptureError("16-bit PPM is not supported: %s." % path)
+    return numpy.memmap(path, dtype=numpy.uint8, mode='r',
+                        offset=match.end(), shape=(height, width, 3))
+
+
+def grab(vmi, path=None):
+    """Take a screendump of a VM.
+
+    Parameters
+    ----------
+    vmi : VmInfo
+        VM to grab.
+    path : str, optional
+        Where to store PPM file on host. By default file is created in
+        avocado-vt tmp dir and is removed after it is mapped.
+
+    Returns
+    -------
+    numpy.ndarray
+        Frame with shape (height, width, 3).
+
+    """
+    remove = not path
+    if not path:
+        fd, path = tempfile.mkstemp(prefix="%s-" % vmi.vm_name,
+                                    suffix=".ppm",
+                                    dir=data_dir.get_tmp_dir())
+        os.close(fd)
+    vmi.vm.monitor.screendump(path, debug=False)
+    frame = read_ppm(path)
+    if remove:
+        # Mapping stays valid after unlink.
+        os.unlink(path)
+    return frame
+
+
+def find_rv_window(vmi, win_name=RV_WIN_NAME):
+    """Find geometry of the remote-viewer window at client.
+
+    Parameters
+    ----------
+    vmi : VmInfo
+        Client VM.
+    win_name : str
+        Pattern of the window title.
+
+    Returns
+    -------
+    tuple
+        (x, y, width, height) in absolute coordinates.
+
+    Raises
+    ------
+    CaptureError
+        No visible remote-viewer window.
+
+    """
+    wins = [w for w in act.get_windows(vmi)
+            if win_name in w['name'] and w['x'] >= 0 and w['y'] >= 0]
+    if not wins:
+        raise CaptureError("Cannot find window: %s." % win_name)
+    win = max(wins, key=lambda w: w['width'] * w['height'])
+    utils.debug(vmi, "RV window %s: %sx%s+%s+%s", win['id'], win['width'],
+                win['height'], win['x'], win['y'])
+    return (win['x'], win['y'], win['width'], win['height'])
+
+
+def wait_for_color(vmi, box, color, timeout=10, tolerance=COLOR_TOLERANCE):
+    """Grab frames until a region is filled with a color.
+
+    Parameters
+    ----------
+    vmi : VmInfo
+        VM to grab.
+    box : tuple
+        Region (x, y, width, height).
+    color : tuple
+        RGB color.
+    timeout : float
+        Timeout in seconds.
+    tolerance : int
+        Max difference of mean color channel value.
+
+    Returns
+    -------
+    tuple
+        (time, duration). Host time when the frame with color was grabbed:
+        middle of the screendump call. Duration of the screendump call is a
+        resolution of the time.
+
+    Raises
+    ------
+    CaptureError
+        Color did not appear.
+
+    """
+    x, y, width, height = box
+    color = numpy.array(color, dtype=numpy.float32)
+    end = time.time() + timeout
+    while True:
+        start = time.time()
+        frame = grab(vmi)
+        stop = time.time()
+        patch = frame[y:y + height, x:x + width].reshape(-1, 3)
+        if numpy.abs(patch.mean(axis=0) - color).max() <= tolerance:
+            return (start + stop) / 2, stop - start
+        if stop > end:
+            raise CaptureError("Color %s did not appear in %s s." %
+                               (tuple(color), timeout))
+
+
+def row_profile(frame):
+    """Mean intensity of every row.
+
+    Parameters
+    ----------
+    frame : numpy.ndarray
+        Frame with shape (height, width, 3).
+
+    Returns
+    -------
+    numpy.ndarray
+        Float array with shape (height,).
+
+    """
+    return frame.mean(axis=(1, 2))
+
+
+def resample(frame, shape):
+    """Nearest-neighbour resample of a frame to new (height, width).
+
+    Parameters
+    ----------
+    frame : numpy.ndarray
+        Frame to resample.
+    shape : tuple
+        Target (height, width, ...).
+
+    Returns
+    -------
+    numpy.ndarray
+        Resampled frame.
+
+    """
+    height, width = shape[:2]
+    if frame.shape[:2] == (height, width):
+        return frame
+    rows = numpy.arange(height) * frame.shape[0] // height
+    cols = numpy.arange(width) * frame.shape[1] // width
+    return frame[rows[:, None], cols]
+
+
+def drawing_area(window, guest_frame):
+    """Locate guest display inside remote-viewer window.
+
+    remote-viewer centers guest display horizontally. Vertical position
+    depends on menu bar / tool bar height. The vertical offset is found by
+    matching row intensity profiles of guest frame and window content.
+
+    Parameters
+    ----------
+    window : numpy.ndarray
+        Content of remote-viewer window.
+    guest_frame : numpy.ndarray
+        Guest frame.
+
+    Returns
+    -------
+    numpy.ndarray
+        Part of the window that shows the guest, with the same shape as the
+        guest frame. Zoomed out display is resampled to guest size.
+
+    """
+    g_height, g_width = guest_frame.shape[:2]
+    w_height, w_width = window.shape[:2]
+    if g_height > w_height or g_width > w_width:
+        # Zoomed out, or window is smaller than guest display.
+        scale = min(float(w_height) / g_height, float(w_width) / g_width)
+        s_shape = (max(int(g_height * scale), 1), max(int(g_width * scale), 1))
+        area = drawing_area(window, resample(guest_frame, s_shape))
+        return resample(area, guest_frame.shape)
+    left = (w_width - g_width) // 2
+    column = window[:, left:left + g_width]
+    offsets = w_height - g_height + 1
+    if offsets == 1:
+        return column
+    profile_g = row_profile(guest_frame)
+    profile_w = row_profile(column)
+    # Sliding windows over the window profile: shape (offsets, g_height).
+    idx = numpy.arange(offsets)[:, None] + numpy.arange(g_height)
+    err = numpy.abs(profile_w[idx] - profile_g).sum(axis=1)
+    top = int(err.argmin())
+    return column[top:top + g_height]
+
+
+def client_view(vmi, guest_frame, frame=None, win_name=RV_WIN_NAME):
+    """Part of client frame that shows guest display.
+
+    Parameters
+    ----------
+    vmi : VmInfo
+        Client VM.
+    guest_frame : numpy.ndarray
+        Guest frame, used to locate guest display inside the window.
+    frame : numpy.ndarray, optional
+        Client frame. If not set, grab a new one.
+    win_name : str
+        Pattern of the remote-viewer window title.
+
+    Returns
+    -------
+    numpy.ndarray
+        Client view of guest display.
+
+    """
+    if frame is None:
+        frame = grab(vmi)
+    x, y, width, height = find_rv_window(vmi, win_name)
+    window = frame[y:y + height, x:x + width]
+    return drawing_area(window, guest_frame)
+
+
+def _blocks(frame, block):
+    """Split gray frame to square blocks. Incomplete border blocks are
+    dropped.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array with shape (rows, cols, block * block).
+
+    """
+    rows = frame.shape[0] // block
+    cols = frame.shape[1] // block
+    frame = frame[:rows * block, :cols * block]
+    frame = frame.reshape(rows, block, cols, block).swapaxes(1, 2)
+    return frame.reshape(rows, cols, block * block)
+
+
+def gray(frame):
+    """Luma (ITU-R BT.601) of RGB frame as float32 array."""
+    weights = numpy.array([0.299, 0.587, 0.114], dtype=numpy.float32)
+    return frame.dot(weights)
+
+
+def region_diff(frame1, frame2, block=BLOCK):
+    """Mean absolute difference per square region.
+
+    Parameters
+    ----------
+    frame1, frame2 : numpy.ndarray
+        Frames of the same shape.
+    block : int
+        Region side in pixels.
+
+    Returns
+    -------
+    numpy.ndarray
+        Float array with shape (height // block, width // block). 0 - regions
+        are identical, 255 - totally different.
+
+    """
+    if frame1.shape != frame2.shape:
+        raise CaptureError("Frames have different shapes: %s, %s." %
+                           (frame1.shape, frame2.shape))
+    diff = numpy.abs(frame1.astype(numpy.int16) - frame2.astype(numpy.int16))
+    return _blocks(diff.mean(axis=2), block).mean(axis=2)
+
+
+def similarity(frame1, frame2, block=BLOCK):
+    """Perceptual similarity of two frames: mean SSIM over square regions of
+    luma.
+
+    Parameters
+    ----------
+    frame1, frame2 : numpy.ndarray
+        Frames of the same shape.
+    block : int
+        Region side in pixels.
+
+    Returns
+    -------
+    float
+        1.0 - frames are the same. Lower value - less similar.
+
+    """
+    return float(ssim_map(frame1, frame2, block).mean())
+
+
+def ssim_map(frame1, frame2, block=BLOCK):
+    """Structural similarity index per square region of luma.
+
+    Info
+    ----
+    https://en.wikipedia.org/wiki/Structural_similarity
+
+    Returns
+    -------
+    numpy.ndarray
+        Float array with shape (height // block, width // block).
+
+    """
+    if frame1.shape != frame2.shape:
+        raise CaptureError("Frames have different shapes: %s, %s." %
+                           (frame1.shape, frame2.shape))
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    b1 = _blocks(gray(frame1), block)
+    b2 = _blocks(gray(frame2), block)
+    mu1 = b1.mean(axis=2)
+    mu2 = b2.mean(axis=2)
+    var1 = b1.var(axis=2)
+    var2 = b2.var(axis=2)
+    cov = (b1 * b2).mean(axis=2) - mu1 * mu2
+    return (((2 * mu1 * mu2 + c1) * (2 * cov + c2)) /
+            ((mu1 ** 2 + mu2 ** 2 + c1) * (var1 + var2 + c2)))
+
+
+def compare_displays(test, block=BLOCK):
+    """Grab guest and client frames and compare guest display with its
+    presentation in remote-viewer.
+
+    Parameters
+    ----------
+    test : ClientGuestTest
+        Spice test object.
+    block : int
+        Region side in pixels.
+
+    Returns
+    -------
+    tuple
+        (similarity, region diff array).
+
+    """
+    frame_g = grab(test.vmi_g)
+    view_c = client_view(test.vmi_c, frame_g)
+    sim = similarity(frame_g, view_c, block)
+    diff = region_diff(frame_g, view_c, block)
+    logger.info("Display similarity: %.4f, max region diff: %.1f.", sim,
+                diff.max() if diff.size else 0)
+    return sim, diff
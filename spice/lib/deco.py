@@ -40,6 +40,8 @@ import time
 import logging
 import functools
 
+from spice.lib import trace
+
 logger = logging.getLogger(__name__)
 
 
@@ -93,6 +95,7 @@ def retry(max_tries, delay=1, backoff=2, exceptions=(Exception,), hook=None):
                     if tries_remaining > 0:
                         if hook is not None:
                             hook(tries_remaining, e, mydelay)
+                        trace.current().add("retries")
                         logger.info("\"%s(...)\" had exception %s. Retry #%s.",
                                     func.__name__, type_,
                                     max_tries-tries_remaining)
@@ -128,8 +131,7 @@ def log(level=logging.DEBUG, name=None, message=None):
             f_result = func(*args, **kwargs)
             end = time.time()
             logger_dst.info("Exiting %s", logmsg)
-            logger_dst.log(level, func.__name__, "time ", end-start)
-            logger_dst.log(level, logmsg)
+            logger_dst.log(level, "%s time: %.3f s", logmsg, end - start)
             return f_result
         return wrapper
     return decorate
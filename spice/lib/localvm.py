@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Stand-in VM backed by a local shell.
+
+LocalVM has the part of qemu_vm.VM API used by SpiceTest and vm_actions*:
+wait_for_login() opens a local bash in an aexpect.ShellSession, files are
+copied on the local file system, send_key() and monitor commands are kept in
+lists. Every VM gets a private directory used as HOME, TMPDIR and working
+dir; the shell starts with an empty environment. No libvirt, QEMU or images
+are needed, so session, dispatch and batching code can be benchmarked on
+any Linux host.
+
+It is not a container: guest paths are host paths, commands run as the
+current user.
+
+Example
+-------
+
+    env = localvm.LocalEnv(params)
+    test = stest.ClientGuestTest(vt_test, params, env)
+    act.run(test.vmi_c, "uname -a")
+    env.destroy()
+
+"""
+
+import os
+import shutil
+import logging
+import tempfile
+
+import aexpect
+
+from virttest import virt_vm
+
+from spice.lib import utils
+
+logger = logging.getLogger(__name__)
+
+PROMPT = r"localvm\$ $"
+"""Prompt of local shell, see PS1 in LocalVM.shell_command()."""
+PPM_BLACK = b"P6\n1 1\n255\n\x00\x00\x00"
+"""screendump() result: black 1x1 image in QEMU screendump format."""
+
+
+class LocalMonitor(object):
+    """QEMU monitor of LocalVM. Commands are stored to `commands`."""
+
+    def __init__(self, vm):
+        self.vm = vm
+        self.commands = []
+
+    def human_monitor_cmd(self, cmd="", timeout=None, debug=True, fd=None):
+        self.commands.append(cmd)
+        return ""
+
+    def cmd(self, cmd, args=None, timeout=None, debug=True, fd=None):
+        self.commands.append((cmd, args))
+        return {}
+
+    def info(self, what, debug=True):
+        self.commands.append("info %s" % what)
+        if what == "spice":
+            return ("Server:\n"
+                    "     address: 127.0.0.1:%s\n"
+                    "     migrated: false\n"
+                    "Clients: 0\n" % self.vm.get_spice_var("spice_port"))
+        if what == "status":
+            return "VM status: %s" % ("running" if self.vm.is_alive()
+                                      else "paused")
+        return ""
+
+    def screendump(self, filename, debug=True):
+        self.commands.append("screendump %s" % filename)
+        with open(filename, 'wb') as fd:
+            fd.write(PPM_BLACK)
+
+    def system_powerdown(self):
+        self.commands.append("system_powerdown")
+        self.vm.destroy()
+
+
+class LocalVM(object):
+    """VM stand-in.
+
+    Parameters
+    ----------
+    name : str
+        VM name.
+    params : dict
+        VM params, as returned by Params.object_params(name).
+    root : str
+        Directory for the private dir of VM, default is a new temporary dir.
+    """
+
+    is_linux = utils.vm_is_linux
+    is_win = utils.vm_is_win
+    is_rhel6 = utils.vm_is_rhel6
+    is_rhel7 = utils.vm_is_rhel7
+    is_rhel8 = utils.vm_is_rhel8
+    info = utils.vm_info
+    error = utils.vm_error
+
+    def __init__(self, name, params, root=None):
+        self.name = name
+        self.params = params
+        self.home = tempfile.mkdtemp(prefix="localvm-%s-" % name, dir=root)
+        self.monitor = LocalMonitor(self)
+        self.keys = []
+        """Keys sent by send_key()."""
+        self.sessions = []
+        self.spice_options = dict(
+            (key, val) for key, val in params.items()
+            if key.startswith("spice_"))
+        self.spice_options.setdefault("spice_port", "5900")
+        self._alive = True
+
+    def shell_command(self):
+        """Command line of a login shell."""
+        return ("cd %s && exec env -i HOME=%s TMPDIR=%s PATH=%s TERM=dumb "
+                "PS1='localvm$ ' /bin/bash --norc --noprofile" %
+                (utils.quote(self.home), utils.quote(self.home),
+                 utils.quote(self.home),
+                 utils.quote(os.environ.get("PATH", "/usr/bin:/bin"))))
+
+    def wait_for_login(self, nic_index=0, timeout=None, internal_timeout=None,
+                       serial=False, restart_network=False, username=None,
+                       password=None):
+        """Open a new local shell. Credentials are ignored."""
+        self.verify_alive()
+        ssn = aexpect.ShellSession(self.shell_command(), auto_close=True,
+                                   prompt=PROMPT)
+        ssn.read_up_to_prompt(timeout=timeout or 10)
+        self.sessions.append(ssn)
+        return ssn
+
+    login = wait_for_login
+
+    def reboot(self, session=None, method="shell", nic_index=0,
+               timeout=None, serial=False):
+        self._close_sessions()
+        return self.wait_for_login(timeout=timeout)
+
+    def _close_sessions(self):
+        for ssn in self.sessions:
+            ssn.close()
+        self.sessions = []
+
+    def destroy(self, gracefully=True, free_mac_addresses=True):
+        self._close_sessions()
+        self._alive = False
+
+    def cleanup(self):
+        """Destroy VM and remove its private dir."""
+        self.destroy()
+        shutil.rmtree(self.home, ignore_errors=True)
+
+    def is_alive(self):
+        return self._alive
+
+    def is_dead(self):
+        return not self._alive
+
+    def verify_alive(self):
+        if not self._alive:
+            raise virt_vm.VMDeadError("LocalVM %s is destroyed." % self.name)
+
+    def get_params(self):
+        return self.params
+
+    def get_spice_var(self, spice_var):
+        return self.spice_options.get(spice_var)
+
+    def get_address(self, index=0):
+        return "127.0.0.1"
+
+    def get_port(self, port, nic_index=0):
+        return int(port)
+
+    def send_key(self, keystr):
+        self.keys.append(keystr)
+
+    @staticmethod
+    def _copy(src, dst):
+        if os.path.isdir(src):
+            if os.path.isdir(dst):
+                dst = os.path.join(dst, os.path.basename(src.rstrip('/')))
+            shutil.copytree(src, dst)
+        else:
+            shutil.copy(src, dst)
+
+    def copy_files_to(self, host_path, guest_path, nic_index=0, limit="",
+                      verbose=False, timeout=None, username=None,
+                      password=None):
+        self.verify_alive()
+        self._copy(host_path, guest_path)
+
+    def copy_files_from(self, guest_path, host_path, nic_index=0, limit="",
+                        verbose=False, timeout=None, username=None,
+                        password=None):
+        self.verify_alive()
+        self._copy(guest_path, host_path)
+
+
+class LocalEnv(object):
+    """avocado-vt env with a LocalVM per VM in `vms` param.
+
+    Parameters
+    ----------
+    params : virttest.utils_params.Params
+        Test params.
+    root : str
+        Directory for private dirs of VMs.
+    """
+
+    def __init__(self, params, root=None):
+        self.vms = {}
+        for name in params.get("vms", "").split():
+            vm_params = params.object_params(name)
+            self.vms[name] = LocalVM(name, vm_params, root)
+
+    def get_vm(self, name):
+        return self.vms.get(name)
+
+    def get_all_vms(self):
+        return list(self.vms.values())
+
+    def register_vm(self, name, vm):
+        self.vms[name] = vm
+
+    def destroy(self):
+        """Close sessions and remove private dirs of all VMs."""
+        for vm in self.vms.values():
+            vm.cleanup()
@@ -0,0 +1,390 @@
+#!/usr/bin/env python
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Run variants of a cartesian config on K (client, guest) pairs at once.
+
+A pair is one avocado job at a time with its own env file. Its VMs run with
+``image_snapshot = yes``, so all pairs boot from the same images and nothing
+is written to them. Backup and restore of images are off as well: a pair
+must not copy over an image that other pairs run from. Variants of
+SERIAL_TYPES modify images; they run first, one after another, without
+snapshot.
+
+Ports:
+
+    - ``spice_port = generate`` and ``spice_tls_port = generate`` are
+      replaced by ports from a window of the pair, so pairs never race for
+      a free port. Ports taken by other processes on the host are skipped.
+    - A variant with a fixed port, e.g. ``spice_port = 3000`` of vm_listen
+      tests, holds the port while it runs; other variants with the same port
+      wait.
+
+Variants are handed to pairs longest first. Expected durations are read from
+DURATIONS_FILE, updated after every run; unknown variants take
+DEFAULT_DURATION. Each pair writes avocado results to <outdir>/pair-<n>/,
+a merged summary goes to <outdir>/results.json.
+
+Example
+-------
+
+    $ python -m spice.lib.pairsched -c spice/cfg/run.cfg -k 4 -o /tmp/results
+    $ python -m spice.lib.pairsched -c spice/cfg/run.cfg -k 4 --dry-run
+
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import time
+import socket
+import logging
+import argparse
+import threading
+import subprocess
+import collections
+
+logger = logging.getLogger(__name__)
+
+SERIAL_TYPES = ("build", "unattended_install", "rv_setup", "rv_build_install",
+                "smartcard_setup")
+"""Test types that write to VM images."""
+PORT_BASE = 6000
+"""First port of pair windows."""
+PORT_WINDOW = 20
+"""Ports per pair."""
+PORT_KEY_RE = re.compile(r'^spice_(tls_)?port(_\w+)?$')
+"""spice_port, spice_tls_port and their per VM variants, e.g.
+spice_port_guest."""
+DEFAULT_DURATION = 600.0
+"""Expected duration of a variant that was never run, in seconds."""
+DURATIONS_FILE = os.path.expanduser("~/.cache/tp-spice/durations.json")
+"""Measured durations: variant name -> seconds."""
+AVOCADO = "avocado"
+"""avocado binary."""
+
+Variant = collections.namedtuple('Variant', ['name', 'type', 'fixed_ports',
+                                             'generated', 'serial'])
+"""Variant of a cartesian config.
+
+fixed_ports: ports held while the variant runs; generated: keys with
+'generate' value."""
+
+Result = collections.namedtuple('Result', ['variant', 'pair', 'status',
+                                           'duration', 'logdir'])
+
+
+def _fixed_port(value):
+    try:
+        port = int(value)
+    except (TypeError, ValueError):
+        return None
+    return port if 0 < port < 65536 else None
+
+
+def variant_from_params(params):
+    """Create Variant from a dict of the cartesian parser."""
+    fixed = set()
+    generated = []
+    for key, value in params.items():
+        if not PORT_KEY_RE.match(key):
+            continue
+        if value == "generate":
+            generated.append(key)
+        elif _fixed_port(value):
+            fixed.add(_fixed_port(value))
+    test_type = params.get("type", "")
+    return Variant(params["name"], test_type, frozenset(fixed),
+                   tuple(sorted(generated)), test_type in SERIAL_TYPES)
+
+
+def load_variants(cfg_path, only=None):
+    """Parse cartesian config.
+
+    Parameters
+    ----------
+    cfg_path : str
+        Config, e.g. spice/cfg/run.cfg.
+    only : list
+        Extra `only` filters.
+
+    Returns
+    -------
+    list
+        Variant instances in config order.
+    """
+    from virttest import cartesian_config
+    parser = cartesian_config.Parser()
+    parser.parse_file(cfg_path)
+    for flt in only or ():
+        parser.parse_string("only %s" % flt)
+    return [variant_from_params(params) for params in parser.get_dicts()]
+
+
+def load_durations(path=DURATIONS_FILE):
+    try:
+        with open(path) as fd:
+            return json.load(fd)
+    except (IOError, ValueError):
+        return {}
+
+
+def save_durations(durations, results, path=DURATIONS_FILE):
+    """Merge measured durations into the file, average with the old value.
+    """
+    for res in results:
+        old = durations.get(res.variant.name)
+        durations[res.variant.name] = (res.duration if old is None
+                                       else (old + res.duration) / 2)
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as fd:
+        json.dump(durations, fd, indent=4, sort_keys=True)
+
+
+def port_free(port):
+    """Test if nothing on the host listens on TCP port."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.bind(('', port))
+    except socket.error:
+        return False
+    finally:
+        sock.close()
+    return True
+
+
+def pair_params(variant, pair, snapshot=True):
+    """Params of a variant run on a pair.
+
+    Returns
+    -------
+    list
+        'key=value' strings for --vt-extra-params.
+
+    Raises
+    ------
+    RuntimeError
+        Not enough free ports in the window of the pair.
+    """
+    params = ["env=env-pair%d" % pair]
+    if snapshot:
+        params += ["image_snapshot=yes", "restore_image_after_testing=no",
+                   "backup_image_before_testing=no"]
+    start = PORT_BASE + pair * PORT_WINDOW
+    ports = (port for port in range(start, start + PORT_WINDOW)
+             if port_free(port))
+    for key in variant.generated:
+        port = next(ports, None)
+        if port is None:
+            raise RuntimeError("pair-%d: no free port for %s in %d-%d." %
+                               (pair, key, start, start + PORT_WINDOW - 1))
+        params.append("%s=%d" % (key, port))
+    return params
+
+
+def avocado_cmd(variant, pair, cfg_path, logdir, snapshot=True):
+    return ([AVOCADO, "run", "--vt-config", cfg_path,
+             "--job-results-dir", logdir, "--vt-extra-params"] +
+            pair_params(variant, pair, snapshot) + ["--", variant.name])
+
+
+def job_status(logdir, returncode):
+    """Status from avocado results.json in logdir, else from return code."""
+    statuses = []
+    for path in glob.glob(os.path.join(logdir, "*", "results.json")):
+        try:
+            with open(path) as fd:
+                statuses += [test["status"] for test in json.load(fd)["tests"]]
+        except (IOError, ValueError, KeyError):
+            continue
+    for status in ("ERROR", "FAIL", "INTERRUPTED", "CANCEL", "SKIP", "PASS"):
+        if status in statuses:
+            return status
+    return "PASS" if returncode == 0 else "ERROR"
+
+
+def run_variant(variant, pair, cfg_path, outdir, snapshot=True):
+    """Run one variant by avocado on a pair. Blocks until it ends."""
+    logdir = os.path.join(outdir, "pair-%d" % pair,
+                          re.sub(r'[^\w.-]+', '_', variant.name))
+    if not os.path.isdir(logdir):
+        os.makedirs(logdir)
+    cmd = avocado_cmd(variant, pair, cfg_path, logdir, snapshot)
+    logger.info("pair-%d: start %s", pair, variant.name)
+    start = time.time()
+    with open(os.path.join(logdir, "avocado.log"), 'w') as fd:
+        returncode = subprocess.call(cmd, stdout=fd, stderr=subprocess.STDOUT)
+    result = Result(variant, pair, job_status(logdir, returncode),
+                    time.time() - start, logdir)
+    logger.info("pair-%d: %s %s in %.0f s", pair, result.status,
+                variant.name, result.duration)
+    return result
+
+
+class Scheduler(object):
+    """Hand variants to pairs, longest expected first.
+
+    Parameters
+    ----------
+    variants : list
+        Variant instances, serial ones are not accepted.
+    pairs : int
+        Number of pairs.
+    durations : dict
+        Expected durations.
+    runner : callable
+        runner(variant, pair) -> Result.
+    """
+
+    def __init__(self, variants, pairs, durations, runner):
+        self.pairs = pairs
+        self.runner = runner
+        self.pending = sorted(
+            variants, key=lambda var: -durations.get(var.name,
+                                                     DEFAULT_DURATION))
+        self.results = []
+        self._held = set()
+        self._cond = threading.Condition()
+
+    def _take(self):
+        """Next variant whose fixed ports are free; None when all are done.
+        """
+        with self._cond:
+            while self.pending:
+                for idx, variant in enumerate(self.pending):
+                    if not variant.fixed_ports & self._held:
+                        self._held |= variant.fixed_ports
+                        return self.pending.pop(idx)
+                self._cond.wait()
+            return None
+
+    def _done(self, variant, result):
+        with self._cond:
+            self._held -= variant.fixed_ports
+            self.results.append(result)
+            self._cond.notify_all()
+
+    def _worker(self, pair):
+        while True:
+            variant = self._take()
+            if variant is None:
+                return
+            try:
+                result = self.runner(variant, pair)
+            except Exception as excp:  # pylint: disable=W0703
+                logger.error("pair-%d: %s: %s", pair, variant.name, excp)
+                result = Result(variant, pair, "ERROR", 0.0, None)
+            self._done(variant, result)
+
+    def run(self):
+        threads = [threading.Thread(target=self._worker, args=(pair,),
+                                    name="pair-%d" % pair)
+                   for pair in range(self.pairs)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.results
+
+
+def plan(variants, pairs, durations):
+    """Expected assignment: longest first to the least loaded pair.
+
+    Returns
+    -------
+    list
+        Per pair: (expected seconds, [variant names]).
+    """
+    loads = [[0.0, []] for _ in range(pairs)]
+    for variant in sorted(variants, key=lambda var: -durations.get(
+            var.name, DEFAULT_DURATION)):
+        load = min(loads, key=lambda item: item[0])
+        load[0] += durations.get(variant.name, DEFAULT_DURATION)
+        load[1].append(variant.name)
+    return [tuple(load) for load in loads]
+
+
+def merge(results, outdir, wall):
+    """Write <outdir>/results.json and log a summary.
+
+    Returns
+    -------
+    dict
+        Number of variants per status.
+    """
+    counts = collections.Counter(res.status for res in results)
+    with open(os.path.join(outdir, "results.json"), 'w') as fd:
+        json.dump({"wall": wall,
+                   "sum": sum(res.duration for res in results),
+                   "counts": counts,
+                   "tests": [{"name": res.variant.name, "pair": res.pair,
+                              "status": res.status, "time": res.duration,
+                              "logdir": res.logdir} for res in results]},
+                  fd, indent=4, sort_keys=True)
+    for res in sorted(results, key=lambda res: res.variant.name):
+        logger.info("%-8s %6.0f s  pair-%d  %s", res.status, res.duration,
+                    res.pair, res.variant.name)
+    logger.info("%d variants in %.0f s wall, %.0f s serial: %s",
+                len(results), wall, sum(res.duration for res in results),
+                ", ".join("%s %d" % item for item in sorted(counts.items())))
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m spice.lib.pairsched",
+                                     description=__doc__.split("\n")[0])
+    parser.add_argument("-c", "--config", required=True,
+                        help="cartesian config, e.g. spice/cfg/run.cfg")
+    parser.add_argument("-k", "--pairs", type=int, default=2,
+                        help="number of (client, guest) pairs")
+    parser.add_argument("-o", "--outdir", default="sched-results")
+    parser.add_argument("--only", action="append",
+                        help="extra cartesian filter, can be repeated")
+    parser.add_argument("--durations", default=DURATIONS_FILE)
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print expected assignment and exit")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO,
+                        format="%(asctime)s %(threadName)s %(message)s")
+    variants = load_variants(args.config, args.only)
+    durations = load_durations(args.durations)
+    serial = [var for var in variants if var.serial]
+    parallel = [var for var in variants if not var.serial]
+    if args.dry_run:
+        for var in serial:
+            logger.info("serial: %s", var.name)
+        for pair, (load, names) in enumerate(plan(parallel, args.pairs,
+                                                  durations)):
+            logger.info("pair-%d: %d variants, %.0f s expected", pair,
+                        len(names), load)
+            for name in names:
+                logger.info("    %s", name)
+        return 0
+    if not os.path.isdir(args.outdir):
+        os.makedirs(args.outdir)
+    start = time.time()
+    results = [run_variant(var, 0, args.config, args.outdir, snapshot=False)
+               for var in serial]
+    results += Scheduler(
+        parallel, args.pairs, durations,
+        lambda var, pair: run_variant(var, pair, args.config,
+                                      args.outdir)).run()
+    save_durations(durations, results, args.durations)
+    counts = merge(results, args.outdir, time.time() - start)
+    return 0 if set(counts) <= set(["PASS", "SKIP", "CANCEL"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Parsers of command output read from VMs. They depend only on the standard
+library, so they are benchmarked without a VM, see spice.bench.
+
+"""
+
+import re
+
+KLOGGER_KEY_RE = re.compile(
+    r'KeyPress.*\n.*\n.* keycode (\d*) \(keysym ([0-9A-Fa-fx]*)')
+"""KeyPress event of 'xev' output: keycode and keysym."""
+
+
+def ss_links(ss_out, ports):
+    """Count links of ports in 'ss -n -p -t state all' output.
+
+    Parameters
+    ----------
+    ss_out : str
+        Output of ss, filtered to RV connections.
+    ports : list
+        Ports as strings; empty values are skipped.
+
+    Returns
+    -------
+    tuple
+        (dict port -> number of occurrences, first port with a link not in
+        ESTAB state or None)
+    """
+    counts = dict((port, ss_out.count(port)) for port in ports if port)
+    for line in ss_out.split('\n'):
+        if "ESTAB" in line:
+            continue
+        for port in ports:
+            if port and port in line:
+                return counts, port
+    return counts, None
+
+
+def parse_xev_keys(output):
+    """Pressed keys from 'xev -event keyboard' output.
+
+    Returns
+    -------
+    list
+        List of (keycode, keysym) tuples.
+    """
+    return [(int(keycode), int(keysym, base=16))
+            for (keycode, keysym) in KLOGGER_KEY_RE.findall(output)]
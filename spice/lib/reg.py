@@ -37,7 +37,12 @@ Example
 
 """
 
+import os
+import ast
+import sys
+import hashlib
 import logging
+import importlib
 from zope import interface  # pylint: disable=F0401
 from zope.interface import adapter
 
@@ -46,6 +51,18 @@ logger = logging.getLogger(__name__)
 logger.info("Create a new Zope registry.")
 registry = adapter.AdapterRegistry()
 
+ACTION_MODULES = ("spice.lib.vm_actions",
+                  "spice.lib.vm_actions_linux",
+                  "spice.lib.vm_actions_rv",
+                  "spice.lib.vm_actions_ovirt")
+"""Modules with actions. They are imported on first dispatch of an action
+they define, see load_actions()."""
+INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "action_index.py")
+"""Precomputed action index: action name -> [(module, required ifaces)]."""
+INDEX_WIDTH = 79
+"""Max line length of the generated index."""
+
 
 # pylint: disable=E0239,E0211,W0222
 class IVmAction(interface.Interface):
@@ -81,10 +98,165 @@ def add_action(req, name=None):
         if not action_name:
             action_name = action.__name__
         registry.register(req, IVmAction, action_name, action)
-        logger.info("Add VM action: %s for %s.", action_name, repr(req))
+        logger.debug("Add VM action: %s for %s.", action_name, repr(req))
         # Next code is not necessary, it stays only for informative purposes.
         provides = list(interface.directlyProvidedBy(action))
         provides.append(IVmAction)
         interface.directlyProvides(action, provides)
         return action
     return builder
+
+
+def _decorated_actions(tree):
+    """Yield (name, required interface names) for every add_action() in a
+    parsed module.
+    """
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            continue
+        for deco in node.decorator_list:
+            if not (isinstance(deco, ast.Call) and
+                    getattr(deco.func, 'attr', getattr(deco.func, 'id', None))
+                    == 'add_action'):
+                continue
+            kwargs = dict((kw.arg, kw.value) for kw in deco.keywords)
+            req = kwargs.get('req', deco.args[0] if deco.args else None)
+            ifaces = tuple(getattr(elt, 'attr', getattr(elt, 'id', '?'))
+                           for elt in getattr(req, 'elts', ()))
+            name = kwargs.get('name', deco.args[1] if len(deco.args) > 1
+                              else None)
+            name = getattr(name, 's', getattr(name, 'value', None))
+            yield name or node.name, ifaces
+
+
+def _module_file(module):
+    lib_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(lib_dir, module.rsplit('.', 1)[-1] + '.py')
+
+
+def scan_actions(modules=ACTION_MODULES):
+    """Build action index from sources; action modules are parsed, not
+    imported.
+
+    Returns
+    -------
+    dict
+        Action name -> list of (module, required interface names).
+    """
+    index = {}
+    for module in modules:
+        fname = _module_file(module)
+        with open(fname) as fd:
+            tree = ast.parse(fd.read(), fname)
+        for name, ifaces in _decorated_actions(tree):
+            index.setdefault(name, []).append((module, ifaces))
+    return index
+
+
+def sources_digest(modules=ACTION_MODULES):
+    """Return SHA1 of sources of action modules. The index is stale when
+    it differs, e.g. a more specific override of a known action was added.
+    """
+    digest = hashlib.sha1()
+    for module in modules:
+        with open(_module_file(module), 'rb') as fd:
+            digest.update(fd.read())
+    return digest.hexdigest()
+
+
+def _format_index(index):
+    """Format index as lint-clean source: one entry per line, an entry with
+    many implementations has one of them per line.
+    """
+    lines = ['INDEX = {']
+    for name in sorted(index):
+        impls = ['(%r, %r)' % impl for impl in index[name]]
+        line = '    %r: [%s],' % (name, impls[0])
+        if len(impls) == 1 and len(line) <= INDEX_WIDTH:
+            lines.append(line)
+            continue
+        lines.append('    %r: [' % name)
+        for (module, ifaces), impl in zip(index[name], impls):
+            if len(impl) + 9 <= INDEX_WIDTH:
+                lines.append('        %s,' % impl)
+            else:
+                lines.append('        (%r,' % module)
+                lines.append('         %r),' % (ifaces,))
+        lines.append('    ],')
+    lines.append('}')
+    return '\n'.join(lines)
+
+
+def write_index(fname=INDEX_FILE):
+    """Write precomputed action index. Run it after actions are changed:
+
+        python -m spice.lib.reg
+
+    """
+    with open(fname, 'w') as fd:
+        fd.write('"""Action index generated by: python -m spice.lib.reg\n'
+                 'Do not edit.\n"""\n\nDIGEST = %r\n"""SHA1 of sources the '
+                 'index is built from."""\n%s\n' %
+                 (sources_digest(), _format_index(scan_actions())))
+    logger.info("Action index is written to: %s.", fname)
+
+
+_INDEX = None
+
+
+def action_index():
+    """Return action index. Precomputed one is used if present and built
+    from the current sources, otherwise sources are scanned.
+    """
+    global _INDEX  # pylint: disable=W0603
+    if _INDEX is None:
+        try:
+            from spice.lib import action_index as precomputed
+        except ImportError:
+            logger.debug("No precomputed action index, scan sources.")
+            _INDEX = scan_actions()
+            return _INDEX
+        if getattr(precomputed, 'DIGEST', None) == sources_digest():
+            _INDEX = precomputed.INDEX
+        else:
+            logger.warning("Action index is stale, scan sources. Update it "
+                           "by: python -m spice.lib.reg")
+            _INDEX = scan_actions()
+    return _INDEX
+
+
+def _import(modules):
+    new = [module for module in modules if module not in sys.modules]
+    for module in new:
+        logger.debug("Load actions from: %s.", module)
+        importlib.import_module(module)
+    return new
+
+
+def load_actions(name):
+    """Import modules that define action `name`.
+
+    Returns
+    -------
+    list
+        Newly imported modules.
+    """
+    return _import(sorted(set(module for module, _ in
+                              action_index().get(name, ()))))
+
+
+def load_all():
+    """Import all action modules. Used when the index doesn't know an
+    action, e.g. it is stale.
+
+    Returns
+    -------
+    list
+        Newly imported modules.
+    """
+    return _import(ACTION_MODULES)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    write_index()
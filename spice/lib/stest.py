@@ -15,11 +15,16 @@
 """Default values used in spice tests.
 """
 
-import logging
 import pprint
+import difflib
+import functools
+import logging
+import multiprocessing.util
 from spice.lib import reg
 from spice.lib import utils
-from virttest import virt_vm
+from spice.lib import trace
+from spice.lib import transcript
+from spice.lib import vmsnap
 
 
 logger = logging.getLogger(__name__)
@@ -62,21 +67,145 @@ KVM_SPICE_KNOWN_PARAMS = [
 
 class AttributeDict(dict):
     """Dictionary class derived from standard dict. Reffer to keys as obj.key.
+
+    Attribute access returns a value coerced by utils.is_yes() - 1/0 for
+    yes/no values, the string itself otherwise, "" for a missing key. Coerced
+    values are parsed once per key and cached; the cache entry is dropped
+    when the key is changed. Typed values are available with as_bool(),
+    as_int() and as_list().
+
+    Missing keys read as attributes are remembered. A key that looks like a
+    misspelled existing key is reported once, see report().
     """
     # http://stackoverflow.com/questions/4984647/
-    __setattr__ = dict.__setitem__
+    __slots__ = ("_cache", "_missing")
+
+    def __init__(self, *args, **kwargs):
+        object.__setattr__(self, "_cache", {})
+        object.__setattr__(self, "_missing", set())
+        super(AttributeDict, self).__init__(*args, **kwargs)
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self),))
 
     def __getattr__(self, key):
-        if key in ["__getstate__", "__setstate__", "__slots__"]:
-            raise AttributeError()
+        if key.startswith("__") and key.endswith("__"):
+            raise AttributeError(key)  # E.g. __deepcopy__, not a config key.
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
         try:
             item = dict.__getitem__(self, key)
         except KeyError:
-            item = ""
+            self._report_missing(key)
+            return ""
         try:
-            return utils.is_yes(item)
+            value = utils.is_yes(item)
         except ValueError:
-            return item
+            value = item
+        self._cache[key] = value
+        return value
+
+    def _report_missing(self, key):
+        if key in self._missing:
+            return
+        self._missing.add(key)
+        close = difflib.get_close_matches(key, self.keys(), n=1, cutoff=0.85)
+        if close:
+            logger.warning("Config key %s is not set. Misspelled %s?", key,
+                           close[0])
+
+    def _typed(self, kind, key, parse):
+        cache_key = (kind, key)
+        try:
+            return self._cache[cache_key]
+        except KeyError:
+            pass
+        value = parse(dict.get(self, key, ""))
+        self._cache[cache_key] = value
+        return value
+
+    def _drop(self, key):
+        for cache_key in (key, ("bool", key), ("int", key), ("list", key)):
+            self._cache.pop(cache_key, None)
+
+    def __setitem__(self, key, value):
+        self._drop(key)
+        super(AttributeDict, self).__setitem__(key, value)
+
+    __setattr__ = __setitem__
+
+    def __delitem__(self, key):
+        self._drop(key)
+        super(AttributeDict, self).__delitem__(key)
+
+    def update(self, *args, **kwargs):
+        self._cache.clear()
+        super(AttributeDict, self).update(*args, **kwargs)
+
+    def pop(self, key, *args):
+        self._drop(key)
+        return super(AttributeDict, self).pop(key, *args)
+
+    def popitem(self):
+        self._cache.clear()
+        return super(AttributeDict, self).popitem()
+
+    def setdefault(self, key, default=None):
+        self._drop(key)
+        return super(AttributeDict, self).setdefault(key, default)
+
+    def clear(self):
+        self._cache.clear()
+        super(AttributeDict, self).clear()
+
+    def as_bool(self, key):
+        """Value as bool; False if the key is missing or not a yes/no value.
+        """
+        def parse(item):
+            try:
+                return bool(utils.is_yes(item))
+            except ValueError:
+                return False
+        return self._typed("bool", key, parse)
+
+    def as_int(self, key, default=None):
+        """Value as int, `default` if the key is missing or not a number."""
+        def parse(item):
+            try:
+                return int(item)
+            except (TypeError, ValueError):
+                return None
+        value = self._typed("int", key, parse)
+        return default if value is None else value
+
+    def as_list(self, key):
+        """Value split by white spaces, e.g. vms or spice_secure_channels.
+
+        Returns
+        -------
+        tuple
+            Items; empty if the key is missing.
+        """
+        return self._typed("list", key, lambda item: tuple(str(item).split()))
+
+    def report(self):
+        """Log keys that were read but are not set.
+
+        Returns
+        -------
+        dict
+            Missing key -> the closest existing key or None.
+        """
+        result = {}
+        for key in sorted(self._missing):
+            close = difflib.get_close_matches(key, self.keys(), n=1,
+                                              cutoff=0.85)
+            result[key] = close[0] if close else None
+            logger.info("Config key is read, but not set: %s%s.", key,
+                        " (misspelled %s?)" % close[0] if close else "")
+        return result
 
     def dump(self):
         for line in pprint.pformat(self).split('\n'):
@@ -86,25 +215,136 @@ class AttributeDict(dict):
 #        self.update(custom_dict)
 
 
+class LazyDict(dict):
+    """Dictionary with values built on first access.
+
+    Parameters
+    ----------
+    factories : dict
+        Key -> function without arguments that returns the value.
+    """
+
+    def __init__(self, factories=None):
+        super(LazyDict, self).__init__()
+        self._factories = dict(factories or {})
+
+    def __missing__(self, key):
+        factory = self._factories.pop(key)  # KeyError for an unknown key.
+        value = self[key] = factory()
+        return value
+
+    def __contains__(self, key):
+        return key in self._factories or dict.__contains__(self, key)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def add(self, key, factory):
+        """Add a value to be built on first access."""
+        dict.pop(self, key, None)
+        self._factories[key] = factory
+
+    def materialize(self):
+        """Build all values left."""
+        for key in list(self._factories):
+            self[key]  # pylint: disable=W0104
+        return self
+
+    def __iter__(self):
+        return iter(dict(self.materialize()))
+
+    def __len__(self):
+        return len(self._factories) + dict.__len__(self)
+
+    def keys(self):
+        return dict.keys(self.materialize())
+
+    def items(self):
+        return dict.items(self.materialize())
+
+    def values(self):
+        return dict.values(self.materialize())
+
+
+def spice_options(vm):
+    """SPICE server options of a VM in one pass.
+
+    avocado-vt keeps options used for QEMU command line in VM.spice_options,
+    they are copied at once. get_spice_var() is called per option only for a
+    VM without it.
+
+    Returns
+    -------
+    AttributeDict
+        Option from KVM_SPICE_KNOWN_PARAMS -> value or None.
+    """
+    opts = getattr(vm, "spice_options", None)
+    if isinstance(opts, dict):
+        kvm = AttributeDict((prm, opts.get(prm)) for prm in
+                            KVM_SPICE_KNOWN_PARAMS)
+    else:
+        kvm = AttributeDict((prm, vm.get_spice_var(prm)) for prm in
+                            KVM_SPICE_KNOWN_PARAMS)
+    logger.info("VM %s spice server options: %s.", vm.name,
+                ", ".join("%s=%s" % (prm, kvm[prm]) for prm in
+                          KVM_SPICE_KNOWN_PARAMS if kvm[prm]))
+    return kvm
+
+
+def report_config(cfg, cfg_vm):
+    """Log config keys that a test read, but are not set: the test config
+    and configs of VMs that were built.
+
+    Parameters
+    ----------
+    cfg : AttributeDict
+        Test config.
+    cfg_vm : LazyDict
+        VM name -> config.
+    """
+    for name, vm_cfg in [("test", cfg)] + sorted(dict.items(cfg_vm)):
+        missing = vm_cfg.report()
+        misspelled = [key for key, close in missing.items() if close]
+        if misspelled:
+            logger.warning("Config of %s: %d keys read, but not set; "
+                           "misspelled: %s.", name, len(missing),
+                           ", ".join(sorted(misspelled)))
+        elif missing:
+            logger.info("Config of %s: %d keys read, but not set.", name,
+                        len(missing))
+
+
 class VmInfo(object):
 
     def __init__(self, test, vm_name):
         self.test = test
-        self.cfg = test.cfg_vm[vm_name]     # VM config
         self.ccfg = test.cfg                # Common config
         self.vm = test.vms[vm_name]
         self.vm_name = vm_name
-        self.kvm = test.kvms[vm_name]
+
+    @property
+    def cfg(self):
+        """VM config."""
+        return self.test.cfg_vm[self.vm_name]
+
+    @property
+    def kvm(self):
+        """SPICE server options."""
+        return self.test.kvms[self.vm_name]
 
 
 class VmOvirtInfo(object):
 
     def __init__(self, test, vm_name):
         self.test = test
-        self.cfg = test.cfg_vm[vm_name]     # VM config
         self.ccfg = test.cfg                # Common config
         self.vm_name = vm_name
 
+    @property
+    def cfg(self):
+        """VM config."""
+        return self.test.cfg_vm[self.vm_name]
+
 
 class SpiceTest(object):
     """Perform some basic initialization steps.
@@ -133,44 +373,51 @@ class SpiceTest(object):
         self.cfg.update(parameters)
         self.vms = {}
         self.vt_test = test
-        vm_names = self.cfg.vms.split()
+        if self.cfg.as_bool("action_trace"):
+            trace.start(test.logdir)
+        if self.cfg.as_bool("transcript_record"):
+            transcript.start(test.logdir, test.name, parameters)
+        vm_names = self.cfg.as_list("vms")
         """Holds all VM objects."""
+        from virttest import virt_vm  # Not needed for AttributeDict.
         for name in vm_names:
-            self.vms[name] = env.get_vm(name)
+            self.vms[name] = transcript.wrap(name, env.get_vm(name))
             try:
                 self.vms[name].verify_alive()
             except virt_vm.VMDeadError as excp:
                 raise utils.SpiceTestFail(self,
                                           "Required VM is dead: %s" % excp)
-        self.kvms = {}
-        """Spice KVM options per VM."""
-        for name in vm_names:
-            self.kvms[name] = AttributeDict()
-            for prm in KVM_SPICE_KNOWN_PARAMS:
-                self.kvms[name][prm] = self.vms[name].get_spice_var(prm)
-                if self.kvms[name][prm]:
-                    logger.info("VM %s spice server option %s is %s.", name,
-                                prm, self.kvms[name][prm])
-        """Config set per VM."""
-        self.cfg_vm = {}
-        for name in vm_names:
-            self.cfg_vm[name] = AttributeDict()
-            self.cfg_vm[name].update(self.vms[name].get_params())
-        """Actions set per VM's OS."""
+        self.kvms = LazyDict(
+            (name, functools.partial(spice_options, self.vms[name]))
+            for name in vm_names)
+        """Spice KVM options per VM, built on first access."""
+        self.cfg_vm = LazyDict(
+            (name, functools.partial(AttributeDict,
+                                     self.vms[name].get_params()))
+            for name in vm_names)
+        """Config set per VM, built on first access."""
         self.vm_info = {}
+        """Actions set per VM's OS."""
         for name in vm_names:
             self.vm_info[name] = VmInfo(self, name)
+        if self.cfg.as_bool("vm_snapshot"):
+            vmsnap.restore(self, parameters)
         """Ovirt."""
-        vm_roles = self.cfg.ovirt_vms.split()
+        vm_roles = self.cfg.as_list("ovirt_vms")
         """Config set per Ovirt VM."""
         for name in vm_roles:
-            self.cfg_vm[name] = AttributeDict()
-            vm_role_cfg = parameters.object_params(name)
             # See env_process.py: process(..., postprocess_vm,...)
-            self.cfg_vm[name].update(vm_role_cfg)
+            self.cfg_vm.add(name, functools.partial(
+                lambda name: AttributeDict(parameters.object_params(name)),
+                name))
         """Actions set per Ovirt VM's OS."""
         for name in vm_roles:
             self.vm_info[name] = VmOvirtInfo(self, name)
+        # Keys are read until the test ends: report them on exit of the
+        # test process, the same way trace is finished.
+        multiprocessing.util.Finalize(None, report_config,
+                                      args=(self.cfg, self.cfg_vm),
+                                      exitpriority=10)
 
 
 class ClientGuestTest(SpiceTest):
@@ -205,7 +452,7 @@ class OneVMTest(SpiceTest):
     def __init__(self, test, parameters, env, name=None):
         super(OneVMTest, self).__init__(test, parameters, env)
         if not name:
-            name = self.cfg.vms.split()[0]
+            name = self.cfg.as_list("vms")[0]
         self.name = name
         self.vm = self.vms[name]
         self.kvm = self.kvms[name]
@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Timing of actions.
+
+With ``action_trace = yes`` in test config every act.<name>() call is
+recorded as a span: action name, VM, OS interface of the chosen
+implementation, duration, retries and bytes of command output. Commands and
+logins in VMs get their own nested spans. Bytes of output are cumulative: a
+span counts the output of its nested spans too, e.g. an action counts the
+output of all commands it ran.
+
+Spans are written to <logdir>/action_trace.json in Chrome trace event format,
+open it in chrome://tracing or https://ui.perfetto.dev. Every span is written
+when it ends, so a test killed by timeout still leaves a readable trace. When
+the test process exits, a summary table per action is logged and written to
+<logdir>/action_trace.txt.
+
+With tracing off span() returns a shared no-op object.
+
+Example
+-------
+
+    with trace.span("copy_logs", trace.CAT_CMD, vm=vmi.vm_name) as span:
+        out = ...
+        span.add("out_bytes", len(out))
+
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import multiprocessing.util
+
+logger = logging.getLogger(__name__)
+
+TRACE_FILE = "action_trace.json"
+"""Chrome trace events, name in test logdir."""
+SUMMARY_FILE = "action_trace.txt"
+"""Summary table, name in test logdir."""
+CAT_ACTION = "action"
+CAT_CMD = "cmd"
+CAT_SSN = "ssn"
+
+_tracer = None
+_local = threading.local()
+
+
+def _stack():
+    try:
+        return _local.stack
+    except AttributeError:
+        _local.stack = []
+        return _local.stack
+
+
+class _NullSpan(object):
+    """Span used when tracing is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, key, value):
+        pass
+
+    def add(self, key, num=1):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span(object):
+    """Timed block of code. Use it as a context manager."""
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'start')
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = None
+
+    def set(self, key, value):
+        """Set span argument."""
+        self.args[key] = value
+
+    def add(self, key, num=1):
+        """Add num to a counter argument, e.g. retries."""
+        self.args[key] = self.args.get(key, 0) + num
+
+    def __enter__(self):
+        _stack().append(self)
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.time()
+        stack = _stack()
+        stack.pop()
+        nbytes = self.args.get('out_bytes')
+        if nbytes and stack:
+            stack[-1].add('out_bytes', nbytes)  # Parent includes children.
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.record(self, end)
+        return False
+
+
+class Tracer(object):
+    """Writer of spans of one test.
+
+    Parameters
+    ----------
+    logdir : str
+        Test log directory.
+    """
+
+    def __init__(self, logdir):
+        self.trace_path = os.path.join(logdir, TRACE_FILE)
+        self.summary_path = os.path.join(logdir, SUMMARY_FILE)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._tids = set()
+        self._stats = {}
+        self._events = 0
+        # Line buffered: every span reaches the file when it ends.
+        self._fd = open(self.trace_path, 'w', 1)
+        self._fd.write("[\n")
+
+    def _write(self, event):
+        if self._events:
+            self._fd.write(",\n")
+        self._fd.write(json.dumps(event, default=str))
+        self._events += 1
+
+    def record(self, span, end):
+        """Write span and account it in the summary."""
+        dur = end - span.start
+        thread = threading.current_thread()
+        with self._lock:
+            if self._fd is None:
+                return
+            if thread.ident not in self._tids:
+                self._tids.add(thread.ident)
+                self._write({"name": "thread_name", "ph": "M",
+                             "pid": self._pid, "tid": thread.ident,
+                             "args": {"name": thread.name}})
+            self._write({"name": span.name, "cat": span.cat, "ph": "X",
+                         "ts": int(span.start * 1e6), "dur": int(dur * 1e6),
+                         "pid": self._pid, "tid": thread.ident,
+                         "args": span.args})
+            stat = self._stats.setdefault((span.cat, span.name),
+                                          [0, 0.0, 0.0, 0, 0])
+            stat[0] += 1
+            stat[1] += dur
+            stat[2] = max(stat[2], dur)
+            stat[3] += span.args.get('retries', 0)
+            stat[4] += span.args.get('out_bytes', 0)
+
+    def summary(self):
+        """Summary table, the slowest actions first. Out bytes are
+        cumulative, they include output of nested spans.
+
+        Returns
+        -------
+        list
+            Lines of the table.
+        """
+        rows = sorted(self._stats.items(), key=lambda item: -item[1][1])
+        width = max([len(name) for (_, name) in self._stats] + [6])
+        lines = ["%-6s %-*s %6s %9s %9s %9s %7s %10s" % (
+            "cat", width, "action", "calls", "total s", "mean ms", "max ms",
+            "retries", "out bytes")]
+        for (cat, name), (calls, total, peak, retries, nbytes) in rows:
+            lines.append("%-6s %-*s %6d %9.3f %9.1f %9.1f %7d %10d" % (
+                cat, width, name, calls, total, total / calls * 1e3,
+                peak * 1e3, retries, nbytes))
+        return lines
+
+    def close(self):
+        """Terminate trace file, write and log the summary."""
+        with self._lock:
+            if self._fd is None:
+                return
+            self._fd.write("\n]\n")
+            self._fd.close()
+            self._fd = None
+        lines = self.summary()
+        with open(self.summary_path, 'w') as fd:
+            fd.write("\n".join(lines) + "\n")
+        logger.info("Action trace: %s\n%s", self.trace_path, "\n".join(lines))
+
+
+def start(logdir):
+    """Start tracing to logdir. Trace is finished when the process exits.
+    """
+    global _tracer  # pylint: disable=W0603
+    finish()
+    _tracer = Tracer(logdir)
+    # avocado runs a test in a multiprocessing child, atexit is not called
+    # there; multiprocessing finalizers run in children and in main process.
+    multiprocessing.util.Finalize(None, finish, exitpriority=10)
+
+
+def finish():
+    """Stop tracing and write the summary. Can be called more times."""
+    global _tracer  # pylint: disable=W0603
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.close()
+
+
+def enabled():
+    return _tracer is not None
+
+
+def span(name, cat=CAT_ACTION, **args):
+    """Return a new span, or a no-op span if tracing is off.
+
+    Parameters
+    ----------
+    name : str
+        Span name, e.g. action name.
+    cat : str
+        Category: CAT_ACTION, CAT_CMD, CAT_SSN.
+    args
+        Span arguments, e.g. vm name.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return NULL_SPAN
+    return Span(tracer, name, cat, args)
+
+
+def current():
+    """Innermost open span of this thread; no-op span if there is none."""
+    if _tracer is None:
+        return NULL_SPAN
+    stack = _stack()
+    return stack[-1] if stack else NULL_SPAN
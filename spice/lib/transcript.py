@@ -0,0 +1,471 @@
+#!/usr/bin/env python
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Record what a test does with VMs and replay it without VMs.
+
+With ``transcript_record = yes`` in test config, VM objects of SpiceTest are
+wrapped by a recording proxy. Every method call and attribute read on a VM
+and on objects it returns - shell sessions from wait_for_login(), QEMU
+monitor - is written to <logdir>/transcript.jsonl.gz: arguments, result or
+raised exception and duration. Results that are not plain data are recorded
+as references to new proxied objects. Test params are stored in the header.
+
+Replay runs a test function against a transcript. VMs and sessions are
+replaced by objects that answer from the transcript:
+
+    $ python -m spice.lib.transcript transcript.jsonl.gz spice.tests.rv_chk_con
+
+A call is matched by object, method and arguments, in recorded order. A call
+repeated more times than it was recorded returns the last recorded result,
+so polling loops end. With strict=False a call with other arguments, e.g.
+a command with a timestamp, takes the next recorded call of the method.
+time.sleep() advances a virtual clock instead of sleeping, so a replay takes
+milliseconds.
+
+Files copied from VMs to the host are not recreated by replay.
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import logging
+import tempfile
+import importlib
+import threading
+import collections
+import multiprocessing.util
+
+from spice.lib import utils
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPT_FILE = "transcript.jsonl.gz"
+"""Transcript name in test logdir."""
+VERSION = 1
+"""Version of transcript format."""
+
+_DATA = (type(None), bool, int, float, str, bytes, list, tuple, dict)
+try:
+    _DATA += (long, unicode)  # pylint: disable=E0602
+except NameError:
+    pass
+
+_recorder = None
+
+
+class TranscriptError(utils.SpiceUtilsError):
+    """Replay cannot continue: call is not in the transcript."""
+
+
+def _dumps(obj):
+    try:
+        return json.dumps(obj, sort_keys=True, default=repr)
+    except (UnicodeDecodeError, ValueError):
+        return json.dumps(repr(obj))
+
+
+def _key(args, kwargs):
+    return _dumps([args, kwargs])
+
+
+def _data(value):
+    """JSON-safe copy of plain data; undecodable bytes are decoded as
+    latin-1, unknown objects are replaced by repr().
+    """
+    if isinstance(value, bytes) and not isinstance(value, str):
+        return value.decode('latin-1')
+    if isinstance(value, str) and str is bytes:
+        try:
+            value.decode('utf-8')
+            return value
+        except UnicodeDecodeError:
+            return value.decode('latin-1')
+    if isinstance(value, (list, tuple)):
+        return [_data(item) for item in value]
+    if isinstance(value, dict):
+        return dict((str(key), _data(val)) for key, val in value.items())
+    if isinstance(value, _DATA):
+        return value
+    return repr(value)
+
+
+def _native(obj):
+    """Python 2 json returns unicode, the code expects str."""
+    if str is bytes:
+        if isinstance(obj, unicode):  # pylint: disable=E0602
+            return obj.encode('utf-8')
+        if isinstance(obj, list):
+            return [_native(item) for item in obj]
+        if isinstance(obj, dict):
+            return dict((_native(key), _native(val))
+                        for key, val in obj.items())
+    return obj
+
+
+def _exc_info(excp):
+    cls = type(excp)
+    return {"cls": "%s.%s" % (cls.__module__, cls.__name__),
+            "args": _data(excp.args),
+            "attrs": _data(vars(excp))}
+
+
+def _exc_rebuild(info):
+    """Recreate recorded exception without calling its __init__."""
+    module, _, name = info["cls"].rpartition(".")
+    try:
+        cls = getattr(importlib.import_module(module), name)
+        excp = cls.__new__(cls)
+        excp.args = tuple(info["args"])
+        excp.__dict__.update(info["attrs"])
+        return excp
+    except (ImportError, AttributeError, TypeError):
+        return TranscriptError("Recorded %s: %s" % (info["cls"],
+                                                    info["args"]))
+
+
+class Recorder(object):
+    """Writer of a transcript.
+
+    Parameters
+    ----------
+    path : str
+        Transcript file.
+    test_name : str
+        Test name.
+    params : dict
+        Test params.
+    """
+
+    def __init__(self, path, test_name, params):
+        self.path = path
+        self._lock = threading.Lock()
+        self._refs = {}
+        self._next = 0
+        self._fd = gzip.open(path, 'wb')
+        self._write({"version": VERSION, "test": test_name,
+                     "params": dict((key, str(val))
+                                    for key, val in params.items())})
+
+    def _write(self, entry):
+        line = _dumps(entry) + "\n"
+        self._fd.write(line.encode('ascii'))
+
+    def record(self, **entry):
+        with self._lock:
+            if self._fd is not None:
+                self._write(entry)
+
+    def encode(self, value):
+        """Plain data is recorded as is, other objects as a reference to a
+        recording proxy.
+
+        Returns
+        -------
+        tuple
+            (value to return to the caller, value to record)
+        """
+        if isinstance(value, _DATA):
+            return value, {"v": _data(value)}
+        with self._lock:
+            known = self._refs.get(id(value))
+            if known is None:
+                self._next += 1
+                # Keep target alive, so its id() is not reused.
+                known = (_RecordingProxy(self, str(self._next), value), value)
+                self._refs[id(value)] = known
+        proxy = known[0]
+        return proxy, {"ref": proxy._oid}  # pylint: disable=W0212
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                self._fd.close()
+                self._fd = None
+                logger.info("Transcript: %s", self.path)
+
+
+class _RecordingProxy(object):
+    """Forward everything to target and record it."""
+
+    def __init__(self, recorder, oid, target):
+        object.__setattr__(self, '_recorder', recorder)
+        object.__setattr__(self, '_oid', oid)
+        object.__setattr__(self, '_target', target)
+
+    def __repr__(self):
+        # Same as _ReplayObject: arguments of recorded and replayed calls
+        # match.
+        return "<transcript %s>" % self._oid
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if name.startswith('__'):
+            return value
+        if not callable(value):
+            value, rec = self._recorder.encode(value)
+            self._recorder.record(o=self._oid, k="attr", n=name, r=rec)
+            return value
+        return self._wrap(name, value)
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+    def _wrap(self, name, method):
+        recorder = self._recorder
+        oid = self._oid
+
+        def call(*args, **kwargs):
+            start = time.time()
+            try:
+                result = method(*args, **kwargs)
+            except Exception as excp:
+                recorder.record(o=oid, k="call", n=name,
+                                a=_key(args, kwargs), x=_exc_info(excp),
+                                t=round(time.time() - start, 4))
+                raise
+            result, rec = recorder.encode(result)
+            recorder.record(o=oid, k="call", n=name, a=_key(args, kwargs),
+                            r=rec, t=round(time.time() - start, 4))
+            return result
+        call.__name__ = name
+        return call
+
+
+def start(logdir, test_name, params):
+    """Record VMs wrapped by wrap() to <logdir>/transcript.jsonl.gz."""
+    global _recorder  # pylint: disable=W0603
+    finish()
+    _recorder = Recorder(os.path.join(logdir, TRANSCRIPT_FILE), test_name,
+                         params)
+    multiprocessing.util.Finalize(None, finish, exitpriority=10)
+    return _recorder
+
+
+def finish():
+    """Stop recording. Can be called more times."""
+    global _recorder  # pylint: disable=W0603
+    recorder, _recorder = _recorder, None
+    if recorder is not None:
+        recorder.close()
+
+
+def wrap(vm_name, vm):
+    """Return recording proxy of VM if recording is on, else VM itself."""
+    recorder = _recorder
+    if recorder is None or isinstance(vm, _ReplayObject):
+        return vm
+    return _RecordingProxy(recorder, "vm:%s" % vm_name, vm)
+
+
+class Player(object):
+    """Answers of a transcript.
+
+    Parameters
+    ----------
+    path : str
+        Transcript file.
+    strict : bool
+        Calls must match recorded arguments.
+    """
+
+    def __init__(self, path, strict=False):
+        self.strict = strict
+        self.mismatches = 0
+        self._lock = threading.Lock()
+        self._objs = {}
+        self._kinds = {}
+        self._by_key = collections.defaultdict(collections.deque)
+        self._by_name = collections.defaultdict(collections.deque)
+        self._last = {}
+        self._used = set()
+        with gzip.open(path, 'rb') as fd:
+            lines = fd.read().decode('ascii').splitlines()
+        header = _native(json.loads(lines[0]))
+        if header.get("version") != VERSION:
+            raise TranscriptError("Unsupported transcript version: %s" %
+                                  header.get("version"))
+        self.test_name = header["test"]
+        self.params = header["params"]
+        self._events = [_native(json.loads(line)) for line in lines[1:]]
+        for idx, event in enumerate(self._events):
+            self._kinds[(event["o"], event["n"])] = event["k"]
+            self._by_key[(event["o"], event["n"], event.get("a"))].append(idx)
+            self._by_name[(event["o"], event["n"])].append(idx)
+        logger.info("Transcript %s: %d events.", path, len(self._events))
+
+    def _pop(self, queue):
+        while queue:
+            idx = queue.popleft()
+            if idx not in self._used:
+                self._used.add(idx)
+                return self._events[idx]
+        return None
+
+    def vm(self, vm_name):
+        return self.obj("vm:%s" % vm_name)
+
+    def obj(self, oid):
+        with self._lock:
+            if oid not in self._objs:
+                self._objs[oid] = _ReplayObject(self, oid)
+            return self._objs[oid]
+
+    def kind(self, oid, name):
+        return self._kinds.get((oid, name))
+
+    def take(self, oid, name, key=None):
+        """Return the next recorded event for a call or attribute read."""
+        with self._lock:
+            event = (self._pop(self._by_key.get((oid, name, key))) or
+                     self._last.get((oid, name, key)))
+            if event is None and not self.strict:
+                event = (self._pop(self._by_name.get((oid, name))) or
+                         self._last.get((oid, name)))
+                if event is not None:
+                    self.mismatches += 1
+                    logger.debug("Replay %s.%s%s as %s.", oid, name, key,
+                                 event.get("a"))
+            if event is None:
+                raise TranscriptError("Not recorded: %s.%s%s" %
+                                      (oid, name, key or ""))
+            self._last[(oid, name, key)] = event
+            self._last[(oid, name)] = event
+            return event
+
+    def answer(self, event):
+        """Return recorded result or raise recorded exception."""
+        if "x" in event:
+            raise _exc_rebuild(event["x"])
+        if "ref" in event["r"]:
+            return self.obj(event["r"]["ref"])
+        return event["r"]["v"]
+
+
+class _ReplayObject(object):
+    """Stand-in for a VM, a session, a monitor... of a transcript."""
+
+    def __init__(self, player, oid):
+        self._player = player
+        self._oid = oid
+
+    def __repr__(self):
+        return "<transcript %s>" % self._oid
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        player = self._player
+        kind = player.kind(self._oid, name)
+        if kind is None:
+            raise AttributeError("%s has no recorded %s" % (self, name))
+        if kind == "attr":
+            return player.answer(player.take(self._oid, name))
+        oid = self._oid
+
+        def call(*args, **kwargs):
+            return player.answer(player.take(oid, name, _key(args, kwargs)))
+        call.__name__ = name
+        return call
+
+
+class ReplayEnv(object):
+    """avocado-vt env with VMs of a transcript."""
+
+    def __init__(self, player):
+        self.player = player
+
+    def get_vm(self, name):
+        return self.player.vm(name)
+
+
+class ReplayTest(object):
+    """avocado-vt test object, enough for SpiceTest."""
+
+    def __init__(self, name, logdir):
+        self.name = name
+        self.logdir = logdir
+
+
+class VirtualClock(object):
+    """Replace time.sleep() and time.time(): sleep advances the clock and
+    returns at once.
+    """
+
+    def __init__(self):
+        self.offset = 0.0
+        self._saved = None
+
+    def sleep(self, seconds):
+        self.offset += max(seconds, 0)
+
+    def time(self):
+        return self._saved[1]() + self.offset
+
+    def __enter__(self):
+        self._saved = (time.sleep, time.time)
+        time.sleep, time.time = self.sleep, self.time
+        return self
+
+    def __exit__(self, *exc_info):
+        time.sleep, time.time = self._saved
+        return False
+
+
+def replay(run, path, logdir=None, strict=False):
+    """Run avocado-vt test function against a transcript.
+
+    Parameters
+    ----------
+    run : callable
+        Test function run(vt_test, test_params, env).
+    path : str
+        Transcript file.
+    logdir : str
+        Test log dir, default is a new temporary dir.
+    strict : bool
+        See Player.
+
+    Returns
+    -------
+    Player
+        Player after replay, e.g. to check mismatches.
+    """
+    from virttest import utils_params
+    player = Player(path, strict)
+    params = utils_params.Params(player.params)
+    params["transcript_record"] = "no"
+    vt_test = ReplayTest(player.test_name,
+                         logdir or tempfile.mkdtemp(prefix="replay-"))
+    start_time = time.time()
+    with VirtualClock() as clock:
+        run(vt_test, params, ReplayEnv(player))
+    logger.info("Replay of %s: %.3f s, %.1f s of sleep skipped, "
+                "%d mismatched calls.", player.test_name,
+                time.time() - start_time, clock.offset, player.mismatches)
+    return player
+
+
+def main(argv):
+    if len(argv) != 3:
+        sys.stderr.write("Usage: %s TRANSCRIPT TEST_MODULE\n" % argv[0])
+        return 2
+    logging.basicConfig(level=logging.INFO)
+    module = importlib.import_module(argv[2])
+    replay(module.run, argv[1])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -31,11 +31,10 @@ import pipes
 import socket
 
 from distutils import util  # virtualenv problem pylint: disable=E0611
-from virttest import qemu_vm
-from virttest import asset
-from virttest import utils_net
 from avocado.core import exceptions
 
+from spice.lib import trace
+
 logger = logging.getLogger(__name__)
 
 SSL_TYPE_IMPLICIT = "implicit_hs"
@@ -173,6 +172,9 @@ def debug(vmi, string, *args, **kwargs):
 def extend_api_vm():
     """Extend qemu.VM(virt_vm.BaseVM) with useful methods.
     """
+    # virttest is imported on use, the rest of the module works without it,
+    # e.g. in spice.bench.
+    from virttest import qemu_vm
     qemu_vm.VM.is_linux = vm_is_linux
     qemu_vm.VM.is_win = vm_is_win
     qemu_vm.VM.is_rhel7 = vm_is_rhel7
@@ -190,6 +192,7 @@ def type_variant(test, vm_name):
 
 
 def download_asset(asset_name, ini_dir=None, section=None, ddir=None):
+    from virttest import asset
     provider_dirs = asset.get_test_provider_subdirs(backend="spice")[0]
     if ini_dir:
         provider_dirs.insert(0, ini_dir)
@@ -270,6 +273,7 @@ class SpiceTestFail(exceptions.TestFail):
 
 def finish_test(test):
     """Could be located at the end of the tests."""
+    trace.finish()
     if test.cfg.pause_on_end:
         # 1 hour
         seconds = 60 * 60
@@ -393,6 +397,7 @@ def get_host_ip(test):
         Spice test object.
 
     """
+    from virttest import utils_net
     ip_ver = test.kvm_g.listening_addr
     if not ip_ver:
         ip_ver = "ipv4"
@@ -27,6 +27,7 @@ from spice.lib import reg
 from spice.lib import ios
 from spice.lib import act
 from spice.lib import utils
+from spice.lib import trace
 
 logger = logging.getLogger(__name__)
 
@@ -50,7 +51,10 @@ def run(vmi, cmd, ssn=None, dogtail_ssn=False, admin=False, timeout=None):
     kwargs = {}
     if timeout:
         kwargs['timeout'] = timeout
-    out = ssn.cmd(cmdline, **kwargs)
+    with trace.span(cmdline[:40], trace.CAT_CMD, vm=vmi.vm_name,
+                    cmd=cmdline) as span:
+        out = ssn.cmd(cmdline, **kwargs)
+        span.add("out_bytes", len(out))
     act.info(vmi, "cmd: %s, out: %s", cmdline, out)
     return out
 
@@ -73,7 +77,11 @@ def rstatus(vmi, cmd, ssn=None, admin=False, dogtail_ssn=False, timeout=None):
     kwargs = {}
     if timeout:
         kwargs['timeout'] = timeout
-    status, out = ssn.cmd_status_output(cmdline, **kwargs)
+    with trace.span(cmdline[:40], trace.CAT_CMD, vm=vmi.vm_name,
+                    cmd=cmdline) as span:
+        status, out = ssn.cmd_status_output(cmdline, **kwargs)
+        span.set("status", status)
+        span.add("out_bytes", len(out))
     act.info(vmi, "cmd: %s, status: %s, output: %s", cmdline, status, out)
     return (status, out)
 
@@ -105,9 +113,11 @@ def new_ssn(vmi, admin=False, dogtail_ssn=False):
         username = vmi.cfg.username
         password = vmi.cfg.password
         utils.debug(vmi, "Open a new session for: user.")
-    ssn = vmi.vm.wait_for_login(username=username,
-                                password=password,
-                                timeout=int(vmi.cfg.login_timeout))
+    with trace.span("wait_for_login", trace.CAT_SSN, vm=vmi.vm_name,
+                    user=username):
+        ssn = vmi.vm.wait_for_login(username=username,
+                                    password=password,
+                                    timeout=vmi.cfg.as_int("login_timeout"))
     if dogtail_ssn:
         dogtail_cmd = utils.Cmd("dogtail-run-headless-next", "--dont-start",
                                 "--dont-kill", "/bin/bash")
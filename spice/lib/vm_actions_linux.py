@@ -21,9 +21,17 @@
 import os
 import re
 import time
+import hashlib
 import subprocess
 import aexpect
 
+try:
+    from urllib2 import urlopen
+    from httplib import HTTPException
+except ImportError:
+    from urllib.request import urlopen
+    from http.client import HTTPException
+
 try:
     from avocado.utils import service
 except ImportError:
@@ -34,6 +42,7 @@ from virttest import remote
 from virttest import utils_net
 
 from spice.lib import utils
+from spice.lib import parsers
 from spice.lib import deco
 from spice.lib import reg
 from spice.lib import ios
@@ -46,6 +55,30 @@ USB_POLICY_FILE = \
 USB_POLICY_FILE_SRC = os.path.join(utils.DEPS_DIR,
                                    "org.spice-space.lowlevelusbaccess.policy")
 """USB policy file source."""
+SELENIUM_START_TIMEOUT = 60
+"""Timeout in s for Selenium server to start."""
+SELENIUM_PROBE_TIMEOUT = 2
+"""Timeout in s for one probe of Selenium server status."""
+SELENIUM_POLL_FIRST = 0.25
+"""First delay in s between Selenium server probes."""
+SELENIUM_POLL_MAX = 4
+"""Max delay in s between Selenium server probes."""
+
+_LOCAL_MD5 = {}
+"""Cache of MD5 sums of host files: (path, size, mtime) -> md5."""
+
+
+def _local_md5(path):
+    """MD5 sum of a host file. The sum is cached until file is changed."""
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime)
+    if key not in _LOCAL_MD5:
+        md5 = hashlib.md5()
+        with open(path, 'rb') as fd:
+            for chunk in iter(lambda: fd.read(1 << 20), b''):
+                md5.update(chunk)
+        _LOCAL_MD5[key] = md5.hexdigest()
+    return _LOCAL_MD5[key]
 
 
 @reg.add_action(req=[ios.ILinux])
@@ -541,6 +574,39 @@ def get_open_window_ids(vmi, fltr):
     return windows
 
 
+XWININFO_TREE_RE = re.compile(
+    r'^\s*(?P<id>0x[0-9a-fA-F]+)\s+(?:"(?P<name>.*)"|\(has no name\)):'
+    r'.*\s(?P<width>\d+)x(?P<height>\d+)[+-]-?\d+[+-]-?\d+'
+    r'\s+\+(?P<x>-?\d+)\+(?P<y>-?\d+)\s*$')
+"""Line of 'xwininfo -root -tree' output. x, y are absolute coordinates."""
+
+
+@reg.add_action(req=[ios.ILinux])
+def get_windows(vmi):
+    """Inventory of all X windows with its absolute geometry. Everything is
+    read by one call of xwininfo.
+
+    Returns
+    -------
+    list
+        List of dicts with keys: id, name, width, height, x, y.
+
+    """
+    cmd = utils.Cmd("xwininfo", "-root", "-tree")
+    xwininfo = act.run(vmi, cmd)
+    windows = []
+    for line in xwininfo.splitlines():
+        match = XWININFO_TREE_RE.match(line)
+        if not match:
+            continue
+        win = match.groupdict()
+        win['name'] = win['name'] or ""
+        for key in ('width', 'height', 'x', 'y'):
+            win[key] = int(win[key])
+        windows.append(win)
+    return windows
+
+
 @reg.add_action(req=[ios.ILinux])
 def get_window_props(vmi, win_id):
     """Get full properties of a window with speficied ID.
@@ -843,13 +909,27 @@ def chk_deps(vmi, fname, dst_dirpath=None):
     return dst_path
 
 
+DIGEST_RE = r"DIGEST (\d+x\d+:[0-9a-f]+)"
+"""Image digest printed by clipboard script."""
+
+
 @reg.add_action(req=[ios.ILinux])
-def imggen(vmi, img, size):
+def imggen(vmi, img, size, seed=0):
     """Generate an image file.
+
+    Parameters
+    ----------
+    img : str
+        Where to save image. Format is defined by extension.
+    size : str
+        Side of a square image: INT or WIDTHxHEIGHT.
+    seed : int
+        The same seed gives the same image.
+
     """
     script = vmi.cfg.helper_c
     dst_script = act.chk_deps(vmi, script)
-    cmd = utils.Cmd(dst_script, "--genimg", size, img)
+    cmd = utils.Cmd(dst_script, "--genimg", size, "--seed", str(seed), img)
     utils.info(vmi, "Generate an %s image of %s size %s.", img, size)
     act.run(vmi, cmd, dogtail_ssn=vmi.vm.is_rhel8())
 
@@ -882,6 +962,26 @@ def cb2img(vmi, img):
     act.run(vmi, cmd, dogtail_ssn=vmi.vm.is_rhel8(), timeout=120)
 
 
+@reg.add_action(req=[ios.ILinux])
+def cb2digest(vmi):
+    """Digest of decoded RGBA pixels of an image in clipboard. It is computed
+    at VM by one call of the clipboard script.
+
+    Returns
+    -------
+    str
+        WIDTHxHEIGHT:SHA256
+
+    """
+    script = vmi.cfg.helper_c
+    dst_script = act.chk_deps(vmi, script)
+    cmd = utils.Cmd(dst_script, "--cb2digest")
+    out = act.run(vmi, cmd, dogtail_ssn=vmi.vm.is_rhel8(), timeout=120)
+    digest = re.findall(DIGEST_RE, out)[-1]
+    utils.info(vmi, "Clipboard image digest: %s.", digest)
+    return digest
+
+
 @reg.add_action(req=[ios.ILinux])
 def text2cb(vmi, text):
     """Use the clipboard script to copy an image into the clipboard.
@@ -957,16 +1057,234 @@ def md5sum(vmi, fpath):
 
 
 @reg.add_action(req=[ios.ILinux])
-def gen_rnd_file(vmi, name, size_kb):
+def gen_rnd_file(vmi, name, size_kb, timeout=None):
     """
     Generate file with random content
     """
     cmd = utils.Cmd("dd", "if=/dev/urandom", "of=%s" % name, "bs=1024",
                     "count=%s" % size_kb)
-    act.run(vmi, cmd)
+    act.run(vmi, cmd, timeout=timeout)
     utils.info(vmi, "File %s of size %s kb was generated.", name, size_kb)
 
 
+@reg.add_action(req=[ios.ILinux])
+def python_bin(vmi):
+    """Python interpreter to run scripts from deps."""
+    if vmi.vm.is_rhel8():
+        return "python3"
+    return "python"
+
+
+XFER_WATCH_SCRIPT = "helper_inotify.py"
+"""Script to watch directory for new files. Location in deps."""
+XFER_EVENT_RE = re.compile(
+    r'^EVENT (?P<kind>\w+) (?P<time>\d+\.\d+) (?P<size>-?\d+) (?P<name>.*)$')
+"""Event line printed by inotify watcher script."""
+
+
+@reg.add_action(req=[ios.ILinux])
+def xfer_watch_start(vmi, dirpath):
+    """Watch directory for new files. Do not forget to turn it off.
+
+    Parameters
+    ----------
+    dirpath : str
+        Directory to watch, usually ~/Downloads.
+
+    Returns
+    -------
+    aexpect.ShellSession
+        Session with running watcher. Pass it to other xfer_watch actions.
+
+    """
+    dst_script = act.chk_deps(vmi, XFER_WATCH_SCRIPT)
+    ssn = act.new_ssn(vmi)
+    cmd = utils.Cmd(act.python_bin(vmi), dst_script, dirpath)
+    utils.info(vmi, "Start watching %s.", dirpath)
+    ssn.sendline(str(cmd))
+    ssn.read_until_output_matches([r"READY"], timeout=60)
+    return ssn
+
+
+@reg.add_action(req=[ios.ILinux])
+def xfer_watch_wait(vmi, ssn, fnames, timeout=300):
+    """Wait until files are completely written to the watched directory.
+    File is complete after IN_CLOSE_WRITE or IN_MOVED_TO event.
+
+    Parameters
+    ----------
+    ssn : aexpect.ShellSession
+        Session returned by xfer_watch_start().
+    fnames : list
+        File names to wait for.
+    timeout : float
+        Timeout in seconds for all files.
+
+    Returns
+    -------
+    dict
+        File name -> dict with keys: start, end, size. start, end are VM
+        times of creation and completion. start is None if creation event was
+        not seen.
+
+    Raises
+    ------
+    SpiceUtilsError
+        Some files were not completed before timeout.
+
+    """
+    pending = set(fnames)
+    files = dict((fname, {"start": None, "end": None, "size": None})
+                 for fname in fnames)
+    end_time = time.time() + timeout
+    leftover = ""
+    while pending:
+        left = end_time - time.time()
+        if left <= 0:
+            break
+        try:
+            _, out = ssn.read_until_output_matches([r"\n"], timeout=left,
+                                                   internal_timeout=0.1)
+        except aexpect.ExpectTimeoutError:
+            break
+        lines = (leftover + out).split("\n")
+        leftover = lines.pop()
+        for line in lines:
+            match = XFER_EVENT_RE.match(line.rstrip("\r"))
+            if not match or match.group("name") not in files:
+                continue
+            xfer = files[match.group("name")]
+            ev_time = float(match.group("time"))
+            if match.group("kind") == "CREATE":
+                xfer["start"] = ev_time
+            else:
+                xfer["end"] = ev_time
+                xfer["size"] = int(match.group("size"))
+                pending.discard(match.group("name"))
+    if pending:
+        raise utils.SpiceUtilsError("Files are not transferred in %s s: %s" %
+                                    (timeout, ", ".join(sorted(pending))))
+    for fname, xfer in files.items():
+        utils.info(vmi, "Transferred %s: %s", fname, xfer)
+    return files
+
+
+@reg.add_action(req=[ios.ILinux])
+def xfer_watch_stop(vmi, ssn):
+    # Send ctrl+c (SIGINT) through ssh session.
+    ssn.send("\003")
+    ssn.read_up_to_prompt()
+    ssn.close()
+    utils.info(vmi, "Watcher is stopped.")
+
+
+MARKER_SCRIPT = "helper_marker.py"
+"""Script to show full-screen marker. Location in deps."""
+MARKER_COLORS = ((0, 0, 255), (255, 255, 0))
+"""RGB colors of marker. Keep in sync with deps/helper_marker.py"""
+MARKER_TIME_RE = r"%s (\d+\.\d+)[\r\n]"
+"""Reply of marker script with guest time."""
+
+
+@reg.add_action(req=[ios.ILinux])
+def marker_start(vmi):
+    """Show full-screen marker at VM. Do not forget to turn it off.
+
+    Returns
+    -------
+    aexpect.ShellSession
+        Session with running marker script. Pass it to other marker actions.
+
+    """
+    dst_script = act.chk_deps(vmi, MARKER_SCRIPT)
+    ssn = act.new_ssn(vmi, dogtail_ssn=vmi.vm.is_rhel8())
+    cmd = utils.Cmd(act.python_bin(vmi), dst_script)
+    utils.info(vmi, "Start marker.")
+    ssn.sendline(str(cmd))
+    ssn.read_until_output_matches([r"READY"], timeout=60)
+    return ssn
+
+
+@reg.add_action(req=[ios.ILinux])
+def marker_clock(vmi, ssn, samples=20):
+    """Estimate offset of VM clock against host clock. Sample with minimal
+    round-trip time is used.
+
+    Parameters
+    ----------
+    ssn : aexpect.ShellSession
+        Session returned by marker_start().
+    samples : int
+        Number of time requests.
+
+    Returns
+    -------
+    tuple
+        (offset, error) in seconds. VM time - offset = host time.
+
+    """
+    best = None
+    for _ in range(samples):
+        start = time.time()
+        ssn.sendline("t")
+        _, out = ssn.read_until_output_matches([MARKER_TIME_RE % "T"],
+                                               timeout=10,
+                                               internal_timeout=0.001)
+        stop = time.time()
+        vm_time = float(re.findall(MARKER_TIME_RE % "T", out)[-1])
+        rtt = stop - start
+        if not best or rtt < best[1]:
+            best = (vm_time - (start + stop) / 2, rtt)
+    offset, rtt = best
+    utils.info(vmi, "Clock offset: %.6f s, error: %.6f s.", offset, rtt / 2)
+    return offset, rtt / 2
+
+
+@reg.add_action(req=[ios.ILinux])
+def marker_set(vmi, ssn, color):
+    """Request marker repaint. Do not wait for it.
+
+    Parameters
+    ----------
+    ssn : aexpect.ShellSession
+        Session returned by marker_start().
+    color : int
+        Index of marker color: 0 or 1.
+
+    Returns
+    -------
+    tuple
+        Expected RGB color.
+
+    """
+    ssn.sendline(str(color))
+    return MARKER_COLORS[color]
+
+
+@reg.add_action(req=[ios.ILinux])
+def marker_painted(vmi, ssn, color, timeout=10):
+    """Wait for marker repaint.
+
+    Returns
+    -------
+    float
+        VM time when frame with marker was painted.
+
+    """
+    pattern = MARKER_TIME_RE % ("M %d" % color)
+    _, out = ssn.read_until_output_matches([pattern], timeout=timeout,
+                                           internal_timeout=0.001)
+    return float(re.findall(pattern, out)[-1])
+
+
+@reg.add_action(req=[ios.ILinux])
+def marker_stop(vmi, ssn):
+    ssn.sendline("q")
+    ssn.read_up_to_prompt()
+    ssn.close()
+    utils.info(vmi, "Marker is stopped.")
+
+
 @reg.add_action(req=[ios.ILinux])
 def klogger_start(vmi):
     ssn = act.new_ssn(vmi, dogtail_ssn=vmi.vm.is_rhel8())
@@ -983,10 +1301,7 @@ def klogger_stop(vmi, ssn):
     time.sleep(1)
     ssn.send("\003")
     output = ssn.read_up_to_prompt()
-    a = re.findall(
-        r'KeyPress.*\n.*\n.* keycode (\d*) \(keysym ([0-9A-Fa-fx]*)', output)
-    act.info(vmi, "Keyboard logger out: %r", a)
-    keys = [(int(keycode), int(keysym, base=16)) for (keycode, keysym) in a]
+    keys = parsers.parse_xev_keys(output)
     utils.info(vmi, "Read keys: %s" % keys)
     # Return list of pressed: (keycode, keysym)
     return keys
@@ -1169,11 +1484,25 @@ def run_selenium(vmi, ssn):
 
         firefox -CreateProfile <profile name>
 
+    Server is started only once, it is kept running between tests, so
+    logged-in browser sessions can be reused. Firewall is flushed first:
+    the server is probed and used from the host.
+
     """
+    act.turn_firewall(vmi, "no")
+    if act.selenium_ready(vmi):
+        # Keep server and its browser sessions, see lib4x.sessions.
+        act.info(vmi, "Selenium server is already running.")
+        return
     selenium = utils.download_asset("selenium", section=vmi.cfg.selenium_ver)
     fname = os.path.basename(selenium)
     dst_fname = os.path.join(act.workdir(vmi), fname)
-    vmi.vm.copy_files_to(selenium, dst_fname)
+    md5_sum = _local_md5(selenium)
+    status, out = act.rstatus(vmi, utils.Cmd("md5sum", dst_fname))
+    if status == 0 and re.findall(r'\w+', out)[:1] == [md5_sum]:
+        act.info(vmi, "Selenium jar is already on VM: %s.", dst_fname)
+    else:
+        vmi.vm.copy_files_to(selenium, dst_fname)
     defs = utils.Cmd()
     opts = utils.Cmd()
     opts.append("-port")
@@ -1181,15 +1510,56 @@ def run_selenium(vmi, ssn):
     opts.append("-trustAllSSLcertificates")
     defs = " ".join(defs)
     opts = " ".join(opts)
-    cmd = "java {} -jar {} {}".format(defs, dst_fname, opts)
+    # New session: server survives when the shell session is closed.
+    cmd = "setsid java {} -jar {} {}".format(defs, dst_fname, opts)
     utils.info(vmi, "selenium cmd: %s", cmd)
     ssn.sendline(cmd)
-    # There should be a pause to start and running selenium server.
-    # So next log reading acts like a pause.
-    out = ssn.read_nonblocking(internal_timeout=20)
+    act.wait_selenium(vmi)
+    out = ssn.read_nonblocking(internal_timeout=0.5)
     act.info(vmi, "Selenium start log:\n%s.", out)
 
 
+@reg.add_action(req=[ios.ILinux])
+def selenium_ready(vmi):
+    """Probe Selenium server status through the forwarded port.
+
+    Returns
+    -------
+    bool
+        True if /wd/hub/status answers with HTTP 200.
+    """
+    port = vmi.vm.get_port(vmi.cfg.as_int("selenium_port"))
+    url = "http://%s:%s/wd/hub/status" % (vmi.vm.get_address(), port)
+    try:
+        return urlopen(url, timeout=SELENIUM_PROBE_TIMEOUT).getcode() == 200
+    except (IOError, HTTPException):
+        return False
+
+
+@reg.add_action(req=[ios.ILinux])
+def wait_selenium(vmi, timeout=SELENIUM_START_TIMEOUT):
+    """Wait for Selenium server to answer. Probes are done with exponential
+    backoff: first ones are frequent to catch a fast start, then the delay
+    grows up to SELENIUM_POLL_MAX.
+
+    Raises
+    ------
+    utils.SpiceUtilsError
+        Server is not ready in timeout.
+    """
+    start = time.time()
+    deadline = start + timeout
+    delay = SELENIUM_POLL_FIRST
+    while not act.selenium_ready(vmi):
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise utils.SpiceUtilsError(
+                "Selenium server is not ready in %s s." % timeout)
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, SELENIUM_POLL_MAX)
+    act.info(vmi, "Selenium server is ready in %.1f s.", time.time() - start)
+
+
 @reg.add_action(req=[ios.ILinux])
 def firefox_auto_open_vv(vmi):
     """Automatically open remote-viewer for proposed .vv file.
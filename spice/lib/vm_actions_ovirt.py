@@ -12,14 +12,18 @@
 # See LICENSE for more details.
 
 import logging
-import subprocess
 
+from spice.lib import act
 from spice.lib import utils
 from spice.lib import reg
 from spice.lib import ios
+from spice.ovirt.lib4x import rest
 
 logger = logging.getLogger(__name__)
 
+ENGINES = {}
+"""Shared REST API clients: (engine URL, user, profile) -> rest.Client."""
+
 
 @reg.add_action(req=[ios.IOvirt4, ios.ILinux])
 def new_ssn(vmi, admin=False):
@@ -39,6 +43,43 @@ def new_ssn(vmi, admin=False):
     #return ssn
 
 
+@reg.add_action(req=[ios.IOvirt4])
+def ovirt_engine(vmi):
+    """oVirt REST API client for VM config. Clients are shared, so keep-alive
+    connections and cached responses are reused between calls.
+
+    Returns
+    -------
+    rest.Client
+        Client.
+    """
+    cfg = vmi.cfg
+    key = (cfg.ovirt_engine_url, cfg.ovirt_user, cfg.ovirt_profile)
+    if key not in ENGINES:
+        ENGINES[key] = rest.Client.from_cfg(cfg)
+    return ENGINES[key]
+
+
+@reg.add_action(req=[ios.IOvirt4])
+def ovirt_vms(vmi, names=(), pools=()):
+    """Status and IPs of many VMs by one request. Repeated calls within
+    rest.CACHE_TTL are served from cache.
+
+    Parameters
+    ----------
+    names : iterable
+        VM names.
+    pools : iterable
+        VMs pool names.
+
+    Returns
+    -------
+    dict
+        VM name -> rest.VM.
+    """
+    return act.ovirt_engine(vmi).query(names, pools)
+
+
 @reg.add_action(req=[ios.IOvirt4])
 def get_ip(vmi):
     """Get IP for VM.
@@ -55,7 +96,7 @@ def get_ip(vmi):
 
             28236 ?        Ssl   34:36 /usr/bin/python /usr/share/ovirt-guest-agent/ovirt-guest-agent.py
 
-        * Will be called next command:
+        * The same query as:
 
         curl \
             --insecure \
@@ -73,38 +114,18 @@ def get_ip(vmi):
 
     Raises
     ------
-    Exception
+    SpiceUtilsError
         Cannot get IP for VM.
     """
     cfg = vmi.cfg
-    cmd1 = utils.Cmd("curl")
-    cmd1.append("--insecure")
-    cmd1.append("--request")
-    cmd1.append("GET")
-    cmd1.append("--header")
-    cmd1.append("Filter: true")
-    cmd1.append("--header")
-    cmd1.append("Accept: application/xml")
-    cmd1.append("--user")
-    user = "{user}@{profile}:{passw}".format(user=cfg.ovirt_user,
-                                             profile=cfg.ovirt_profile,
-                                             passw=cfg.ovirt_password)
-    cmd1.append(user)
     if cfg.ovirt_vm_name:
-        # The same syntax as in admin portal search bar.
-        search = "name=%s" % cfg.ovirt_vm_name
+        vms = act.ovirt_vms(vmi, names=(cfg.ovirt_vm_name,))
     elif cfg.ovirt_pool_name:
-        search = "pool=%s" % cfg.ovirt_pool_name
+        vms = act.ovirt_vms(vmi, pools=(cfg.ovirt_pool_name,))
     else:
-        raise Exception("Not defined: VM or pool name.")
-    url = "{ovirt_engine}/api/vms/?search={search}".format(
-        ovirt_engine=cfg.ovirt_engine_url,
-        search=search)
-    cmd1.append(url)
-    cmd2 = utils.Cmd("xmllint",
-                     "--xpath",
-                     "string(/vms/vm/guest_info/ips/ip/@address)",
-                     "-")
-    cmd_get_ip = utils.combine(cmd1, "|", cmd2)
-    out = subprocess.check_output(cmd_get_ip, shell=True)
-    return out
+        raise utils.SpiceUtilsError("Not defined: VM or pool name.")
+    for name in sorted(vms):
+        if vms[name].ip:
+            return vms[name].ip
+    raise utils.SpiceUtilsError("Cannot get IP for VM: %s." %
+                                (cfg.ovirt_vm_name or cfg.ovirt_pool_name))
@@ -49,6 +49,7 @@ import time
 import aexpect
 
 from spice.lib import utils
+from spice.lib import parsers
 from spice.lib import deco
 from spice.lib import act
 from spice.lib import reg
@@ -382,21 +383,22 @@ def rv_chk_con(vmi):
     if status:
         logger.info("ss output: %s", ss_out)
         raise utils.SpiceUtilsError("No active RV connections.")
+    port = test.kvm_g.spice_port
+    tls_port = test.kvm_g.spice_tls_port
+    counts, not_estab = parsers.ss_links(ss_out, (port, tls_port, proxy_port))
     proxy_port_count = 0
     if cfg.spice_proxy:
-        proxy_port_count = ss_out.count(proxy_port)
+        proxy_port_count = counts.get(proxy_port, 0)
         test.vm_g.info("Active proxy ports %s: %s",
                        proxy_port, proxy_port_count)
-    port = test.kvm_g.spice_port
-    tls_port = test.kvm_g.spice_tls_port
     if port == 'no':
         port_count = 0
     else:
-        port_count = ss_out.count(port)
+        port_count = counts.get(port, 0)
     test.vm_g.info("Active ports %s: %s", port, port_count)
     tls_port_count = 0
     if tls_port:
-        tls_port_count = ss_out.count(tls_port)
+        tls_port_count = counts.get(tls_port, 0)
     test.vm_g.info("Active TLS ports %s: %s", tls_port, tls_port_count)
     opened_ports = port_count + tls_port_count + proxy_port_count
     if opened_ports < 4:
@@ -415,11 +417,9 @@ def rv_chk_con(vmi):
             msg = ("Plaintext links per session is less then expected. %s (%s)"
                    % (port_count, plaintext_port_expected))
             raise RVSessionConnect(test, msg)
-    for line in ss_out.split('\n'):
-        for p in port, tls_port, proxy_port:
-            if p and p in line and "ESTAB" not in line:
-                raise RVSessionConnect(test, "Missing active link at port %s",
-                                       p)
+    if not_estab:
+        raise RVSessionConnect(test, "Missing active link at port %s",
+                               not_estab)
     output = test.vm_g.monitor.info("spice")
     logger.info(output)
     # Check to see if ipv6 address is reported back from qemu monitor
@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Fast restore of VMs between tests from an internal qcow2 snapshot.
+
+With vm_snapshot = yes the first test waits until every VM is booted, the
+user is logged in and X is up, and saves the whole VM state - disks and
+RAM - with QEMU savevm. Next tests revert to it with loadvm, that takes
+seconds. Image copy of restore_image_after_testing and guest boot are
+skipped: the VM is kept running after a test, see restore().
+
+A failed test still kills its VMs (kill_vm_on_error); the next test boots
+them again and reverts to the snapshot saved in the image. The snapshot is
+bound to an image, rv_setup drops it. Change vm_snapshot_tag to make a new
+one for a changed setup.
+
+loadvm needs the same devices as savevm. The snapshot name carries a digest
+of VM params that shape QEMU devices, see SNAPSHOT_PARAMS. A VM started with
+other devices, e.g. more qxl heads or other USB controllers, saves its own
+snapshot instead of reverting to a mismatched one.
+
+Per-test setup is cached the same way, see setup(). A test declares its
+setup steps, the state with the steps applied is saved once as a snapshot
+named by a fingerprint of the steps. Next tests with the same steps revert
+to it and skip them.
+
+"""
+
+import hashlib
+import logging
+
+from spice.lib import act
+from spice.lib import utils
+from spice.lib import trace
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_TAG = "spice_ready"
+"""Default name of the snapshot."""
+SAVE_TIMEOUT = 600
+"""savevm writes RAM to image, give it time."""
+SETUP_PREFIX = "spice_setup_"
+"""Prefix of snapshots with applied setup steps."""
+SNAPSHOT_PARAMS = ("machine_type", "cpu_model", "smp", "mem", "vga",
+                   "display", "qxl_dev_nr", "qxl_dev_memory", "usbs",
+                   "usb_devices", "soundcards", "nics", "serials", "images")
+"""VM params that shape QEMU devices. More keys can be added by
+vm_snapshot_params."""
+SNAPSHOT_PARAM_PREFIXES = ("usb_type_", "usbdev_type_", "nic_model",
+                           "drive_format", "image_format")
+"""The same per device, e.g. usb_type_usb1."""
+
+
+def _hmp(vm, cmd, timeout=SAVE_TIMEOUT):
+    out = vm.monitor.human_monitor_cmd(cmd, timeout=timeout)
+    if "error" in out.lower():
+        raise utils.SpiceUtilsError("%s: %s failed: %s" % (vm.name, cmd, out))
+    return out
+
+
+def tags(vm):
+    """Return names of snapshots of VM.
+
+    Parameters
+    ----------
+    vm : virttest.qemu_vm.VM
+        Running VM.
+    """
+    out = vm.monitor.human_monitor_cmd("info snapshots")
+    # ID        TAG                 VM SIZE                DATE       VM CLOCK
+    # 1         spice_ready            1.2G 2019-05-21 10:11:53   00:02:13.044
+    found = []
+    for line in out.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) > 1 and fields[0] != "ID":
+            found.append(fields[1])
+    return found
+
+
+def exists(vm, tag=SNAPSHOT_TAG):
+    """Test if VM has a snapshot named tag."""
+    return tag in tags(vm)
+
+
+def save(vm, tag=SNAPSHOT_TAG):
+    """Save disks and RAM of VM as snapshot tag."""
+    logger.info("%s: save snapshot %s.", vm.name, tag)
+    _hmp(vm, "savevm %s" % tag)
+
+
+def load(vm, tag=SNAPSHOT_TAG):
+    """Revert VM to snapshot tag."""
+    logger.info("%s: revert to snapshot %s.", vm.name, tag)
+    _hmp(vm, "loadvm %s" % tag)
+
+
+def drop(vm, tag=SNAPSHOT_TAG):
+    """Remove snapshots tag of all VM configs and all cached setups from
+    images of VM."""
+    for name in tags(vm):
+        if (name == tag or name.startswith(tag + "_") or
+                name.startswith(SETUP_PREFIX)):
+            logger.info("%s: delete snapshot %s.", vm.name, name)
+            _hmp(vm, "delvm %s" % name)
+
+
+def revert(vmi, tag):
+    """Revert VM to snapshot tag and fix its clock."""
+    load(vmi.vm, tag)
+    if vmi.cfg.os_type == "linux":
+        # Guest clock went back to the time of savevm.
+        act.run(vmi, utils.Cmd("hwclock", "--hctosys"), admin=True)
+
+
+def prepare(vmi):
+    """Wait until VM is ready for a test: it can be logged in and X runs."""
+    vmi.vm.wait_for_login(timeout=vmi.cfg.as_int("login_timeout")).close()
+    if vmi.cfg.os_type == "linux":
+        act.x_active(vmi)
+
+
+def devices_digest(cfg):
+    """Return digest of VM params that shape QEMU devices.
+
+    Parameters
+    ----------
+    cfg : stest.AttributeDict
+        VM config.
+    """
+    keys = set(SNAPSHOT_PARAMS) | set(cfg.as_list("vm_snapshot_params"))
+    items = sorted((key, str(value)) for key, value in cfg.items()
+                   if key in keys or key.startswith(SNAPSHOT_PARAM_PREFIXES))
+    return hashlib.sha1(repr(items).encode("utf-8")).hexdigest()[:8]
+
+
+def vm_tag(test, vmi):
+    """Return snapshot name of VM: vm_snapshot_tag and digest of its
+    devices."""
+    base = test.cfg.vm_snapshot_tag or SNAPSHOT_TAG
+    return "%s_%s" % (base, devices_digest(vmi.cfg))
+
+
+def restore(test, params):
+    """Revert all VMs of test to the snapshot, save it if it is missing.
+
+    Parameters
+    ----------
+    test : stest.SpiceTest
+        Test with VMs.
+    params : virttest.utils_params.Params
+        Test parameters. avocado-vt postprocess reads the same object, so
+        the VMs are kept running and the images are not restored after the
+        test.
+    """
+    for name in test.cfg.as_list("vms"):
+        vm = test.vms[name]
+        vmi = test.vm_info[name]
+        tag = vm_tag(test, vmi)
+        with trace.span("vm_snapshot", vm=name) as span:
+            span.set("tag", tag)
+            if exists(vm, tag):
+                span.set("op", "loadvm")
+                revert(vmi, tag)
+            else:
+                span.set("op", "savevm")
+                prepare(vmi)
+                save(vm, tag)
+    params["restore_image_after_testing"] = "no"
+    params["kill_vm"] = "no"
+
+
+def fingerprint(steps, base=SNAPSHOT_TAG):
+    """Return snapshot name for a VM state with steps applied on base.
+
+    Parameters
+    ----------
+    steps : list
+        Setup steps, see setup().
+    base : str
+        Snapshot the steps are applied on.
+    """
+    key = repr((base, [tuple(step) for step in steps]))
+    return SETUP_PREFIX + hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+def setup(test, vmi, steps):
+    """Apply setup steps to VM, or revert to a cached state with them.
+
+    Without vm_snapshot mode the steps are always run.
+
+    Parameters
+    ----------
+    test : stest.SpiceTest
+        Test with VMs.
+    vmi : stest.VmInfo
+        VM to set up.
+    steps : list
+        Tuples (action name, arg, ...); a step is act.<name>(vmi, arg, ...).
+        Steps and args form a key of cached state: package names, settings.
+        They must be run before a test starts its programs, e.g. RV.
+
+    Example
+    -------
+        vmsnap.setup(test, vmi_c, [("turn_accessibility",),
+                                   ("install_rpm", "xdotool")])
+    """
+    if not test.cfg.as_bool("vm_snapshot"):
+        _apply(vmi, steps)
+        return
+    tag = fingerprint(steps, vm_tag(test, vmi))
+    with trace.span("setup_cache", vm=vmi.vm_name) as span:
+        span.set("tag", tag)
+        if exists(vmi.vm, tag):
+            span.set("op", "loadvm")
+            utils.info(vmi, "Setup %s is cached, skip steps.", tag)
+            revert(vmi, tag)
+        else:
+            span.set("op", "savevm")
+            _apply(vmi, steps)
+            save(vmi.vm, tag)
+
+
+def _apply(vmi, steps):
+    for step in steps:
+        name, args = step[0], tuple(step[1:])
+        utils.info(vmi, "Setup step: %s%s.", name, args)
+        getattr(act, name)(vmi, *args)
@@ -13,9 +13,10 @@
 #
 # See LICENSE for more details.
 
+import re
 import time
 import logging
-import re
+import collections
 
 #TODO: pages(wrong import):
 #pylint: disable=F0401
@@ -23,6 +24,7 @@ from raut.lib.selenium.ui.webadmin import pages
 from selenium import common
 from selenium.webdriver.common import by
 
+from .. import claims
 from .. import dialogs
 from .. import support
 from .. import elements
@@ -343,8 +345,9 @@ class VmsTabCtrl(object):
         ----------
         name
             VM name
-        status_prop : str
-            Name of the status property, e.g. 'vm.is_up' -> 'is_up'
+        status_prop : str or tuple
+            Name of the status property, e.g. 'vm.is_up' -> 'is_up'. For a
+            tuple of names wait until any of them is True.
         timeout
             Timeout in [s] to wait.
 
@@ -365,9 +368,10 @@ class VmsTabCtrl(object):
             w = support.WaitForPageObject(vm, timeout)
             w.status(status_prop)
         except common.exceptions.TimeoutException:
-            prop_val = getattr(vm, status_prop)
-            msg = "%s.%s is: %s" % (vm.name, status_prop, prop_val)
+            msg = "%s.%s is False, status is: %s" % (
+                vm.name, status_prop, vm.status)
             raise excepts.WaitTimeoutError(msg)
+        return True
 
     def get_vm(self, name):
         """Return VM object.
@@ -415,19 +419,24 @@ class VmsTabCtrl(object):
         dlg = self.menu_bar.console_edit()
         return dlg
 
-    def get_vms_names(self):
-        """Get VMs names.
+    def get_vms(self):
+        """Read the whole VMs table in one request.
+
+        Returns
+        -------
+        list
+            VMRecord instances sorted by row.
 
         Note
         ----
             If there are to much VMs they are not shown all at once. Instead,
             XX per page.
         """
-        marker = ('//div[starts-with(@id, '
-                  '"MainTabVirtualMachineView_table_content_col2_row")]')
-        vms = self.driver.find_elements(by.By.XPATH, marker)
-        vms_names = [getattr(x, 'text') for x in vms]
-        return set(vms_names)
+        return VMS_TABLE.read(self.driver)
+
+    def get_vms_names(self):
+        """Get VMs names. See get_vms()."""
+        return set(rec.name for rec in self.get_vms())
 
     def get_vm_from_pool(self, pool_name):
         search_panel = SearchPanel(self.driver)
@@ -437,37 +446,33 @@ class VmsTabCtrl(object):
                          format(pool_name))
         search_panel.submit_search(search_string)
         regex = vms_base.mk_pool_regex(pool_name)
-        vms = self.get_vms_names()
-        for vm_name in sorted(vms):
-            if re.match(regex, vm_name):
-                vm = VM(self.driver, name=vm_name)
-                if vm.is_up or vm.is_booting:
-                    logger.info("Found active VM from pool %s: %s.",
-                                pool_name,
-                                vm_name)
-                    return vm
+        for rec in sorted(self.get_vms(), key=lambda rec: rec.name):
+            if (re.match(regex, rec.name) and (rec.is_up or rec.is_booting) and
+                    claims.claim(rec.name)):
+                logger.info("Found active VM from pool %s: %s, host: %s, "
+                            "IP: %s.", pool_name, rec.name, rec.host,
+                            rec.ip_address)
+                return VM(self.driver, name=rec.name)
         logger.info("Did not found active vm from pool: %s. Start a new one.",
                     pool_name)
         return self.start_vm_from_pool(pool_name)
 
-    #TODO: define regex
-    #pylint: disable=E0602
     def start_vm_from_pool(self, pool_name):
+        """Start a down VM of a pool. The VM is claimed first, so tests that
+        start VMs from the same pool in parallel get different VMs.
+        """
         search_panel = SearchPanel(self.driver)
         search_string = ("Vms: pool={0} and status=down" . format(pool_name))
         search_panel.submit_search(search_string)
-        vms_before = self.get_vms_names()
-        found_free_vm = False
-        for vm_name in sorted(vms_before):
-            if re.match(regex, vm_name):
-                vm = VM(self.driver, name=vm_name)
-                if vm.is_down:
-                    logger.info("Found inactive VM from pool %s: %s.",
-                                pool_name,
-                                vm_name)
-                    found_free_vm = True
-                    break
-        if not found_free_vm:
+        regex = vms_base.mk_pool_regex(pool_name)
+        for rec in sorted(self.get_vms(), key=lambda rec: rec.name):
+            if (re.match(regex, rec.name) and rec.is_down and
+                    claims.claim(rec.name)):
+                logger.info("Found inactive VM from pool %s: %s.",
+                            pool_name, rec.name)
+                vm = VM(self.driver, name=rec.name)
+                break
+        else:
             msg = "Cannot find free(down) vm from pool: %s." % pool_name
             raise Exception(msg)
         self.run_vm(vm.name)
@@ -545,6 +550,37 @@ class VMModel(page_base.TableRowModel):
     STATUS_UP = 'Up'
     STATUS_SUSPENDED = 'Suspended'
     STATUS_DOWN = 'Down'
+    STATUS_BOOTING = 'Powering Up'
+
+
+class VMRecord(collections.namedtuple(
+        'VMRecord', ['row', 'name', 'host', 'ip_address', 'status'])):
+    """VM table row read by VMS_TABLE in one request."""
+    __slots__ = ()
+
+    @property
+    def is_up(self):
+        return self.status == VMModel.STATUS_UP
+
+    @property
+    def is_down(self):
+        return self.status == VMModel.STATUS_DOWN
+
+    @property
+    def is_suspended(self):
+        return self.status == VMModel.STATUS_SUSPENDED
+
+    @property
+    def is_booting(self):
+        return self.status == VMModel.STATUS_BOOTING
+
+
+VMS_TABLE = page_base.TableReader(
+    'MainTabVirtualMachineView_table_content_',
+    (('name', 2, None), ('host', 4, None), ('ip_address', 5, None),
+     ('status', 13, None)),
+    VMRecord)
+"""Bulk reader of VMs table."""
 
 
 class VMShutdownConfirmDlgModel(dialogs.OkCancelDlgModel):
@@ -588,6 +624,11 @@ class VM(page_base.DynamicPageObject):
         """ Return whether VM is Suspended. """
         return self.status == self._model.STATUS_SUSPENDED
 
+    @property
+    def is_booting(self):
+        """ Return whether VM is Powering Up. """
+        return self.status == self._model.STATUS_BOOTING
+
     def select(self):
         """ Select the VM.
 
@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Screenshots and DOM snapshots of WebDriver tests.
+
+A step is marked every time a page object is validated, see page_base, or by
+an explicit Recorder.step() call. What is captured depends on the policy:
+
+    never
+        Nothing.
+
+    on_failure
+        Only step labels are kept - no WebDriver command on the happy path.
+        Screenshot and DOM are captured when the test fails.
+
+    every_step
+        Screenshot and DOM of every step. Capture is done on a background
+        thread through its own connection to Selenium server, so test
+        commands are not delayed. When steps come faster than captures, only
+        the latest pending step is captured.
+
+The last `size` steps are kept in a ring buffer. DOM is stored gzipped,
+screenshots are PNG. Steps are written to <logdir>/webdriver/ when a test
+fails, or at the end with every_step policy, so they are a part of avocado
+test results.
+
+Example
+-------
+
+    with capture.recording(drv, vt_test.logdir, cfg.webdriver_capture,
+                           cfg.webdriver_capture_steps) as rec:
+        ...
+        rec.step("Console options set")
+
+"""
+
+import io
+import os
+import re
+import gzip
+import time
+import logging
+import threading
+import contextlib
+import collections
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue  # pylint: disable=F0401
+
+from selenium import common
+
+from . import sessions
+
+logger = logging.getLogger(__name__)
+
+NEVER = 'never'
+ON_FAILURE = 'on_failure'
+EVERY_STEP = 'every_step'
+POLICIES = (NEVER, ON_FAILURE, EVERY_STEP)
+RING_SIZE = 10
+"""Default number of the last steps to keep."""
+CAPTURE_DIR = "webdriver"
+"""Subdirectory of test logdir for captured steps."""
+RECORDER_ATTR = "_capture_recorder"
+"""Driver attribute with the active Recorder."""
+
+Step = collections.namedtuple('Step', ['idx', 'label', 'time', 'png', 'dom'])
+"""Captured step; png and dom are None if only the label is kept."""
+
+
+def _gzip(data):
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode='wb') as fd:
+        fd.write(data)
+    return buf.getvalue()
+
+
+def _fname(step, ext):
+    label = re.sub(r'[^\w.-]+', '_', step.label).strip('_')[:60]
+    return "%03d-%s.%s" % (step.idx, label or 'step', ext)
+
+
+def step(driver, label):
+    """Mark a step for the Recorder attached to driver, if there is one."""
+    recorder = getattr(driver, RECORDER_ATTR, None)
+    if recorder is not None:
+        recorder.step(label)
+
+
+class Recorder(object):
+    """Capture steps of one WebDriver session.
+
+    Parameters
+    ----------
+    driver : WebDriver
+        Driver of the test.
+    outdir : str
+        Directory to write steps to.
+    policy : str
+        One of POLICIES.
+    size : int
+        Number of the last steps to keep.
+    """
+
+    def __init__(self, driver, outdir, policy=ON_FAILURE, size=RING_SIZE):
+        if policy not in POLICIES:
+            raise ValueError("Unknown capture policy: %s, use one of: %s." %
+                             (policy, ', '.join(POLICIES)))
+        self.driver = driver
+        self.outdir = outdir
+        self.policy = policy
+        self._ring = collections.deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._worker = None
+        self._snapper = None
+        self._idx = 0
+        self._dumped = False
+
+    def step(self, label):
+        """Mark a step. Returns immediately."""
+        if self.policy == NEVER:
+            return
+        self._idx += 1
+        item = (self._idx, label, time.time())
+        if self.policy == ON_FAILURE:
+            with self._lock:
+                self._ring.append(Step(*item, png=None, dom=None))
+            return
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run,
+                                            name="webdriver-capture")
+            self._worker.daemon = True
+            self._worker.start()
+        self._queue.put(item)
+
+    def _connect(self):
+        """Separate connection to the session for the background thread:
+        commands of a test and of the capture don't share a socket.
+        """
+        try:
+            return sessions.AttachedRemote(
+                self.driver.command_executor._url,  # pylint: disable=W0212
+                self.driver.session_id, self.driver.capabilities)
+        except (AttributeError, common.exceptions.WebDriverException) as excp:
+            logger.debug("Capture uses test driver: %s.", excp)
+            return self.driver
+
+    def _grab(self, driver):
+        """Return (png, gzipped DOM); None for a part that failed."""
+        png = dom = None
+        try:
+            png = driver.get_screenshot_as_png()
+            dom = _gzip(driver.page_source.encode('utf-8'))
+        except common.exceptions.WebDriverException as excp:
+            logger.debug("Capture failed: %s.", excp)
+        return png, dom
+
+    def _run(self):
+        self._snapper = self._connect()
+        while True:
+            items = [self._queue.get()]
+            while True:  # Coalesce a burst of steps.
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = items[-1] is None
+            items = [item for item in items if item is not None]
+            if items:
+                png, dom = self._grab(self._snapper)
+                with self._lock:
+                    for item in items[:-1]:
+                        self._ring.append(Step(*item, png=None, dom=None))
+                    self._ring.append(Step(*items[-1], png=png, dom=dom))
+            if stop:
+                return
+
+    def _stop(self):
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def failure(self, label='failure'):
+        """Capture current state synchronously and write steps."""
+        if self.policy == NEVER:
+            return
+        self._stop()
+        self._idx += 1
+        png, dom = self._grab(self.driver)
+        with self._lock:
+            self._ring.append(Step(self._idx, label, time.time(), png, dom))
+        self.dump()
+
+    def close(self):
+        """Stop background thread. With every_step policy write steps."""
+        self._stop()
+        if self.policy == EVERY_STEP and not self._dumped:
+            self.dump()
+
+    def dump(self):
+        """Write kept steps to outdir.
+
+        Returns
+        -------
+        list
+            Written files.
+        """
+        with self._lock:
+            steps = list(self._ring)
+        if not steps:
+            return []
+        if not os.path.isdir(self.outdir):
+            os.makedirs(self.outdir)
+        written = []
+        with open(os.path.join(self.outdir, "steps.txt"), 'w') as index:
+            for item in steps:
+                index.write("%03d %s %s\n" % (
+                    item.idx, time.strftime("%H:%M:%S",
+                                            time.localtime(item.time)),
+                    item.label))
+                for data, ext in ((item.png, 'png'), (item.dom, 'html.gz')):
+                    if data is None:
+                        continue
+                    path = os.path.join(self.outdir, _fname(item, ext))
+                    with open(path, 'wb') as fd:
+                        fd.write(data)
+                    written.append(path)
+        self._dumped = True
+        logger.info("WebDriver steps are saved to: %s.", self.outdir)
+        return written
+
+
+@contextlib.contextmanager
+def recording(driver, logdir, policy=None, size=None):
+    """Attach a Recorder to driver for a block of test code. Steps are
+    written to <logdir>/webdriver/ if the block raises.
+
+    Parameters
+    ----------
+    driver : WebDriver
+        Driver of the test.
+    logdir : str
+        Test log directory, e.g. vt_test.logdir.
+    policy : str
+        One of POLICIES, default is on_failure.
+    size : int or str
+        Number of the last steps to keep, default is RING_SIZE.
+    """
+    recorder = Recorder(driver, os.path.join(logdir, CAPTURE_DIR),
+                        policy or ON_FAILURE, int(size or RING_SIZE))
+    setattr(driver, RECORDER_ATTR, recorder)
+    try:
+        yield recorder
+    except Exception:
+        recorder.failure()
+        raise
+    finally:
+        setattr(driver, RECORDER_ATTR, None)
+        recorder.close()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Claims of VMs taken from a pool.
+
+A pool hands out a VM and a test has to find out which one it got. When
+several tests take VMs from the same pool in parallel, a VM that is "new"
+for one test can belong to another. A test claims a VM before it uses it.
+Claim is a file hard-linked into CLAIM_DIR with its content already
+written, so it is atomic for threads and processes. A claim is owned by
+a thread of a process. A claim of a dead process is stale and can be taken
+over.
+
+Claims are released when the VM is stopped by REST. A VM taken in UI and
+left running is released when the test process exits, see release_all().
+
+Example
+-------
+
+    if claims.claim(vm.name):
+        ...
+    claims.release(vm.name)
+
+"""
+
+import os
+import fcntl
+import errno
+import logging
+import tempfile
+import threading
+import multiprocessing.util
+
+logger = logging.getLogger(__name__)
+
+CLAIM_DIR = os.path.join(tempfile.gettempdir(), "ovirt_vm_claims")
+"""Directory with claim files; shared by all tests on the host."""
+LOCK_FILE = ".lock"
+"""Lock file in CLAIM_DIR; serializes takeovers of stale claims."""
+
+_held = set()
+"""Names of VMs claimed by this process."""
+_finalized_pid = None
+"""Process that has release_all() registered to run on its exit."""
+
+
+def _path(name):
+    return os.path.join(CLAIM_DIR, name)
+
+
+def _token():
+    return "%d %d" % (os.getpid(), threading.current_thread().ident)
+
+
+def _owner(name):
+    """Return token of the claim owner, None if there is no valid claim."""
+    try:
+        with open(_path(name)) as fd:
+            token = fd.read().strip()
+        int(token.split()[0])
+        return token
+    except (IOError, ValueError, IndexError):
+        return None
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as excp:
+        return excp.errno == errno.EPERM
+    return True
+
+
+def claim(name):
+    """Claim VM for the current thread.
+
+    Parameters
+    ----------
+    name : str
+        VM name.
+
+    Returns
+    -------
+    bool
+        True if VM is claimed by this call or was claimed by this thread
+        before, False if VM belongs to another thread or process.
+    """
+    try:
+        os.makedirs(CLAIM_DIR)
+    except OSError as excp:
+        if excp.errno != errno.EEXIST:
+            raise
+    fd, tmp = tempfile.mkstemp(dir=CLAIM_DIR, prefix='.')
+    try:
+        os.write(fd, _token().encode('ascii'))
+        os.close(fd)
+        for _ in range(3):
+            try:
+                os.link(tmp, _path(name))
+            except OSError as excp:
+                if excp.errno != errno.EEXIST:
+                    raise
+                owner = _owner(name)
+                if owner == _token():
+                    return True
+                if owner is not None and _is_alive(int(owner.split()[0])):
+                    return False
+                if not _take_over(name, tmp, owner):
+                    continue  # Claim changed meanwhile, check it again.
+            logger.info("Claimed VM: %s.", name)
+            _hold(name)
+            return True
+        return False
+    finally:
+        os.remove(tmp)
+
+
+def _take_over(name, tmp, stale):
+    """Replace a stale claim with tmp. Takeovers run under a lock: a claim
+    is removed only if it still has the stale token, so a claim taken over
+    by another process meanwhile is kept.
+
+    Returns
+    -------
+    bool
+        True if the claim is taken over.
+    """
+    with open(os.path.join(CLAIM_DIR, LOCK_FILE), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if _owner(name) != stale:
+            return False
+        logger.info("Drop stale claim of VM %s: %s.", name, stale)
+        release(name)
+        try:
+            os.link(tmp, _path(name))
+        except OSError as excp:
+            if excp.errno != errno.EEXIST:
+                raise
+            return False  # A new claim without a takeover won the race.
+        return True
+
+
+def _hold(name):
+    global _finalized_pid  # pylint: disable=W0603
+    if _finalized_pid != os.getpid():
+        # avocado runs a test in a multiprocessing child, atexit is not
+        # called there; a finalizer inherited by fork is ignored.
+        multiprocessing.util.Finalize(None, release_all, exitpriority=10)
+        _finalized_pid = os.getpid()
+    _held.add(name)
+
+
+def release(name):
+    """Release VM claim. It is not an error if there is no claim."""
+    try:
+        os.remove(_path(name))
+    except OSError as excp:
+        if excp.errno != errno.ENOENT:
+            raise
+
+
+def release_all():
+    """Release claims of all threads of this process, e.g. of VMs left
+    running by a test.
+    """
+    pid = str(os.getpid())
+    for name in sorted(_held):
+        owner = _owner(name)
+        if owner is not None and owner.split()[0] == pid:
+            logger.info("Release claim of VM: %s.", name)
+            release(name)
+    _held.clear()
@@ -112,8 +112,7 @@ def log(level=logging.DEBUG, name=None, message=None):
             f_result = func(*args, **kwargs)
             end = time.time()
             logger_dec.info('Exiting %s', logmsg)
-            logger_dec.log(level, func.__name__, "time ", end-start)
-            logger_dec.log(level, logmsg)
+            logger_dec.log(level, "%s time: %.3f s", logmsg, end - start)
             return f_result
         return wrapper
     return decorate
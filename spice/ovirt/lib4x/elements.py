@@ -13,13 +13,217 @@
 # See LICENSE for more details.
 
 import logging
+import functools
+import contextlib
 
 from selenium import common
 from selenium.webdriver.common import by
 from selenium.webdriver.support import ui
 
+from driver import FreshWebElement
+
 logger = logging.getLogger(__name__)
 
+LOOKUP_JS = r"""
+var root = arguments[0] || document, by = arguments[1], value = arguments[2];
+if (window.__spiceDomToken === undefined) {
+    window.__spiceDomToken = Math.random().toString(36).slice(2);
+    window.__spiceDomGeneration = 0;
+    new MutationObserver(function(mutations) {
+        for (var i = 0; i < mutations.length; i++) {
+            if (mutations[i].removedNodes.length) {
+                window.__spiceDomGeneration++;
+                return;
+            }
+        }
+    }).observe(document.documentElement, {childList: true, subtree: true});
+}
+var elem = null;
+try {
+    if (by == 'id') {
+        elem = root === document ? document.getElementById(value) :
+            root.querySelector('[id="' + value + '"]');
+    } else if (by == 'css selector') {
+        elem = root.querySelector(value);
+    } else if (by == 'xpath') {
+        elem = document.evaluate(value, root, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    } else if (by == 'name') {
+        elem = root.querySelector('[name="' + value + '"]');
+    } else if (by == 'class name') {
+        elem = root.getElementsByClassName(value)[0] || null;
+    } else if (by == 'tag name') {
+        elem = root.getElementsByTagName(value)[0] || null;
+    }
+} catch (e) {
+    elem = null;
+}
+return [window.__spiceDomToken + ':' + window.__spiceDomGeneration, elem];
+"""
+"""Return DOM generation and look up an element by a locator. Generation is
+a page token, i.e., changes on page load, and a counter of mutations that
+removed nodes from the page. Locator type null - only return generation."""
+
+
+class _Batch(object):
+    """DOM generation checked in a batch(), None if not checked yet."""
+
+    def __init__(self):
+        self.depth = 0
+        self.generation = None
+
+
+_BATCHES = {}
+"""Open batches per driver: id(driver) -> _Batch."""
+
+
+@contextlib.contextmanager
+def batch(driver):
+    """Check DOM generation once for all element accesses in the block.
+
+    Cached elements of all page models of driver are returned without any
+    WebDriver command. If the page is changed in the block, e.g., by a
+    click, cached elements are refreshed by FreshWebElement when they are
+    found stale. Batches can be nested.
+
+    Examples
+    --------
+
+        with elements.batch(driver):
+            model.name = 'vm1'
+            model.description = 'test'
+
+    """
+    state = _BATCHES.setdefault(id(driver), _Batch())
+    state.depth += 1
+    try:
+        yield
+    finally:
+        state.depth -= 1
+        if not state.depth:
+            del _BATCHES[id(driver)]
+
+
+def batched(method):
+    """Decorator: run page object method in a batch(), see batch()."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with batch(self.driver):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class ElementCache(object):
+    """Located page elements of a page model.
+
+    Elements are kept while DOM generation stays the same. Any removal of a
+    node from the page, or a page load, invalidates all elements. Adding
+    nodes or changing attributes doesn't make located elements stale.
+
+    Validation of the cache and lookup of a missing element is done by one
+    execute_script() call. Out of batch() access to a cached element costs
+    one WebDriver command: a dynamic element doesn't need three commands to
+    find its `_instance_identifier`. In batch() the generation is checked
+    once, then cached elements cost no command.
+    """
+
+    def __init__(self, driver):
+        """
+        Parameters
+        ----------
+        driver
+            Webdriver instance.
+        """
+        self._driver = driver
+        self._generation = None
+        self._entries = {}
+
+    def _run(self, root=None, byset=None, value=None):
+        """Run LOOKUP_JS. Returns (generation, element), generation is None if
+        the script cannot be run.
+        """
+        root = getattr(root, '_elem', root)  # Unwrap FreshWebElement.
+        try:
+            return self._driver.execute_script(LOOKUP_JS, root, byset, value)
+        except common.exceptions.WebDriverException as excp:
+            logger.debug("Cannot check DOM generation: %s", excp)
+            return None, None
+
+    def _seen(self, generation):
+        """Remember generation for the open batch."""
+        state = _BATCHES.get(id(self._driver))
+        if state is not None:
+            state.generation = generation
+
+    def _current(self):
+        """Return current generation, checked once per batch."""
+        state = _BATCHES.get(id(self._driver))
+        if state is not None and state.generation is not None:
+            return state.generation
+        generation, _ = self._run()
+        self._seen(generation)
+        return generation
+
+    def get(self, key, byset, value, root=None):
+        """Return cached element or look it up.
+
+        Parameters
+        ----------
+        key : tuple
+            Cache key: (root key, locator type, locator value[, instance]).
+        byset : str
+            Element locator type; see selenium.webdriver.common.by.By.
+        value : str or callable
+            Locator value. Callable is called only if element is not cached.
+        root : optional
+            Element to look up from, or callable returning it. Document is
+            used by default.
+
+        Returns
+        -------
+        FreshWebElement or None
+            None if the element isn't present on the page now, the caller
+            should fall back to find_element().
+        """
+        def lookup():
+            found = self._run(root() if callable(root) else root, byset,
+                              value() if callable(value) else value)
+            self._seen(found[0])
+            return found
+
+        cached = key in self._entries
+        if cached:
+            generation, elem = self._current(), None
+        else:
+            generation, elem = lookup()
+        if generation is None or generation != self._generation:
+            self._entries.clear()
+            self._generation = generation
+            if cached and generation is not None:
+                generation, elem = lookup()
+                self._generation = generation
+        if key in self._entries:
+            return self._entries[key]
+        if elem is None:
+            return None
+        if callable(value):
+            value = value()
+        elem = FreshWebElement(element=elem, by=byset, value=value)
+        self.put(key, elem)
+        return elem
+
+    def put(self, key, elem):
+        """Store located element. Nothing is stored if generation is unknown.
+        """
+        if self._generation is not None:
+            self._entries[key] = elem
+
+    def clear(self):
+        """Drop all elements."""
+        self._entries.clear()
+        self._generation = None
+
+
 # Widget helpers for HTML form elements.
 
 
@@ -194,7 +398,15 @@ class RootPageElement(property):
         xxx
             Selenium <WebElement> instance.
         """
-        return model._driver.find_element(by=self._by, value=self._locator)
+        cache = getattr(model, '_elem_cache', None)
+        if cache is None:
+            return model._driver.find_element(by=self._by, value=self._locator)
+        key = (None, self._by, self._locator)
+        elem = cache.get(key, self._by, self._locator)
+        if elem is None:
+            elem = model._driver.find_element(by=self._by, value=self._locator)
+            cache.put(key, elem)
+        return elem
 
     def _set(self, model, value):
         """Property setter method. Not implemented for the root page element.
@@ -272,14 +484,33 @@ class PageElement(RootPageElement):
             Selenium <WebElement> instance or instance of a user-defined
             helper.
         """
-        root_element = model._root or model._driver
-        lookup_method = root_element.find_element
-        if self._as_list:
-            lookup_method = root_element.find_elements
-        locator = self._locator
-        if self._is_dynamic:
-            locator = self._locator % model._instance_identifier
-        webelement = lookup_method(by=self._by, value=locator)
+        cache = getattr(model, '_elem_cache', None)
+
+        def locator():
+            if self._is_dynamic:
+                return self._locator % model._instance_identifier
+            return self._locator
+
+        if self._as_list or cache is None:
+            root_element = model._root or model._driver
+            lookup_method = root_element.find_element
+            if self._as_list:
+                lookup_method = root_element.find_elements
+            webelement = lookup_method(by=self._by, value=locator())
+        else:
+            root_prop = type(model)._root
+            root_key = None
+            if root_prop is not None:
+                root_key = (root_prop._by, root_prop._locator)
+            key = (root_key, self._by, self._locator)
+            if self._is_dynamic:
+                key += (model._name,)
+            webelement = cache.get(key, self._by, locator,
+                                   lambda: model._root)
+            if webelement is None:
+                webelement = (model._root or model._driver).find_element(
+                    by=self._by, value=locator())
+                cache.put(key, webelement)
         if self._helper:
             return self._helper(webelement)  # pylint: disable=E1102
         return webelement
@@ -111,6 +111,12 @@ class WaitTimeoutError(GeneralException):
     message = "timeout expired"
 
 
+class RestApiError(GeneralException):
+    """oVirt REST API request failed.
+    """
+    message = "REST API request failed"
+
+
 class ElementIsNotClickableError(GeneralException):
     """Element is not clickable at this poit.  Either is not visible (yet) or
     is overlapped by another element.
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Run one portal scenario in several browsers at once.
+
+A cell of a matrix is a browser, a Selenium server (a client VM) and a portal
+user. Every cell runs in its own thread with its own WebDriver session.
+Scenario creates page objects from the driver it gets, so page objects are
+never shared between threads. A matrix completes in the time of the slowest
+cell instead of the sum.
+
+Example
+-------
+
+    def scenario(drv, cell):
+        login_page = user_login.UserLoginPage(drv)
+        home_page = login_page.login_user(username=cell.user, ...)
+        home_page.sign_out_user()
+
+    results = matrix.run(matrix.cells(browsers, servers, users), scenario)
+    matrix.log_results(results)
+
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+import traceback
+import collections
+
+from selenium import common
+
+from . import driver
+from . import capture
+
+logger = logging.getLogger(__name__)
+
+
+class Cell(collections.namedtuple('Cell', ['browser', 'host', 'port',
+                                           'user', 'password'])):
+    """A browser at a Selenium server driven by a portal user."""
+    __slots__ = ()
+
+    @property
+    def label(self):
+        return "%s@%s:%s/%s" % (self.browser, self.host, self.port, self.user)
+
+
+Result = collections.namedtuple('Result', ['cell', 'ok', 'duration', 'error',
+                                           'value'])
+"""Result of one cell. error is a formatted traceback or None."""
+
+
+def cells(browsers, servers, users):
+    """Build matrix: every browser with every user. Selenium servers are
+    assigned round-robin, so load is spread over client VMs.
+
+    Parameters
+    ----------
+    browsers : list
+        Browser names, see DriverFactory.
+    servers : list
+        (host, port) of Selenium servers.
+    users : list
+        (user, password) of portal users.
+
+    Returns
+    -------
+    list
+        Cell instances.
+    """
+    if not servers:
+        raise ValueError("No Selenium server for the browser matrix.")
+    result = []
+    for browser in browsers:
+        for user, password in users:
+            host, port = servers[len(result) % len(servers)]
+            result.append(Cell(browser, host, port, user, password))
+    return result
+
+
+def _run_cell(cell, scenario, logdir):
+    start = time.time()
+    drv = None
+    try:
+        drv = driver.DriverFactory(cell.browser, cell.host, cell.port)
+        drv.maximize_window()
+        if logdir:
+            cell_dir = os.path.join(logdir, re.sub(r'[^\w.-]+', '_',
+                                                   cell.label))
+            with capture.recording(drv, cell_dir):
+                value = scenario(drv, cell)
+        else:
+            value = scenario(drv, cell)
+        return Result(cell, True, time.time() - start, None, value)
+    except Exception:  # pylint: disable=W0703
+        return Result(cell, False, time.time() - start,
+                      traceback.format_exc(), None)
+    finally:
+        if drv is not None:
+            try:
+                drv.quit()
+            except common.exceptions.WebDriverException:
+                pass
+
+
+def run(matrix, scenario, logdir=None, workers=None):
+    """Run `scenario(drv, cell)` for all cells concurrently.
+
+    Parameters
+    ----------
+    matrix : list
+        Cell instances.
+    scenario : callable
+        Called in a worker thread with a new driver and a cell. Its return
+        value is stored to Result.value.
+    logdir : str
+        Test log dir; failures are captured to <logdir>/<cell>/webdriver/.
+    workers : int
+        Max number of concurrent sessions, default is one per cell.
+
+    Returns
+    -------
+    list
+        Result instances in order of cells.
+    """
+    results = [None] * len(matrix)
+    todo = collections.deque(enumerate(matrix))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                if not todo:
+                    return
+                idx, cell = todo.popleft()
+            logger.info("Start browser matrix cell: %s.", cell.label)
+            results[idx] = _run_cell(cell, scenario, logdir)
+            logger.info("Browser matrix cell %s: %s in %.1f s.", cell.label,
+                        "PASS" if results[idx].ok else "FAIL",
+                        results[idx].duration)
+
+    threads = [threading.Thread(target=worker, name="matrix-%d" % i)
+               for i in range(min(workers or len(matrix), len(matrix)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def log_results(results):
+    """Log a summary table and tracebacks of failed cells.
+
+    Returns
+    -------
+    list
+        Failed Result instances.
+    """
+    failed = [res for res in results if not res.ok]
+    width = max([len(res.cell.label) for res in results] or [0])
+    for res in results:
+        logger.info("%s  %s  %6.1f s", res.cell.label.ljust(width),
+                    "PASS" if res.ok else "FAIL", res.duration)
+    for res in failed:
+        logger.error("Cell %s failed:\n%s", res.cell.label, res.error)
+    if results:
+        logger.info("Browser matrix: %d cells, %d failed, %.1f s wall, "
+                    "%.1f s sum.", len(results), len(failed),
+                    max(res.duration for res in results),
+                    sum(res.duration for res in results))
+    return failed
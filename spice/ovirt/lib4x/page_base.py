@@ -19,10 +19,14 @@
 import abc
 import re
 import logging
+import collections
 
 from selenium import common
 
 import excepts
+import capture
+import support
+import elements
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +44,9 @@ class PageObjectBase(object):
         Default page location; optional if None, no URL is loaded after object
         initialization.
     _timeout
-        Implicit timeout in s for all page object instances.
+        Timeout in s to wait for the page object to pass init validation.
+    _poll_frequency
+        Interval in s between two init validation attempts.
     _model
         Page object model instance, enumerator of page elements and related
         strings.
@@ -52,11 +58,12 @@ class PageObjectBase(object):
     _location = None
     _model = None
     _label = None
+    _poll_frequency = support.POLL_FREQUENCY
 
     def __init__(self, driver, timeout=None, **kwargs):
-        """Init, set implicit timeout for element search, load URL if one is
-        given and run init validation, ensuring that we are on the right
-        location.
+        """Init, load URL if one is given and poll init validation, ensuring
+        that we are on the right location. Implicit wait of the driver is
+        zero while polling, support.IMPLICIT_WAIT is set after.
 
         Parameters
         ----------
@@ -69,12 +76,17 @@ class PageObjectBase(object):
         """
         self._driver = driver
         self._timeout = timeout or TIMEOUT_PAGE_OBJECT
-        self._driver.implicitly_wait(self._timeout)
         if self._location:
             self._driver.get(self._location)
         self.init(**kwargs)
-        self._initial_page_object_validation()
-        self._driver.implicitly_wait(TIMEOUT_PAGE_OBJECT)  # Restore default.
+        try:
+            support.WaitForPageObject(self, self._timeout,
+                                      self._poll_frequency).to_appear()
+        except common.exceptions.TimeoutException:
+            # Last attempt raises InitPageValidationError with the reason.
+            with support.no_implicit_wait(self._driver):
+                self._initial_page_object_validation()
+        capture.step(self._driver, str(self))
 
     def __str__(self):
         """Return human readable page object label if available.
@@ -214,6 +226,8 @@ class PageModelBase(object):
         Root page element of a page model. If defined, all other page elements
         are looked up relatively to this root element (i.e., inside of the root
         page element).
+    _elem_cache
+        Located page elements. See elements.ElementCache.
     """
     _root = None
 
@@ -226,6 +240,7 @@ class PageModelBase(object):
             Webdriver instance.
         """
         self._driver = driver
+        self._elem_cache = elements.ElementCache(driver)
 
     def __str__(self):
         """Return human readable page model representation.
@@ -375,3 +390,86 @@ class TableRowModel(DynamicPageModel):
         if match:
             return int(match.group('row_idx'))
         raise excepts.ElementDoesNotExistError(self)
+
+
+class TableReader(object):
+    """Bulk reader of a data grid. All rows are read by one execute_script()
+    call instead of a WebDriver round-trip per cell.
+
+    Cells are located by HTML id: <prefix>col<N>_row<M>.
+
+    Parameters
+    ----------
+    id_prefix : str
+        Common prefix of cells ids, e.g.
+        'SideTabExtendedVirtualMachineView_table_content_'.
+    columns : tuple
+        Triples (field, column index, attribute). If attribute is None,
+        cell text is read.
+    record : type
+        Class of records. It is called with keyword arguments: row and all
+        fields. By default a namedtuple is made.
+
+    Examples
+    --------
+
+        reader = TableReader('MainTabVirtualMachineView_table_content_',
+                             (('name', 2, None), ('host', 3, None)))
+        for rec in reader.read(driver):
+            print rec.row, rec.name, rec.host
+
+    """
+
+    _READ_JS = r"""
+        var prefix = arguments[0], columns = arguments[1];
+        var re = new RegExp('^' + prefix + 'col(\\d+)_row(\\d+)$');
+        var nodes = document.querySelectorAll('[id^="' + prefix + 'col"]');
+        var rows = {}, result = [];
+        for (var i = 0; i < nodes.length; i++) {
+            var m = re.exec(nodes[i].id);
+            if (m) {
+                rows[m[2]] = rows[m[2]] || {};
+                rows[m[2]][m[1]] = nodes[i];
+            }
+        }
+        for (var row in rows) {
+            var rec = {row: parseInt(row, 10)};
+            for (var j = 0; j < columns.length; j++) {
+                var cell = rows[row][columns[j][1]];
+                var val = null;
+                if (cell && columns[j][2]) {
+                    val = cell.getAttribute(columns[j][2]);
+                } else if (cell) {
+                    val = (cell.textContent || '').trim();
+                }
+                rec[columns[j][0]] = val;
+            }
+            result.push(rec);
+        }
+        result.sort(function(a, b) { return a.row - b.row; });
+        return result;
+    """
+
+    def __init__(self, id_prefix, columns, record=None):
+        self.id_prefix = id_prefix
+        self.columns = tuple(columns)
+        fields = ['row'] + [field for field, _, _ in self.columns]
+        self.record = record or collections.namedtuple('Record', fields)
+
+    def read(self, driver):
+        """Read all rows.
+
+        Parameters
+        ----------
+        driver
+            WebDriver instance.
+
+        Returns
+        -------
+        list
+            Records sorted by row index.
+        """
+        spec = [[field, str(col), attr] for field, col, attr in self.columns]
+        rows = driver.execute_script(self._READ_JS, self.id_prefix, spec)
+        return [self.record(**dict((str(k), v) for k, v in row.items()))
+                for row in rows]
@@ -0,0 +1,625 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Client of oVirt engine REST API. It is used for VM lifecycle - start, stop,
+wait for status or IP - everything that is not a UI under test.
+
+Connections are kept alive and reused from a small pool. Engine session is
+kept by "Prefer: persistent-auth", so credentials are checked only once.
+Responses with ETag are cached and revalidated with If-None-Match: polling of
+an unchanged VM returns 304 without a body.
+
+VMs lists are parsed once into VM records. Records are served from a cache
+for CACHE_TTL seconds without any request. Status of many VMs - a pool or a
+set of names - is fetched by one search query, see Client.query().
+
+Example
+-------
+
+    with rest.Client.from_cfg(cfg) as engine:
+        engine.start_vm(cfg.ovirt_vm_name)
+        vm = engine.wait_for_status(cfg.ovirt_vm_name, rest.STATUS_UP)
+        ip = engine.wait_for_ip(vm.name)
+
+    https://www.ovirt.org/develop/api/rest-api/rest-api.html
+
+"""
+
+import ssl
+import time
+import base64
+import socket
+import logging
+import threading
+import collections
+from xml.etree import ElementTree
+
+try:
+    import httplib
+    from urllib import quote
+    from urlparse import urljoin, urlsplit
+except ImportError:
+    import http.client as httplib  # pylint: disable=F0401
+    from urllib.parse import quote, urljoin, urlsplit  # pylint: disable=F0401
+
+import claims
+import excepts
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = 4
+"""Max number of idle keep-alive connections."""
+TIMEOUT = 30
+"""Socket timeout in s."""
+POLL_FREQUENCY = 2
+"""Interval in s between two checks of a VM."""
+CACHE_TTL = 2
+"""Max age in s of VMs records served from cache without a request."""
+VM_ACTION_TIMEOUT = 300
+"""Default timeout in s to wait for a VM status."""
+IDEMPOTENT = ('GET', 'HEAD')
+"""Methods repeated when a keep-alive connection is lost."""
+STATUS_UP = 'up'
+STATUS_DOWN = 'down'
+STATUS_BOOTING = 'powering_up'
+STATUS_SUSPENDED = 'suspended'
+STATUS_PAUSED = 'paused'
+
+
+class VM(collections.namedtuple('VM', ['id', 'name', 'status', 'ips',
+                                       'pool'])):
+    """VM as reported by the engine. `ips` is a tuple of addresses, `pool`
+    is id of VMs pool or None."""
+    __slots__ = ()
+
+    @property
+    def ip(self):
+        return self.ips[0] if self.ips else None
+
+    @property
+    def is_up(self):
+        return self.status == STATUS_UP
+
+    @property
+    def is_down(self):
+        return self.status == STATUS_DOWN
+
+    @property
+    def is_booting(self):
+        return self.status == STATUS_BOOTING
+
+
+def _ips(elem):
+    """Guest IP addresses: API v3 guest_info or v4 reported_devices."""
+    ips = [ip.get('address') for ip in elem.findall('guest_info/ips/ip')]
+    for ip in elem.findall('reported_devices/reported_device/ips/ip'):
+        ips.append(ip.get('address') or ip.findtext('address'))
+    return tuple(ip for ip in ips if ip)
+
+
+def parse_vm(elem):
+    """Make VM from <vm> element."""
+    pool = elem.find('vm_pool')
+    return VM(id=elem.get('id'),
+              name=elem.findtext('name'),
+              status=(elem.findtext('status/state') or
+                      elem.findtext('status') or '').strip(),
+              ips=_ips(elem),
+              pool=pool.get('id') if pool is not None else None)
+
+
+def parse_vms(body):
+    """Parse <vms> document.
+
+    Returns
+    -------
+    list
+        VM instances.
+    """
+    root = ElementTree.fromstring(body)
+    if root.tag == 'vm':
+        return [parse_vm(root)]
+    return [parse_vm(elem) for elem in root.findall('vm')]
+
+
+class Client(object):
+    """oVirt engine REST API client.
+
+    Parameters
+    ----------
+    url : str
+        Engine URL, e.g. https://engine.example.com/ovirt-engine/
+    user : str
+        User name.
+    password : str
+        Password.
+    profile : str
+        Auth profile (domain), appended to the user name.
+    filtered : bool
+        Send "Filter: true", i.e., act as a non-admin user.
+    pool_size : int
+        Max number of idle keep-alive connections.
+    timeout : float
+        Socket timeout in s.
+    ttl : float
+        Max age in s of cached VMs records.
+    """
+
+    def __init__(self, url, user, password, profile=None, filtered=True,
+                 pool_size=POOL_SIZE, timeout=TIMEOUT, ttl=CACHE_TTL):
+        self.api = urljoin(url if url.endswith('/') else url + '/', 'api/')
+        parts = urlsplit(self.api)
+        self._scheme = parts.scheme
+        self._netloc = parts.netloc
+        self._prefix = parts.path
+        if profile:
+            user = "%s@%s" % (user, profile)
+        auth = base64.b64encode(("%s:%s" % (user, password)).encode('utf-8'))
+        self._headers = {
+            'Authorization': 'Basic %s' % auth.decode('ascii'),
+            'Accept': 'application/xml',
+            'Prefer': 'persistent-auth',
+        }
+        if filtered:
+            self._headers['Filter'] = 'true'
+        self._pool_size = pool_size
+        self._timeout = timeout
+        self._idle = []
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._records = {}
+        self._ttl = ttl
+        self._cookie = None
+
+    @classmethod
+    def from_cfg(cls, cfg, admin=False):
+        """Make client from test config: ovirt_engine_url, ovirt_user,
+        ovirt_password, ovirt_profile. Admin uses ovirt_admin_user,
+        ovirt_admin_password and ovirt_admin_profile ('internal' by default).
+        """
+        if admin:
+            return cls(cfg.ovirt_engine_url, cfg.ovirt_admin_user,
+                       cfg.ovirt_admin_password,
+                       cfg.ovirt_admin_profile or 'internal', filtered=False)
+        return cls(cfg.ovirt_engine_url, cfg.ovirt_user, cfg.ovirt_password,
+                   cfg.ovirt_profile)
+
+    def _connect(self):
+        if self._scheme == 'https':
+            # Engines usually have self-signed certificates.
+            ctx = ssl._create_unverified_context()  # pylint: disable=W0212
+            return httplib.HTTPSConnection(self._netloc,
+                                           timeout=self._timeout,
+                                           context=ctx)
+        return httplib.HTTPConnection(self._netloc, timeout=self._timeout)
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(), False
+
+    def _release(self, conn):
+        with self._lock:
+            if len(self._idle) < self._pool_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def request(self, method, path, body=None, headers=None):
+        """Send a request over a pooled connection.
+
+        A reused connection can be closed by the server at any time. The
+        request is repeated over a new connection if it was not sent, or
+        if it is idempotent (GET, HEAD). A POST lost after it was sent is
+        not repeated: the engine may have done the action already.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method.
+        path : str
+            Path relative to API root, e.g. 'vms/123/start'.
+        body : str
+            XML document.
+        headers : dict
+            Extra headers.
+
+        Returns
+        -------
+        tuple
+            (status, headers dict with lower-case names, body).
+
+        Raises
+        ------
+        RestApiError
+            Connection failed.
+        """
+        hdrs = dict(self._headers)
+        if self._cookie:
+            hdrs['Cookie'] = self._cookie
+        if body is not None:
+            hdrs['Content-Type'] = 'application/xml'
+        hdrs.update(headers or {})
+        url = self._prefix + path
+        while True:
+            conn, reused = self._acquire()
+            sent = False
+            try:
+                conn.request(method, url, body, hdrs)
+                sent = True
+                resp = conn.getresponse()
+                data = resp.read()
+            except (httplib.HTTPException, socket.error) as excp:
+                conn.close()
+                if reused and (not sent or method in IDEMPOTENT):
+                    logger.debug("Keep-alive connection is lost: %s", excp)
+                    continue
+                raise excepts.RestApiError("%s %s: %s" % (method, url, excp))
+            resp_hdrs = dict((k.lower(), v) for k, v in resp.getheaders())
+            if resp_hdrs.get('connection', '').lower() == 'close':
+                conn.close()
+            else:
+                self._release(conn)
+            cookie = resp_hdrs.get('set-cookie')
+            if cookie:
+                self._cookie = cookie.split(';', 1)[0]
+            return resp.status, resp_hdrs, data
+
+    def get(self, path):
+        """GET with conditional revalidation of cached response.
+
+        Returns
+        -------
+        str
+            Response body.
+
+        Raises
+        ------
+        RestApiError
+            Engine returned error.
+        """
+        headers = {}
+        cached = self._cache.get(path)
+        if cached:
+            headers['If-None-Match'] = cached[0]
+        status, hdrs, data = self.request('GET', path, headers=headers)
+        if status == 304 and cached:
+            return cached[1]
+        if status != 200:
+            raise excepts.RestApiError("GET %s: %s %s" % (path, status, data))
+        if 'etag' in hdrs:
+            self._cache[path] = (hdrs['etag'], data)
+        return data
+
+    def post(self, path, body='<action/>'):
+        """POST an action.
+
+        Returns
+        -------
+        str
+            Response body.
+
+        Raises
+        ------
+        RestApiError
+            Engine returned error.
+        """
+        status, _, data = self.request('POST', path, body)
+        self._records.clear()  # Action changes VMs state.
+        if status not in (200, 201, 202):
+            raise excepts.RestApiError("POST %s: %s %s" %
+                                       (path, status, data))
+        return data
+
+    def vms(self, search=None, max_age=None):
+        """List VMs.
+
+        Parameters
+        ----------
+        search : str
+            Query in admin portal search bar syntax, e.g. 'name=vm1'.
+        max_age : float
+            Max age in s of cached records; default is client TTL, 0 - always
+            ask engine.
+
+        Returns
+        -------
+        list
+            VM instances.
+        """
+        path = 'vms'
+        if search:
+            path += '?search=' + quote(search)
+        if max_age is None:
+            max_age = self._ttl
+        now = time.time()
+        cached = self._records.get(path)
+        if cached and now - cached[0] < max_age:
+            return cached[2]
+        body = self.get(path)
+        if cached and body is cached[1]:
+            records = cached[2]  # Not modified, don't parse again.
+        else:
+            records = parse_vms(body)
+        self._records[path] = (now, body, records)
+        return records
+
+    def query(self, names=(), pools=(), max_age=None):
+        """Fetch VMs by names and pools in one request.
+
+        Parameters
+        ----------
+        names : iterable
+            VM names.
+        pools : iterable
+            VMs pool names.
+        max_age : float
+            Max age in s of cached records, see vms().
+
+        Returns
+        -------
+        dict
+            VM name -> VM. Missing VMs are absent.
+        """
+        terms = ['name=%s' % name for name in sorted(names)]
+        terms += ['pool=%s' % pool for pool in sorted(pools)]
+        if not terms:
+            return {}
+        return dict((vm.name, vm)
+                    for vm in self.vms(' or '.join(terms), max_age))
+
+    def vm(self, name, max_age=None):
+        """Return VM by name, None if there is no such VM."""
+        return self.query(names=(name,), max_age=max_age).get(name)
+
+    def _vm_id(self, name):
+        vm = self.vm(name)
+        if vm is None:
+            raise excepts.RestApiError("No VM with name: %s." % name)
+        return vm.id
+
+    def pools(self):
+        """Return
+        ------
+        dict
+            Pool name -> pool id.
+        """
+        root = ElementTree.fromstring(self.get('vmpools'))
+        return dict((elem.findtext('name'), elem.get('id'))
+                    for elem in root.findall('vm_pool'))
+
+    def pool_vms(self, pool_name):
+        """VMs of a pool.
+
+        Returns
+        -------
+        list
+            VM instances sorted by name.
+        """
+        pool_id = self.pools().get(pool_name)
+        if not pool_id:
+            raise excepts.RestApiError("No VMs pool with name: %s." %
+                                       pool_name)
+        return sorted((vm for vm in self.vms() if vm.pool == pool_id),
+                      key=lambda vm: vm.name)
+
+    def allocate_vm(self, pool_name):
+        """Take a VM from a pool and start it, like a user does in user
+        portal.
+
+        Returns
+        -------
+        VM
+            Allocated VM.
+        """
+        pool_id = self.pools().get(pool_name)
+        if not pool_id:
+            raise excepts.RestApiError("No VMs pool with name: %s." %
+                                       pool_name)
+        root = ElementTree.fromstring(self.post('vmpools/%s/allocatevm' %
+                                                pool_id))
+        elem = root.find('vm')
+        if elem is None:
+            raise excepts.RestApiError("Pool %s did not return a VM." %
+                                       pool_name)
+        vm = parse_vms(self.get('vms/%s' % elem.get('id')))[0]
+        logger.info("Allocated VM from pool %s: %s.", pool_name, vm.name)
+        claims.claim(vm.name)  # Hide it from wait_for_pool_vm() of others.
+        return vm
+
+    def wait_for_pool_vm(self, pool_name, known=(), timeout=VM_ACTION_TIMEOUT,
+                         poll_frequency=POLL_FREQUENCY):
+        """Wait for a VM handed out by a pool, e.g. after Run is clicked for
+        the pool in user portal. Pool VMs are polled by one conditional
+        request per check. The first VM that is not in `known`, is booting
+        or up and is not claimed by another test is claimed and returned.
+
+        Parameters
+        ----------
+        pool_name : str
+            VMs pool name.
+        known : iterable
+            Names of VMs that were taken before, e.g. listed before the
+            click.
+
+        Returns
+        -------
+        VM
+            New VM.
+
+        Raises
+        ------
+        WaitTimeoutError
+            No new VM in time.
+        """
+        end = time.time() + timeout
+        known = set(known)
+        while True:
+            vms = self.query(pools=(pool_name,), max_age=0)
+            for name in sorted(set(vms) - known):
+                vm = vms[name]
+                if (vm.is_up or vm.is_booting) and claims.claim(name):
+                    logger.info("Found a new VM from pool %s: %s, status: "
+                                "%s.", pool_name, name, vm.status)
+                    return vm
+            if time.time() > end:
+                raise excepts.WaitTimeoutError(
+                    "No new VM from pool %s in %s s." % (pool_name, timeout))
+            time.sleep(poll_frequency)
+
+    def start_vm(self, name):
+        self.post('vms/%s/start' % self._vm_id(name))
+
+    def stop_vm(self, name):
+        """Power off VM. VM goes back to its pool, so its claim is released.
+        """
+        self.post('vms/%s/stop' % self._vm_id(name))
+        claims.release(name)
+
+    def shutdown_vm(self, name):
+        self.post('vms/%s/shutdown' % self._vm_id(name))
+        claims.release(name)
+
+    def prepare_vm(self, vm_name=None, pool_name=None,
+                   timeout=VM_ACTION_TIMEOUT):
+        """Start a VM, or allocate one from a pool, and wait until it is
+        booting or up.
+
+        Parameters
+        ----------
+        vm_name : str
+            VM name, has precedence.
+        pool_name : str
+            VMs pool name.
+
+        Returns
+        -------
+        tuple
+            (VM, allocated). Allocated VM should be stopped after the test.
+        """
+        if vm_name:
+            vm = self.vm(vm_name)
+            if vm is None:
+                raise excepts.RestApiError("No VM with name: %s." % vm_name)
+            allocated = False
+            if vm.is_down:
+                logger.info("Up VM: %s.", vm_name)
+                self.start_vm(vm_name)
+        elif pool_name:
+            vm = self.allocate_vm(pool_name)
+            allocated = True
+        else:
+            raise excepts.RestApiError("Not defined: VM or pool name.")
+        vm = self.wait_for_status(vm.name, (STATUS_BOOTING, STATUS_UP),
+                                  timeout)
+        return vm, allocated
+
+    def wait_for(self, name, condition, timeout=VM_ACTION_TIMEOUT,
+                 poll_frequency=POLL_FREQUENCY, message=None):
+        """Poll VM until `condition(vm)` is true. VM is polled with a
+        conditional request, the condition is evaluated only on change.
+
+        Returns
+        -------
+        VM
+            VM that satisfies the condition.
+
+        Raises
+        ------
+        WaitTimeoutError
+            Condition is not met in time.
+        """
+        end = time.time() + timeout
+        path = 'vms/%s' % self._vm_id(name)
+        body = None
+        vm = None
+        while True:
+            data = self.get(path)
+            if data is not body:
+                body = data
+                vm = parse_vms(body)[0]
+                if condition(vm):
+                    return vm
+            if time.time() > end:
+                raise excepts.WaitTimeoutError(
+                    message or "%s: status is %s, ips: %s" %
+                    (name, vm.status, ', '.join(vm.ips)))
+            time.sleep(poll_frequency)
+
+    def wait_for_all(self, names, condition, timeout=VM_ACTION_TIMEOUT,
+                     poll_frequency=POLL_FREQUENCY):
+        """Poll many VMs until `condition(vm)` is true for all of them. All
+        VMs are fetched by one request per check.
+
+        Returns
+        -------
+        dict
+            VM name -> VM.
+
+        Raises
+        ------
+        WaitTimeoutError
+            Condition is not met in time.
+        """
+        end = time.time() + timeout
+        while True:
+            vms = self.query(names=names, max_age=0)
+            pending = [name for name in names
+                       if name not in vms or not condition(vms[name])]
+            if not pending:
+                return vms
+            if time.time() > end:
+                raise excepts.WaitTimeoutError(
+                    "VMs: %s, status: %s" % (
+                        ', '.join(pending),
+                        ', '.join(vms[name].status if name in vms else '?'
+                                  for name in pending)))
+            time.sleep(poll_frequency)
+
+    def wait_for_status(self, name, statuses, timeout=VM_ACTION_TIMEOUT,
+                        poll_frequency=POLL_FREQUENCY):
+        """Wait until VM status is in `statuses`, e.g. (STATUS_UP,
+        STATUS_BOOTING).
+        """
+        if isinstance(statuses, str):
+            statuses = (statuses,)
+        return self.wait_for(name, lambda vm: vm.status in statuses, timeout,
+                             poll_frequency)
+
+    def wait_for_ip(self, name, timeout=VM_ACTION_TIMEOUT,
+                    poll_frequency=POLL_FREQUENCY):
+        """Wait until guest agent reports an IP address.
+
+        Returns
+        -------
+        str
+            IP address.
+        """
+        return self.wait_for(name, lambda vm: vm.ip, timeout,
+                             poll_frequency).ip
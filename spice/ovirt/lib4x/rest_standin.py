@@ -0,0 +1,388 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Local stand-in of oVirt engine REST API. It emulates only the endpoints
+used by rest.Client:
+
+    GET  /ovirt-engine/api/vms[?search=name=X or pool=Y ...]
+    GET  /ovirt-engine/api/vms/<id>
+    POST /ovirt-engine/api/vms/<id>/start|stop|shutdown
+    GET  /ovirt-engine/api/vmpools
+    POST /ovirt-engine/api/vmpools/<id>/allocatevm
+
+Started VM is 'powering_up' for `boot_time` seconds, then it is 'up' and has
+an IP address. Responses have ETag and honour If-None-Match. Connections are
+kept alive (HTTP/1.1).
+
+Example
+-------
+
+    engine = rest_standin.Engine(boot_time=1)
+    engine.add_pool('pool_??', size=3)
+    engine.add_vm('vm1')
+    with rest_standin.serve(engine) as url:
+        client = rest.Client(url, 'user', 'pass', 'profile')
+        client.start_vm('vm1')
+        client.wait_for_status('vm1', rest.STATUS_UP)
+
+Or from a shell:
+
+    python rest_standin.py --port 8080 --vm vm1 --pool pool_??:3
+
+"""
+
+import re
+import time
+import uuid
+import base64
+import hashlib
+import logging
+import argparse
+import threading
+import contextlib
+from xml.sax import saxutils
+
+try:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlsplit, parse_qs
+except ImportError:
+    from http.server import HTTPServer, BaseHTTPRequestHandler  # noqa
+    from socketserver import ThreadingMixIn  # pylint: disable=F0401
+    from urllib.parse import urlsplit, parse_qs  # pylint: disable=F0401
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = '/ovirt-engine/api/'
+"""Path of API root."""
+BOOT_TIME = 5
+"""Default time in s a VM stays in 'powering_up' state."""
+COOKIE = 'JSESSIONID'
+"""Name of session cookie."""
+
+
+class Engine(object):
+    """State of emulated VMs and pools. All methods are thread safe."""
+
+    def __init__(self, boot_time=BOOT_TIME, user=None, password=None):
+        """
+        Parameters
+        ----------
+        boot_time : float
+            Time in s a VM stays in 'powering_up' state.
+        user : str
+            Required user name with profile: 'user@profile'. Any credentials
+            are accepted if not set.
+        password : str
+            Required password.
+        """
+        self.boot_time = boot_time
+        self.user = user
+        self.password = password
+        self.requests = 0
+        self.sessions = set()
+        self._vms = {}
+        self._pools = {}
+        self._ips = 0
+        self._lock = threading.Lock()
+
+    def add_vm(self, name, status='down', pool=None):
+        """Add VM.
+
+        Returns
+        -------
+        str
+            VM id.
+        """
+        vm_id = str(uuid.uuid4())
+        with self._lock:
+            self._vms[vm_id] = {'name': name, 'status': status, 'pool': pool,
+                                'boot': None, 'ip': None}
+            if status == 'up':
+                self._vms[vm_id]['ip'] = self._mk_ip()
+        return vm_id
+
+    def add_pool(self, name, size):
+        """Add pool with `size` VMs. Question marks in `name` are replaced
+        with VM index, like engine does.
+
+        Returns
+        -------
+        str
+            Pool id.
+        """
+        pool_id = str(uuid.uuid4())
+        with self._lock:
+            self._pools[pool_id] = name
+        marks = name.count('?')
+        for i in range(1, size + 1):
+            if marks:
+                vm_name = name.replace('?' * marks, '%0*d' % (marks, i), 1)
+            else:
+                vm_name = '%s-%d' % (name, i)
+            self.add_vm(vm_name, pool=pool_id)
+        return pool_id
+
+    def _mk_ip(self):
+        self._ips += 1
+        return '192.0.2.%d' % ((self._ips - 1) % 254 + 1)
+
+    def _tick(self):
+        """Finish booting of VMs. Called with lock held."""
+        now = time.time()
+        for vm in self._vms.values():
+            if vm['status'] == 'powering_up' and \
+                    now >= vm['boot'] + self.boot_time:
+                vm['status'] = 'up'
+                vm['ip'] = self._mk_ip()
+
+    def status(self, name):
+        """Return status of VM `name`."""
+        with self._lock:
+            self._tick()
+            for vm in self._vms.values():
+                if vm['name'] == name:
+                    return vm['status']
+        return None
+
+    def _vm_xml(self, vm_id):
+        vm = self._vms[vm_id]
+        parts = ['<vm href="%svms/%s" id="%s">' % (API_PREFIX, vm_id, vm_id),
+                 '<name>%s</name>' % saxutils.escape(vm['name']),
+                 '<status>%s</status>' % vm['status']]
+        if vm['pool']:
+            parts.append('<vm_pool id="%s"/>' % vm['pool'])
+        if vm['ip']:
+            parts.append('<guest_info><ips><ip address="%s"/></ips>'
+                         '</guest_info>' % vm['ip'])
+        parts.append('</vm>')
+        return ''.join(parts)
+
+    def _match(self, vm_id, search):
+        """Search is "term or term ...", term is name=X or pool=X. X can have
+        '*' and '?' wildcards."""
+        if not search:
+            return True
+        vm = self._vms[vm_id]
+        for term in re.split(r'\s+or\s+', search.strip(), flags=re.I):
+            key, _, value = term.partition('=')
+            regex = re.escape(value.strip()).replace(r'\*', '.*')
+            regex = regex.replace(r'\?', '.') + '$'
+            if key.strip() == 'name':
+                field = vm['name']
+            elif key.strip() == 'pool':
+                field = self._pools.get(vm['pool'])
+            else:
+                continue
+            if field is not None and re.match(regex, field):
+                return True
+        return False
+
+    def get(self, path, query):
+        """Handle GET. Returns (status, XML)."""
+        with self._lock:
+            self._tick()
+            if path == 'vms':
+                search = query.get('search', [''])[0]
+                vms = [self._vm_xml(vm_id) for vm_id in sorted(self._vms)
+                       if self._match(vm_id, search)]
+                return 200, '<vms>%s</vms>' % ''.join(vms)
+            match = re.match(r'vms/([^/]+)$', path)
+            if match and match.group(1) in self._vms:
+                return 200, self._vm_xml(match.group(1))
+            if path == 'vmpools':
+                pools = ['<vm_pool id="%s"><name>%s</name></vm_pool>' %
+                         (pool_id, saxutils.escape(name))
+                         for pool_id, name in sorted(self._pools.items())]
+                return 200, '<vm_pools>%s</vm_pools>' % ''.join(pools)
+        return 404, '<fault><reason>Not Found</reason></fault>'
+
+    def post(self, path):
+        """Handle POST. Returns (status, XML)."""
+        with self._lock:
+            self._tick()
+            match = re.match(r'vms/([^/]+)/(start|stop|shutdown)$', path)
+            if match and match.group(1) in self._vms:
+                vm = self._vms[match.group(1)]
+                if match.group(2) == 'start':
+                    if vm['status'] != 'down':
+                        return 409, ('<fault><reason>Operation Failed'
+                                     '</reason></fault>')
+                    vm['status'] = 'powering_up'
+                    vm['boot'] = time.time()
+                else:
+                    vm['status'] = 'down'
+                    vm['ip'] = None
+                return 200, '<action><status>complete</status></action>'
+            match = re.match(r'vmpools/([^/]+)/allocatevm$', path)
+            if match and match.group(1) in self._pools:
+                for vm_id in sorted(self._vms):
+                    vm = self._vms[vm_id]
+                    if vm['pool'] == match.group(1) and \
+                            vm['status'] == 'down':
+                        vm['status'] = 'powering_up'
+                        vm['boot'] = time.time()
+                        return 200, ('<action><status>complete</status>'
+                                     '<vm id="%s"/></action>' % vm_id)
+                return 409, ('<fault><reason>No free VM in pool</reason>'
+                             '</fault>')
+        return 404, '<fault><reason>Not Found</reason></fault>'
+
+    def authorized(self, headers):
+        """Check session cookie or Basic credentials.
+
+        Returns
+        -------
+        str or None
+            Session id if a new session is open, '' if request is authorized
+            by an existing session or by credentials. None - unauthorized.
+        """
+        cookie = headers.get('Cookie') or ''
+        for item in cookie.split(';'):
+            name, _, value = item.strip().partition('=')
+            if name == COOKIE and value in self.sessions:
+                return ''
+        auth = headers.get('Authorization') or ''
+        if not auth.startswith('Basic '):
+            return None
+        user, _, password = base64.b64decode(
+            auth[6:].encode('ascii')).decode('utf-8').partition(':')
+        if self.user is not None and (user, password) != (self.user,
+                                                          self.password):
+            return None
+        if 'persistent-auth' in (headers.get('Prefer') or ''):
+            session = uuid.uuid4().hex
+            self.sessions.add(session)
+            return session
+        return ''
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Request handler, engine is `server.engine`."""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, fmt, *args):  # pylint: disable=W0221
+        logger.debug(fmt, *args)
+
+    def _reply(self, status, body, headers=None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/xml')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+
+    def _handle(self, method):
+        engine = self.server.engine
+        engine.requests += 1
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        session = engine.authorized(self.headers)
+        if session is None:
+            self._reply(401, '<fault><reason>Unauthorized</reason></fault>',
+                        {'WWW-Authenticate': 'Basic realm="ENGINE"'})
+            return
+        headers = {}
+        if session:
+            headers['Set-Cookie'] = '%s=%s; Path=/ovirt-engine/api' % (
+                COOKIE, session)
+        url = urlsplit(self.path)
+        if not url.path.startswith(API_PREFIX):
+            self._reply(404, '<fault><reason>Not Found</reason></fault>')
+            return
+        path = url.path[len(API_PREFIX):].rstrip('/')
+        if method == 'GET':
+            status, body = engine.get(path, parse_qs(url.query))
+        else:
+            status, body = engine.post(path)
+        if method == 'GET' and status == 200:
+            etag = '"%s"' % hashlib.sha1(body.encode('utf-8')).hexdigest()
+            headers['ETag'] = etag
+            if self.headers.get('If-None-Match') == etag:
+                status, body = 304, ''
+        self._reply(status, body, headers)
+
+    def do_GET(self):  # pylint: disable=C0103
+        self._handle('GET')
+
+    def do_POST(self):  # pylint: disable=C0103
+        self._handle('POST')
+
+
+class StandInServer(ThreadingMixIn, HTTPServer):
+    """HTTP server bound to an Engine."""
+    daemon_threads = True
+
+    def __init__(self, engine, address=('127.0.0.1', 0)):
+        HTTPServer.__init__(self, address, Handler)
+        self.engine = engine
+
+    @property
+    def url(self):
+        """Engine URL to pass to rest.Client."""
+        host, port = self.server_address[:2]
+        return 'http://%s:%s/ovirt-engine/' % (host, port)
+
+
+@contextlib.contextmanager
+def serve(engine, address=('127.0.0.1', 0)):
+    """Run stand-in server in a background thread.
+
+    Yields
+    ------
+    str
+        Engine URL.
+    """
+    server = StandInServer(engine, address)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        yield server.url
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Local stand-in of oVirt engine REST API.')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--boot-time', type=float, default=BOOT_TIME)
+    parser.add_argument('--vm', action='append', default=[],
+                        help='VM name, can be repeated.')
+    parser.add_argument('--pool', action='append', default=[],
+                        help='NAME:SIZE, can be repeated.')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG)
+    engine = Engine(boot_time=args.boot_time)
+    for name in args.vm:
+        engine.add_vm(name)
+    for pool in args.pool:
+        name, _, size = pool.rpartition(':')
+        engine.add_pool(name, int(size))
+    server = StandInServer(engine, ('', args.port))
+    logger.info("Serving: %s", server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Pool of logged-in WebDriver sessions.
+
+Opening a browser and logging in to a portal takes tens of seconds. Sessions
+live in Selenium server, so they survive the test process. The pool stores
+session id and home page URL in a JSON file keyed by (browser, host, port,
+user, portal). Next test attaches to the session, checks it by one
+execute_script() call and resets the browser to the portal home page.
+
+Example
+-------
+
+    pool = sessions.SessionPool.for_job(vt_test)
+    with pool.session(cfg.selenium_driver, host, port, cfg.ovirt_user,
+                      'user',
+                      login=lambda drv: user_login.UserLoginPage(
+                          drv).login_user(...),
+                      home_page_cls=user_home.UserHomePage) as home_page:
+        ...
+
+The session is returned to the pool when the block ends, or closed and
+dropped if the block raised: the browser is in unknown state.
+
+"""
+
+import os
+import json
+import logging
+import threading
+import contextlib
+
+from selenium import common
+from selenium.webdriver.remote import remote_connection
+
+from . import driver
+from . import excepts
+
+logger = logging.getLogger(__name__)
+
+POOL_FILE = "webdriver_sessions.json"
+"""Default name of the sessions file."""
+CHECK_JS = "return document.readyState + ' ' + window.location.href;"
+"""Cheap check of a session: one round-trip, no page reload."""
+RESET_TIMEOUT = 10
+"""Timeout in s for the home page after the session is reset."""
+
+
+class AttachedRemote(driver.Remote):
+    """Remote driver attached to an existing Selenium session. No new
+    browser is started.
+    """
+
+    def __init__(self, command_executor, session_id, capabilities):
+        """
+        Parameters
+        ----------
+        command_executor : str
+            URL of Selenium server, e.g. http://host:4444/wd/hub
+        session_id : str
+            Existing session id.
+        capabilities : dict
+            Capabilities reported when the session was created.
+        """
+        self._attach = (session_id, capabilities)
+        super(AttachedRemote, self).__init__(
+            command_executor=remote_connection.RemoteConnection(
+                command_executor),
+            desired_capabilities=capabilities)
+
+    def start_session(self, *args, **kwargs):
+        """Overridden method. Attach to the session instead of creating
+        a new one.
+        """
+        self.session_id, self.capabilities = self._attach
+        self.w3c = False
+
+
+class SessionPool(object):
+    """Logged-in WebDriver sessions shared by tests of one job.
+
+    Parameters
+    ----------
+    path : str
+        JSON file with sessions. Put it to a job-wide tmp dir, see
+        for_job().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._keys = {}
+
+    @classmethod
+    def for_job(cls, vt_test):
+        """Pool of the job of a test. The file is in the tmp dir avocado
+        keeps for all tests of a job and removes when the job ends.
+
+        Parameters
+        ----------
+        vt_test : avocado.core.plugins.vt.VirtTest
+            QEMU test object.
+        """
+        return cls(os.path.join(vt_test.teststmpdir, POOL_FILE))
+
+    @staticmethod
+    def key(browser, host, port, user, portal):
+        return '%s|%s|%s|%s|%s' % (browser, host, port, user, portal)
+
+    def _load(self):
+        try:
+            with open(self.path) as fd:
+                return json.load(fd)
+        except (IOError, ValueError):
+            return {}
+
+    def _store(self, key, entry):
+        with self._lock:
+            entries = self._load()
+            if entry is None:
+                entries.pop(key, None)
+            else:
+                entries[key] = entry
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as fd:
+                json.dump(entries, fd, indent=4, sort_keys=True)
+            os.rename(tmp, self.path)
+
+    def _attach(self, entry, home_page_cls):
+        """Attach to a stored session, check it and reset it to home page.
+
+        Returns
+        -------
+            Home page object or None if the session is not usable.
+        """
+        drv = None
+        try:
+            drv = AttachedRemote(entry['executor'], entry['session_id'],
+                                 entry['capabilities'])
+            state = drv.execute_script(CHECK_JS)
+            logger.info("Reuse WebDriver session %s: %s.",
+                        entry['session_id'], state)
+            drv.get(entry['home_url'])
+            return home_page_cls(drv, timeout=RESET_TIMEOUT)
+        except (common.exceptions.WebDriverException,
+                excepts.InitPageValidationError) as excp:
+            logger.info("Stored WebDriver session is not usable: %s", excp)
+            if drv is not None:
+                try:
+                    drv.quit()
+                except common.exceptions.WebDriverException:
+                    pass
+            return None
+
+    def acquire(self, browser, host, port, user, portal, login,
+                home_page_cls):
+        """Return home page of a logged-in session. Reuse a stored session
+        if it is alive, otherwise open a new one and log in.
+
+        Parameters
+        ----------
+        browser : str
+            Browser name, see DriverFactory.
+        host : str
+            Selenium server host.
+        port : int
+            Selenium server port.
+        user : str
+            Portal user name.
+        portal : str
+            Portal name, e.g. 'user' or 'admin'.
+        login : callable
+            Called with a new driver, returns home page object.
+        home_page_cls : type
+            Home page object class; used to check a reused session.
+
+        Returns
+        -------
+            Home page object.
+        """
+        key = self.key(browser, host, port, user, portal)
+        entry = self._load().get(key)
+        home_page = None
+        if entry:
+            home_page = self._attach(entry, home_page_cls)
+            if home_page is None:
+                self._store(key, None)
+        if home_page is None:
+            drv = driver.DriverFactory(browser, host, port)
+            drv.maximize_window()
+            home_page = login(drv)
+            drv = home_page.driver
+            self._store(key, {
+                'executor': 'http://%s:%s/wd/hub' % (host, port),
+                'session_id': drv.session_id,
+                'capabilities': drv.capabilities,
+                'home_url': drv.current_url,
+            })
+        self._keys[id(home_page.driver)] = key
+        return home_page
+
+    def release(self, home_page):
+        """Return session to the pool. The browser stays open and logged in.
+        """
+        self._keys.pop(id(home_page.driver), None)
+
+    def discard(self, home_page):
+        """Close session and remove it from the pool, e.g. after a test
+        failure left the browser in unknown state.
+        """
+        key = self._keys.pop(id(home_page.driver), None)
+        if key:
+            self._store(key, None)
+        try:
+            home_page.driver.quit()
+        except common.exceptions.WebDriverException:
+            pass
+
+    @contextlib.contextmanager
+    def session(self, *args, **kwargs):
+        """Acquire a session for a block, see acquire() for parameters.
+        Release it when the block ends, discard it if the block raised.
+
+        Yields
+        ------
+            Home page object.
+        """
+        home_page = self.acquire(*args, **kwargs)
+        try:
+            yield home_page
+        except Exception:
+            self.discard(home_page)
+            raise
+        self.release(home_page)
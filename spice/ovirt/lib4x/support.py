@@ -16,6 +16,7 @@
 """
 
 import logging
+import contextlib
 
 from selenium import common
 from selenium.webdriver.support import ui
@@ -25,14 +26,116 @@ from . import excepts
 logger = logging.getLogger(__name__)
 
 
-POLL_FREQUENCY = 1
+POLL_FREQUENCY = 0.5
+"""Default interval in s between two checks of a condition."""
+IMPLICIT_WAIT = 15
+"""Default implicit wait of WebDriver in s. Lookups of elements outside
+explicit waits wait for GWT to render them."""
 
-#WebDriverWait == from selenium.webdriver.support import ui.WebDriverWait
-#poll_frequency=POLL_FREQUENCY
+_no_wait_depth = {}
+"""Nesting of no_implicit_wait() per driver: id(driver) -> depth."""
+
+
+@contextlib.contextmanager
+def no_implicit_wait(driver):
+    """Zero implicit wait of driver in the block, so a check of a missing
+    element returns at once. IMPLICIT_WAIT is restored when the outermost
+    block ends.
+
+    Parameters
+    ----------
+    driver
+        WebDriver instance or None - do nothing.
+    """
+    if driver is None:
+        yield
+        return
+    key = id(driver)
+    if not _no_wait_depth.get(key):
+        driver.implicitly_wait(0)
+    _no_wait_depth[key] = _no_wait_depth.get(key, 0) + 1
+    try:
+        yield
+    finally:
+        _no_wait_depth[key] -= 1
+        if not _no_wait_depth[key]:
+            del _no_wait_depth[key]
+            driver.implicitly_wait(IMPLICIT_WAIT)
+
+
+def wait_until(condition, timeout, message='', poll_frequency=None,
+               ignored_exceptions=None, driver=None):
+    """Poll `condition` until it returns a true value. Implicit wait of
+    driver is zero while polling, so every check takes one round-trip.
+
+    Parameters
+    ----------
+    condition : callable
+        Function without arguments.
+    timeout : float
+        Timeout in s. Condition is checked at least once.
+    message : str or callable
+        Error message, callable is called only if the wait times out.
+    poll_frequency : float
+        Interval in s between two checks; default is POLL_FREQUENCY.
+    ignored_exceptions : tuple
+        Exceptions raised by condition that mean "not yet".
+    driver
+        WebDriver used by condition; see no_implicit_wait().
+
+    Returns
+    -------
+        Value returned by condition.
+
+    Raises
+    ------
+    TimeoutException
+        Condition was not met in time.
+    """
+    poll_frequency = poll_frequency or POLL_FREQUENCY
+    if timeout:
+        poll_frequency = min(poll_frequency, timeout)
+    wait = ui.WebDriverWait(driver=None, timeout=timeout or 0,
+                            poll_frequency=poll_frequency,
+                            ignored_exceptions=ignored_exceptions)
+    try:
+        with no_implicit_wait(driver):
+            return wait.until(lambda _: condition())
+    except common.exceptions.TimeoutException:
+        if callable(message):
+            message = message()
+        raise common.exceptions.TimeoutException(message)
+
+
+def all_of(*conditions):
+    """Combine conditions: true when all conditions are true.
+
+    Returns
+    -------
+    callable
+        Condition without arguments.
+    """
+    return lambda: all(cond() for cond in conditions)
+
+
+def any_of(*conditions):
+    """Combine conditions: true when any condition is true.
+
+    Examples
+    --------
+
+        wait_until(any_of(lambda: vm.is_up, lambda: vm.is_booting), 60)
+
+    Returns
+    -------
+    callable
+        Condition without arguments.
+    """
+    return lambda: any(cond() for cond in conditions)
 
 
 class WaitForPageObject(object):
-    """Wrapper around WebDriverWait providing helper methods for page objects.
+    """Explicit waits for page objects.
 
     Example
     -------
@@ -41,40 +144,73 @@ class WaitForPageObject(object):
 
         WaitForPageObject(template, 60).to_disappear()
         WaitForPageObject(template, 30).status('is_ok')
+        WaitForPageObject(template, 30).status(('is_up', 'is_booting'))
         WaitForPageObject(template, 30).status_not('is_locked')
         ...
 
     """
-    __IGNORED_EXCEPTIONS = excepts.InitPageValidationError
-    __DISAPPEAR_TIMEOUT = 1
+    __IGNORED_EXCEPTIONS = (excepts.InitPageValidationError,)
 
-    def __init__(self, page_object, timeout=None):
-        timeout = timeout or 0
+    def __init__(self, page_object, timeout=None,
+                 poll_frequency=POLL_FREQUENCY):
+        """
+        Parameters
+        ----------
+        page_object
+            Page object to watch.
+        timeout : float
+            Timeout in s.
+        poll_frequency : float
+            Interval in s between two checks.
+        """
         self.__page_object = page_object
-        self.__wait = ui.WebDriverWait(
-            driver=self,
-            # astepano@: what the ...?????? It wasn't me who wrote this!
-            #  This object is only for methods: until_not/until
-            #  .driver will be passed as an argument to until.
-            #  See: (/usr/lib/python2.7/site-packages/selenium/webdriver/
-            #        support/wait.py)
-            #     def until(self, method, message=''):
-            #        """Calls the method provided with the driver as
-            #        an argument until the return value is not False.
-            #        """
-            #        ....
-            #        value = method(self._driver)
-            # F@CK!!!!!!!!
-            timeout=timeout,
-            poll_frequency=POLL_FREQUENCY,
-            ignored_exceptions=self.__IGNORED_EXCEPTIONS)
-
-    @property
-    def __validated_page_object(self):
-        """Runs init validation before the page object is returned.
+        self.__timeout = timeout or 0
+        self.__poll_frequency = poll_frequency
+
+    def __until(self, condition, message):
+        return wait_until(condition, self.__timeout, message,
+                          poll_frequency=self.__poll_frequency,
+                          ignored_exceptions=self.__IGNORED_EXCEPTIONS,
+                          driver=self.__page_object.driver)
+
+    def __is_present(self):
+        """Runs init validation. Returns True if the page object is present.
         """
         self.__page_object._initial_page_object_validation()
-        return self.__page_object
+        return True
+
+    def __status_message(self):
+        try:
+            status = self.__page_object.status
+        except (common.exceptions.WebDriverException,
+                excepts.InitPageValidationError) as ex:
+            status = ex
+        return '%s: status is "%s"' % (self.__page_object, status)
+
+    def __status(self, status_prop):
+        """Condition: any of page object properties is True.
+
+        Parameters
+        ----------
+        status_prop : str or tuple
+            Name of the status property or names of properties.
+        """
+        if isinstance(status_prop, basestring):
+            status_prop = (status_prop,)
+        return any_of(*[
+            lambda prop=prop: getattr(self.__page_object, prop)
+            for prop in status_prop])
+
+    def to_appear(self, message=None):
+        """Waits until the page object is present on the page.
+
+        Parameters
+        ----------
+        message : str
+            Error message.
+        """
+        message = message or '%s is not present' % self.__page_object
+        self.__until(self.__is_present, message)
 
     def to_disappear(self, message=None):
         """Waits until the page object is no longer present on the page.
@@ -85,31 +221,22 @@ class WaitForPageObject(object):
             Error message.
         """
         message = message or '%s is still present' % self.__page_object
-        original_timeout = self.__page_object._timeout
-        self.__page_object.driver.implicitly_wait(self.__DISAPPEAR_TIMEOUT)
-        try:
-            self.__wait.until_not(lambda self: self.__validated_page_object,
-                                  message=message)
-        except common.exceptions.TimeoutException as ex:
-            self.__page_object.driver.implicitly_wait(original_timeout)
-            raise ex
+        self.__until(lambda: not self.__page_object.is_present, message)
 
     def status(self, status_prop, message=None):
         """Waits until page object property `status_prop` is evaluated as True.
 
         Parameters
         ----------
-        status_prop : str
+        status_prop : str or tuple
             Name of the page object status property; the property should return
-            only bool, not string.
+            only bool, not string. For a tuple of names wait until any of them
+            is True.
         message : str
             Error message.
         """
-        message = message or '%s: status is "%s"' % (self.__page_object,
-                                                     self.__page_object.status)
-        self.__wait.until(lambda self:
-                          getattr(self.__page_object, status_prop),
-                          message=message)
+        self.__until(self.__status(status_prop),
+                     message or self.__status_message)
 
     def status_not(self, status_prop, message=None):
         """Waits until page object property `status_prop` is evaluated as
@@ -117,14 +244,12 @@ class WaitForPageObject(object):
 
         Parameters
         ----------
-        status_prop : str
+        status_prop : str or tuple
             Name of the page object status property; the property should return
-            only bool, not string.
+            only bool, not string. For a tuple of names wait until all of them
+            are False.
         message : str
             Error message.
         """
-        message = message or '%s: status is "%s"' % (self.__page_object,
-                                                     self.__page_object.status)
-        self.__wait.until_not(lambda self:
-                              getattr(self.__page_object, status_prop),
-                              message=message)
+        cond = self.__status(status_prop)
+        self.__until(lambda: not cond(), message or self.__status_message)
@@ -19,6 +19,7 @@ import logging
 from selenium.webdriver.common import by
 
 from .. import deco
+from .. import claims
 from .. import page_base
 from .. import elements
 from .. import excepts
@@ -575,6 +576,7 @@ class BasicTabCtrl(object):
         if not status:
             msg = "%s - status is '%s'" % (vm, vm.status)
             raise excepts.WaitTimeoutError(msg)
+        return True
 
     def wait_until_vm_is_up(self, name, timeout=None):
         """Wait until VM is up.
@@ -651,22 +653,40 @@ class BasicTabCtrl(object):
         vms_names = [getattr(x, 'text') for x in vms]
         return set(vms_names)
 
-    def get_vm_from_pool(self, pool_name):
+    def get_vm_from_pool(self, pool_name, engine=None):
         regex = vms_base.mk_pool_regex(pool_name)
         vms = self.get_vms_names()
         for vm_name in sorted(vms):
             if re.match(regex, vm_name):
                 vm = VMInstance(self.driver, name=vm_name)
-                if vm.is_up or vm.is_booting:
+                if (vm.is_up or vm.is_booting) and claims.claim(vm_name):
                     logger.info("Found active VM from pool %s: %s.",
                                 pool_name,
                                 vm_name)
                     return vm
         logger.info("Did not found active vm from pool: %s. Start a new one.",
                     pool_name)
-        return self.start_vm_from_pool(pool_name)
+        return self.start_vm_from_pool(pool_name, engine)
+
+    def start_vm_from_pool(self, pool_name, engine=None,
+                           timeout=vms_base.POOL_VM_TIMEOUT):
+        """Click Run for a pool and wait for the VM handed out by the pool.
+
+        Parameters
+        ----------
+        pool_name : str
+            VMs pool name.
+        engine : rest.Client
+            Poll engine REST API instead of VMs list, see
+            vms_base.wait_for_pool_vm().
+        timeout : float
+            Timeout in s.
 
-    def start_vm_from_pool(self, pool_name):
+        Returns
+        -------
+        VMInstance
+            New VM from pool.
+        """
         vms_before = self.get_vms_names()
         if pool_name not in vms_before:
             msg = "No VMS pool with name: %s." % pool_name
@@ -674,19 +694,14 @@ class BasicTabCtrl(object):
         self.run_vm(pool_name)
         # Some dialog could appier
         vms_base.GuestAgentIsNotResponsiveDlg.ok_ignore(self.driver)
-        retries_left = 10
-        regex = vms_base.mk_pool_regex(pool_name)
-        while retries_left:
-            retries_left -= 1
-            vms_after = self.get_vms_names()
-            new_vms = vms_after - vms_before
-            if not new_vms:
-                time.sleep(1)
-                continue
-            for vm_name in sorted(new_vms):
-                if re.match(regex, vm_name):
-                    vm = VMInstance(self.driver, name=vm_name)
-                    if vm.is_up or vm.is_booting:
-                        logger.info("Found a new active VM from pool %s: %s.",
-                                    pool_name, vm_name)
-                    return vm
+
+        def active_names():
+            for vm_name in self.get_vms_names() - vms_before:
+                vm = VMInstance(self.driver, name=vm_name)
+                if vm.is_up or vm.is_booting:
+                    yield vm_name
+
+        vm_name = vms_base.wait_for_pool_vm(pool_name, vms_before,
+                                            active_names, engine, timeout,
+                                            self.driver)
+        return VMInstance(self.driver, name=vm_name)
@@ -15,10 +15,12 @@
 import re
 import time
 import logging
+import collections
 
 from selenium.webdriver.common import by
 from selenium import common
 
+from .. import claims
 from .. import page_base
 from .. import elements
 from .. import support
@@ -108,6 +110,42 @@ class VMModel(page_base.TableRowModel):
     STATUS_BOOTING = 'PoweringUp'
 
 
+class VMRecord(collections.namedtuple('VMRecord', ['row', 'status', 'name'])):
+    """VM table row read by VMS_TABLE in one request.
+
+    User portal table has no host and IP columns. Admin portal table has
+    them, see admin_home.VMS_TABLE; rest.Client.query() gives IPs.
+    """
+    __slots__ = ()
+
+    @property
+    def is_up(self):
+        return self.status == VMModel.STATUS_UP
+
+    @property
+    def is_down(self):
+        return self.status == VMModel.STATUS_DOWN
+
+    @property
+    def is_suspended(self):
+        return self.status == VMModel.STATUS_SUSPENDED
+
+    @property
+    def is_paused(self):
+        return self.status == VMModel.STATUS_PAUSED
+
+    @property
+    def is_booting(self):
+        return self.status == VMModel.STATUS_BOOTING
+
+
+VMS_TABLE = page_base.TableReader(
+    'SideTabExtendedVirtualMachineView_table_content_',
+    (('status', 1, 'data-status'), ('name', 2, None)),
+    VMRecord)
+"""Bulk reader of VMs table."""
+
+
 class RunOnceModel(dialogs.OkCancelDlgModel):
     """ Run once dialog """
     boot_options = elements.PageElement(
@@ -588,17 +626,23 @@ class ExtendedTabCtrl(object):
         assert self.wait_until_vm_starts_booting(name, timeout)
         return self.wait_until_vm_is_up(name, timeout)
 
-    def _wait_for_vm_status(self, name, status_prop, timeout=None):
-        """Wait until VM status property returns True.
+    def _wait_for_vm_status(self, name, status_prop, timeout=None,
+                            poll_frequency=None):
+        """Wait until VM status property returns True. Status is polled from
+        the VMs table, one request per check.
 
         Parameters
         ----------
         name
             VM name
-        status_prop : str
-            Name of the status property, e.g. 'vm.is_up' -> 'is_up'
+        status_prop : str or tuple
+            Name of the status property, e.g. 'vm.is_up' -> 'is_up'. For a
+            tuple of names wait until any of them is True, e.g.
+            ('is_up', 'is_booting').
         timeout
             Timeout in [s] to wait.
+        poll_frequency
+            Interval in [s] between two checks.
 
         Returns
         -------
@@ -611,15 +655,26 @@ class ExtendedTabCtrl(object):
             Failure.
 
         """
-        vm = self._get_vm_inst(name)
+        if isinstance(status_prop, basestring):
+            status_prop = (status_prop,)
         timeout = timeout or self.VM_ACTION_TIMEOUT
+        state = {}
+
+        def has_status():
+            rec = state['rec'] = self.get_vm_record(name)
+            return rec is not None and any(getattr(rec, prop)
+                                           for prop in status_prop)
+
         try:
-            w = support.WaitForPageObject(vm, timeout)
-            w.status(status_prop)
+            support.wait_until(has_status, timeout,
+                               poll_frequency=poll_frequency,
+                               driver=self.driver)
         except common.exceptions.TimeoutException:
-            prop_val = getattr(vm, status_prop)
-            msg = "%s.%s is: %s" % (vm.name, status_prop, prop_val)
+            rec = state.get('rec')
+            msg = "%s.%s is False, status is: %s" % (
+                name, '|'.join(status_prop), rec and rec.status)
             raise excepts.WaitTimeoutError(msg)
+        return True
 
     def wait_until_vm_is_up(self, name, timeout=None):
         """Wait until VM is up.
@@ -689,29 +744,89 @@ class ExtendedTabCtrl(object):
         """
         return self._wait_for_vm_status(name, 'is_booting', timeout)
 
+    def get_vms(self):
+        """Read the whole VMs table in one request.
+
+        Returns
+        -------
+        list
+            VMRecord instances sorted by row.
+        """
+        return VMS_TABLE.read(self.driver)
+
+    def get_vm_record(self, name):
+        """Return
+        ------
+        VMRecord
+            Row of VM `name`, None if VM is not in the table.
+        """
+        for rec in self.get_vms():
+            if rec.name == name:
+                return rec
+        return None
+
     def get_vms_names(self):
-        marker = ('//span[starts-with(@id, "SideTabExtendedVirtualMachineView'
-                  '_table_content_col2_row")]')
-        vms = self.driver.find_elements(by.By.XPATH, marker)
-        vms_names = [getattr(x, 'text') for x in vms]
-        return set(vms_names)
+        return set(rec.name for rec in self.get_vms())
+
+    def get_vms_status(self):
+        """Return
+        ------
+        dict
+            VM name -> VM status.
+        """
+        return dict((rec.name, rec.status) for rec in self.get_vms())
+
+    def get_pool_vms(self, pool_name, vms=None):
+        """VMs of a pool. Pool itself is not included.
+
+        Parameters
+        ----------
+        pool_name : str
+            Pool name.
+        vms : list
+            Records from get_vms(). Read table if not set.
 
-    def get_vm_from_pool(self, pool_name):
+        Returns
+        -------
+        list
+            VMRecord instances sorted by name.
+        """
         regex = vms_base.mk_pool_regex(pool_name)
-        vms = self.get_vms_names()
-        for vm_name in sorted(vms):
-            if re.match(regex, vm_name):
-                vm = VM(self.driver, name=vm_name)
-                if vm.is_up or vm.is_booting:
-                    logger.info("Found active VM from pool %s: %s.",
-                                pool_name,
-                                vm_name)
-                    return vm
+        if vms is None:
+            vms = self.get_vms()
+        return sorted((rec for rec in vms if re.match(regex, rec.name)),
+                      key=lambda rec: rec.name)
+
+    def get_vm_from_pool(self, pool_name, engine=None):
+        for rec in self.get_pool_vms(pool_name):
+            if (rec.is_up or rec.is_booting) and claims.claim(rec.name):
+                logger.info("Found active VM from pool %s: %s.",
+                            pool_name,
+                            rec.name)
+                return VM(self.driver, name=rec.name)
         logger.info("Did not found active vm from pool: %s. Start a new one.",
                     pool_name)
-        return self.start_vm_from_pool(pool_name)
+        return self.start_vm_from_pool(pool_name, engine)
+
+    def start_vm_from_pool(self, pool_name, engine=None,
+                           timeout=vms_base.POOL_VM_TIMEOUT):
+        """Click Run for a pool and wait for the VM handed out by the pool.
+
+        Parameters
+        ----------
+        pool_name : str
+            VMs pool name.
+        engine : rest.Client
+            Poll engine REST API instead of VMs table, see
+            vms_base.wait_for_pool_vm().
+        timeout : float
+            Timeout in s.
 
-    def start_vm_from_pool(self, pool_name):
+        Returns
+        -------
+        VM
+            New VM from pool.
+        """
         vms_before = self.get_vms_names()
         if pool_name not in vms_before:
             msg = "No VMS pool with name: %s." % pool_name
@@ -719,22 +834,15 @@ class ExtendedTabCtrl(object):
         self.run_vm(pool_name)
         # Some dialog could appier
         vms_base.GuestAgentIsNotResponsiveDlg.ok_ignore(self.driver)
-        retries_left = 10
-        regex = vms_base.mk_pool_regex(pool_name)
-        while retries_left:
-            retries_left -= 1
-            vms_after = self.get_vms_names()
-            new_vms = vms_after - vms_before
-            if not new_vms:
-                time.sleep(1)
-                continue
-            for vm_name in sorted(new_vms):
-                if re.match(regex, vm_name):
-                    vm = VM(self.driver, name=vm_name)
-                    if vm.is_up or vm.is_booting:
-                        logger.info("Found a new active VM from pool %s: %s.",
-                                    pool_name, vm_name)
-                    return vm
+
+        def active_names():
+            return [rec.name for rec in self.get_pool_vms(pool_name)
+                    if rec.is_up or rec.is_booting]
+
+        vm_name = vms_base.wait_for_pool_vm(pool_name, vms_before,
+                                            active_names, engine, timeout,
+                                            self.driver)
+        return VM(self.driver, name=vm_name)
 
 
 class TemplateTabMenuBar(page_base.PageObject):
@@ -1053,6 +1161,7 @@ class RunOnce(dialogs.OkCancelDlg):
         elif display_protocol == "SPICE":
             self._model.display_console_spice.click()
 
+    @elements.batched
     def fill_values(self, attach_floppy=None, attach_cd=None,
                     run_stateless=None, start_in_pause_mode=None,
                     kernel_path=None, initrd_path=None, kernel_params=None,
@@ -1129,6 +1238,7 @@ class ChangeCD(dialogs.OkCancelDlg):
         """ Initial validation, check if dialog is present. """
         self._model.pick_cd
 
+    @elements.batched
     def fill_values(self, cd=None):
         """
         Pick CD to change to
@@ -17,10 +17,14 @@
 """Page objects for the Virtual Machines tab.
 """
 
+import re
 import logging
 
+from selenium import common
 from selenium.webdriver.common import by
 
+from . import claims
+from . import support
 from . import page_base
 from . import dialogs
 from . import elements
@@ -28,6 +32,10 @@ from . import excepts
 
 logger = logging.getLogger(__name__)
 TIMEOUT_TABLE_ROW = 10
+POOL_VM_TIMEOUT = 120
+"""Timeout in s for a pool to hand out a VM."""
+POOL_VM_POLL = 1
+"""Interval in s between checks of VMs table for a new pool VM."""
 
 
 # Models
@@ -332,6 +340,7 @@ class VMPopup(dialogs.OkCancelDlg):
         self._model.custom_props_tab.click()
         return VMPopupCustPropsTab(self.driver)
 
+    @elements.batched
     def _fill_values(self, cluster=None, quota=None, template=None,
                      os_type=None, vm_type=None):
         """ Fill out only the common form fields on the main VM popup.
@@ -363,6 +372,7 @@ class VMPopup(dialogs.OkCancelDlg):
             self._model.advanced_opts_btn.click()
             logger.debug("VM advanced options collapsed.")
 
+    @elements.batched
     def fill_values(
             self, name=None, description=None,
             is_stateless=None, is_run_and_pause=None, is_delete_protected=None,
@@ -473,6 +483,7 @@ class VMPopupGeneralTab(page_base.PageObject):
         """ Initial validation - check for some element from the side-tab. """
         self._model.name
 
+    @elements.batched
     def fill_values(self, name=None, description=None, is_stateless=None,
                     is_run_and_pause=None, is_delete_protected=None,
                     nic_networks=None):
@@ -507,6 +518,7 @@ class VMPopupSystemTab(page_base.PageObject):
         """ Initial validation - check for some element from the side-tab. """
         self._model.mem_size
 
+    @elements.batched
     def fill_values(self, memory_size=None, cpu_cores=None,
                     cores_per_socket=None, num_of_sockets=None):
         """ Fill out given form fields.
@@ -537,6 +549,7 @@ class VMPopupInitRunTab(page_base.PageObject):
         """ Initial validation - check for some element from the side-tab. """
         self._model.time_zone
 
+    @elements.batched
     def fill_values(self, time_zone=None, domain=None):
         """ Fill out given form fields.
 
@@ -557,6 +570,7 @@ class VMPopupConsoleTab(page_base.PageObject):
         """ Initial validation - check for some element from the side-tab. """
         self._model.display_protocol
 
+    @elements.batched
     def fill_values(self, display_protocol=None, vnc_kb_layout=None,
                     usb_policy=None, num_of_monitors=None,
                     is_smartcard_enabled=None, disable_strict_user_chk=None,
@@ -592,6 +606,7 @@ class VMPopupHostTab(page_base.PageObject):
         """ Initial validation - check for some element from the side-tab. """
         self._model.any_host_in_cluster
 
+    @elements.batched
     def fill_values(self, run_on_host=None, migration_mode=None,
                     use_host_cpu=None, cpu_pinning=None):
         """ Fill out given form fields.
@@ -635,6 +650,7 @@ class VMPopupHighAvailTab(page_base.PageObject):
         """ Select high migration priority. """
         self._model.migration_prio = self._model.PRIO_HIGH
 
+    @elements.batched
     def fill_values(self, is_highly_available=None, migration_prio=None,
                     watchdog_model=None, watchdog_action=None):
         """ Fill out given form fields.
@@ -678,6 +694,7 @@ class VMPopupResAllocTab(page_base.PageObject):
         """ Select clone template provisioning. """
         self._model.template_prov_clone.clik()
 
+    @elements.batched
     def fill_values(self, phy_mem_guaranteed=None, template_prov=None):
         """ Fill out given form fields.
 
@@ -709,6 +726,7 @@ class VMPopupBootOptsTab(page_base.PageObject):
         """ Initial validation - check for some element from the side-tab. """
         self._model.boot_dev_1st
 
+    @elements.batched
     def fill_values(self, boot_dev_1st=None, boot_dev_2nd=None,
                     attach_cd=None, kernel_path=None, initrd_path=None,
                     kernel_params=None):
@@ -745,6 +763,7 @@ class VMPopupCustPropsTab(page_base.PageObject):
         """ Initial validation - check for some element from the side-tab. """
         self._model.custom_props
 
+    @elements.batched
     def fill_values(self, custom_props=None):
         """ Fill out given form fields.
 
@@ -769,6 +788,7 @@ class NewTemplateDlg(dialogs.OkCancelDlg):
             """ Page object initial validation. """
             self._model.alias
 
+        @elements.batched
         def fill_values(self, alias=None, target_storage=None):
             """ Set values for template disk. """
             self._model.alias = alias
@@ -777,6 +797,7 @@ class NewTemplateDlg(dialogs.OkCancelDlg):
                     target_storage)
             return self
 
+    @elements.batched
     def fill_values(self, name, description=None, cluster=None, quota=None,
                     is_public=None):
         """ Fill out fields for new VM template (except Disks Allocation part).
@@ -795,6 +816,7 @@ class NewTemplateDlg(dialogs.OkCancelDlg):
         self._model.is_public = is_public
         return self
 
+    @elements.batched
     def fill_values_disk_alloc(self, alias, new_alias=None,
                                target_storage=None):
         """ Fill out values of single disk in Disks Allocation section.
@@ -878,6 +900,7 @@ class EditConsoleOptions(dialogs.OkCancelDlg):
     def _set_html5_invocation(self):
         self._model.html5_console_inv = True
 
+    @elements.batched
     def fill_values(self, console=None, console_inv=None,
                     remap_ctrl_alt_del=None, enable_usb=None,
                     open_in_fullscreen=None, spice_proxy=None,
@@ -998,3 +1021,55 @@ def mk_pool_regex(pool_name):
     regex = regex + '$'
     logger.info("Use pool_name: %s, use regex: %s.", pool_name, regex)
     return regex
+
+
+def wait_for_pool_vm(pool_name, known, active_names, engine=None,
+                     timeout=POOL_VM_TIMEOUT, driver=None):
+    """Wait for a VM handed out by a pool after Run was clicked for the pool.
+    The first new active VM that is not claimed by another test is claimed,
+    see claims module. Several tests can take VMs from one pool in parallel.
+
+    Parameters
+    ----------
+    pool_name : str
+        VMs pool name.
+    known : iterable
+        Names of VMs listed before the click.
+    active_names : callable
+        Returns names of VMs that are up or booting, read from UI.
+    engine : rest.Client
+        Engine client. If set, VMs are polled through REST API instead of
+        UI.
+    timeout : float
+        Timeout in s.
+    driver
+        WebDriver used by active_names; see support.no_implicit_wait().
+
+    Returns
+    -------
+    str
+        VM name.
+
+    Raises
+    ------
+    WaitTimeoutError
+        No new VM in time.
+    """
+    if engine is not None:
+        return engine.wait_for_pool_vm(pool_name, known, timeout).name
+    regex = mk_pool_regex(pool_name)
+    known = set(known)
+
+    def new_vm():
+        for name in sorted(set(active_names()) - known):
+            if re.match(regex, name) and claims.claim(name):
+                logger.info("Found a new active VM from pool %s: %s.",
+                            pool_name, name)
+                return name
+
+    try:
+        return support.wait_until(new_vm, timeout,
+                                  poll_frequency=POOL_VM_POLL, driver=driver)
+    except common.exceptions.TimeoutException:
+        raise excepts.WaitTimeoutError(
+            "No new VM from pool %s in %s s." % (pool_name, timeout))
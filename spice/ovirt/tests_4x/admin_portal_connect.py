@@ -23,14 +23,16 @@ from autotest.client.shared import error
 from spice.lib import act
 from spice.lib import stest
 
-from lib4x import driver
-from lib4x import vms_base
-from lib4x.admin_portal import admin_login
+from spice.ovirt.lib4x import capture
+from spice.ovirt.lib4x import rest
+from spice.ovirt.lib4x import sessions
+from spice.ovirt.lib4x import vms_base
+from spice.ovirt.lib4x.admin_portal import admin_home
+from spice.ovirt.lib4x.admin_portal import admin_login
 
 logger = logging.getLogger(__name__)
 
 
-# pylint: disable=E0602
 @error.context_aware
 def run(vt_test, test_params, env):
     """Steps:
@@ -40,6 +42,8 @@ def run(vt_test, test_params, env):
         - Login as an admin.
         - Connect with remote-viewer to selected VM.
 
+    VM is started and stopped by REST API, only connection is done in UI.
+
     Parameters
     ----------
     vt_test : avocado.core.plugins.vt.VirtTest
@@ -57,40 +61,31 @@ def run(vt_test, test_params, env):
         act.run_selenium(vmi_c, ssn)
         vm_addr = test.vm_c.get_address()
         logger.info("VM addr: %s", vm_addr)
-        act.turn_firewall(vmi_c, "no")  # XXX
         port = test.vm_c.get_port(int(cfg.selenium_port))
         act.info(vmi_c, "Use port to connect to selenium: %s.", port)
-        drv = driver.DriverFactory(cfg.selenium_driver,  # Browser name.
-                                   vm_addr,
-                                   port)
-        drv.maximize_window()   # Maximize web-browser window.
-        login_page = admin_login.AdminLoginPage(drv)
-        home_page = login_page.login_user(username=cfg.ovirt_admin_user,
-                                          password=cfg.ovirt_admin_password,
-                                          domain='internal')
-        tab_controller = home_page.go_to_vms_tab()
-        vm_name = cfg.ovirt_vm_name
-        shutdown_vm = False
-        if vm_name:
-            vm = tab_controller.get_vm(vm_name)
-        elif cfg.ovirt_pool_name:
-            #TODO: vms_tab undefined
-            vm = vms_tab.start_vm_from_pool(cfg.ovirt_pool_name)
-            vm_name = vm.name
-            test.cfg_g.ovirt_vm_name = vm_name
-            shutdown_vm = True
-        if vm.is_down:
-            logger.info("Up VM: %s.", vm_name)
-            vms_tab.run_vm(vm_name)
-            tab_controller.wait_until_vm_starts_booting(vm_name)
-        console_options_dialog = tab_controller.console_edit(vm_name)
-        console_options_dialog.select_spice()
-        console_options_dialog.set_open_in_fullscreen(cfg.full_screen)
-        console_options_dialog.submit_and_wait_to_disappear(timeout=2)
-        tab_controller.console(vm_name)
-        vms_base.GuestAgentIsNotResponsiveDlg.ok_ignore(drv)
-        if shutdown_vm:
-            vms_tab.power_off(vm_name)
-        home_page.sign_out()
-        drv.close()
+        pool = sessions.SessionPool.for_job(vt_test)
+        with pool.session(
+                cfg.selenium_driver, vm_addr, port, cfg.ovirt_admin_user,
+                'admin',
+                login=lambda drv: admin_login.AdminLoginPage(drv).login_user(
+                    username=cfg.ovirt_admin_user,
+                    password=cfg.ovirt_admin_password, domain='internal'),
+                home_page_cls=admin_home.AdminHomePage) as home_page:
+            drv = home_page.driver
+            with capture.recording(drv, vt_test.logdir, cfg.webdriver_capture,
+                                   cfg.webdriver_capture_steps), \
+                    rest.Client.from_cfg(cfg, admin=True) as engine:
+                tab_controller = home_page.go_to_vms_tab()
+                vm_rest, shutdown_vm = engine.prepare_vm(cfg.ovirt_vm_name,
+                                                         cfg.ovirt_pool_name)
+                vm_name = vm_rest.name
+                test.cfg_g.ovirt_vm_name = vm_name
+                console_options_dialog = tab_controller.console_edit(vm_name)
+                console_options_dialog.select_spice()
+                console_options_dialog.set_open_in_fullscreen(cfg.full_screen)
+                console_options_dialog.submit_and_wait_to_disappear(timeout=2)
+                tab_controller.console(vm_name)
+                vms_base.GuestAgentIsNotResponsiveDlg.ok_ignore(drv)
+                if shutdown_vm:
+                    engine.stop_vm(vm_name)
         act.rv_chk_con(vmi_c)  # Check connection on client.
@@ -23,8 +23,9 @@ from autotest.client.shared import error
 from spice.lib import act
 from spice.lib import stest
 
-from lib4x import driver
-from lib4x.admin_portal import admin_login
+from spice.ovirt.lib4x import capture
+from spice.ovirt.lib4x import driver
+from spice.ovirt.lib4x.admin_portal import admin_login
 
 logger = logging.getLogger(__name__)
 
@@ -51,19 +52,20 @@ def run(vt_test, test_params, env):
         act.run_selenium(vmi, ssn)
         vm_addr = test.vm.get_address()
         logger.info("VM addr: %s", vm_addr)
-        act.turn_firewall(vmi, "no")
         port = vmi.vm.get_port(int(cfg.selenium_port))
         act.info(vmi, "Use port to connect to selenium: %s.", port)
         drv = driver.DriverFactory(cfg.selenium_driver,
                                    vm_addr,
                                    port)
         drv.maximize_window()
-        login_page = admin_login.AdminLoginPage(drv)
-        home_page = login_page.login_user(username=cfg.ovirt_admin_user,
-                                          password=cfg.ovirt_admin_password,
-                                          domain='internal')
-        assert cfg.ovirt_vm_name
-        if not vmi.vm.is_up:
-            #TODO: tab_controller undefined
-            tab_controller.run_vm_and_wait_until_up(cfg.ovirt_vm_name)
-        home_page.sign_out()
+        with capture.recording(drv, vt_test.logdir, cfg.webdriver_capture,
+                               cfg.webdriver_capture_steps):
+            login_page = admin_login.AdminLoginPage(drv)
+            home_page = login_page.login_user(
+                username=cfg.ovirt_admin_user,
+                password=cfg.ovirt_admin_password, domain='internal')
+            assert cfg.ovirt_vm_name
+            if not vmi.vm.is_up:
+                #TODO: tab_controller undefined
+                tab_controller.run_vm_and_wait_until_up(cfg.ovirt_vm_name)
+            home_page.sign_out()
@@ -1,9 +1,9 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from lib4x import driver
-from lib4x.user_portal import user_login
-from lib4x import vms_base
+from spice.ovirt.lib4x import driver
+from spice.ovirt.lib4x.user_portal import user_login
+from spice.ovirt.lib4x import vms_base
 
 # Howto run
 # export PYTHONPATH="$PYTHONPATH:$PWD/../"
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Check rest.Client against the local engine stand-in. No engine and no VMs
+are needed.
+
+"""
+
+import os
+import logging
+
+from autotest.client.shared import error
+
+from spice.ovirt.lib4x import rest
+from spice.ovirt.lib4x import claims
+from spice.ovirt.lib4x import rest_standin
+
+logger = logging.getLogger(__name__)
+
+BOOT_TIME = 1
+"""Time in s a stand-in VM is booting."""
+TIMEOUT = 30
+"""Timeout in s of every wait."""
+POLL = 0.2
+"""Poll interval in s."""
+
+
+def check(cond, msg, *args):
+    if not cond:
+        raise error.TestFail(msg % args)
+
+
+@error.context_aware
+def run(vt_test, test_params, env):
+    """Start a VM, wait for it, take a VM from a pool and stop it - all by
+    rest.Client against rest_standin.
+
+    Parameters
+    ----------
+    vt_test : avocado.core.plugins.vt.VirtTest
+        QEMU test object.
+    test_params : virttest.utils_params.Params
+        Dictionary with the test parameters.
+    env : virttest.utils_env.Env
+        Dictionary with test environment.
+
+    """
+    pool = 'pool_??'
+    engine = rest_standin.Engine(boot_time=BOOT_TIME, user='user@profile',
+                                 password='pass')
+    engine.add_vm('vm1')
+    engine.add_pool(pool, size=2)
+    with rest_standin.serve(engine) as url:
+        with rest.Client(url, 'user', 'pass', 'profile') as client:
+            error.context("Start a VM and wait until it is up.", logger.info)
+            client.start_vm('vm1')
+            vm = client.wait_for_status('vm1', (rest.STATUS_BOOTING,
+                                                rest.STATUS_UP),
+                                        TIMEOUT, POLL)
+            check(vm.name == 'vm1', "Wrong VM: %s.", vm.name)
+            addr = client.wait_for_ip('vm1', TIMEOUT, POLL)
+            check(addr, "No IP of vm1.")
+            check(len(engine.sessions) == 1,
+                  "Persistent auth is not used, sessions: %s.",
+                  len(engine.sessions))
+
+            error.context("Cached records are served without a request.",
+                          logger.info)
+            client.vms(max_age=0)
+            requests = engine.requests
+            client.vms()
+            check(engine.requests == requests,
+                  "VMs list is requested again within cache TTL.")
+
+            error.context("Find a VM handed out by a pool.", logger.info)
+            names = [vm.name for vm in client.pool_vms(pool)]
+            pool_id = client.pools()[pool]
+            # The same as Run in user portal: out of the client's view.
+            engine.post('vmpools/%s/allocatevm' % pool_id)
+            vm = client.wait_for_pool_vm(pool, known=(), timeout=TIMEOUT,
+                                         poll_frequency=POLL)
+            check(vm.name in names, "Unknown pool VM: %s.", vm.name)
+            check(os.path.exists(os.path.join(claims.CLAIM_DIR, vm.name)),
+                  "Pool VM %s is not claimed.", vm.name)
+            client.stop_vm(vm.name)
+            check(engine.status(vm.name) == rest.STATUS_DOWN,
+                  "Pool VM %s is not stopped.", vm.name)
+            check(not os.path.exists(os.path.join(claims.CLAIM_DIR,
+                                                  vm.name)),
+                  "Claim of pool VM %s is not released.", vm.name)
+            client.stop_vm('vm1')
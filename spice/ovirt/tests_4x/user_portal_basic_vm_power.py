@@ -23,8 +23,10 @@ from autotest.client.shared import error
 from spice.lib import act
 from spice.lib import stest
 
-from lib4x import driver
-from lib4x.user_portal import user_login
+from spice.ovirt.lib4x import capture
+from spice.ovirt.lib4x import sessions
+from spice.ovirt.lib4x.user_portal import user_home
+from spice.ovirt.lib4x.user_portal import user_login
 
 logger = logging.getLogger(__name__)
 
@@ -50,16 +52,17 @@ def run(vt_test, test_params, env):
         act.run_selenium(vmi, ssn)
         vm_addr = test.vm.get_address()
         logger.info("VM addr: %s", vm_addr)
-        act.turn_firewall(vmi, "no")
-        drv = driver.DriverFactory(cfg.selenium_driver, vm_addr,
-                                   cfg.selenium_port)
-        drv.maximize_window()
-        login_page = user_login.UserLoginPage(drv)
-        home_page = login_page.login_user(username=cfg.ovirt_user,
-                                          password=cfg.ovirt_password,
-                                          domain=cfg.ovirt_profile,
-                                          autoconnect=False)
-        tab_controller = home_page.go_to_basic_tab()
-        tab_controller.run_vm_and_wait_until_up(cfg.ovirt_vm_name,
-                                                timeout=None)
-        home_page.sign_out_user()
+        pool = sessions.SessionPool.for_job(vt_test)
+        with pool.session(
+                cfg.selenium_driver, vm_addr, cfg.selenium_port,
+                cfg.ovirt_user, 'user',
+                login=lambda drv: user_login.UserLoginPage(drv).login_user(
+                    username=cfg.ovirt_user, password=cfg.ovirt_password,
+                    domain=cfg.ovirt_profile, autoconnect=False),
+                home_page_cls=user_home.UserHomePage) as home_page:
+            with capture.recording(home_page.driver, vt_test.logdir,
+                                   cfg.webdriver_capture,
+                                   cfg.webdriver_capture_steps):
+                tab_controller = home_page.go_to_basic_tab()
+                tab_controller.run_vm_and_wait_until_up(cfg.ovirt_vm_name,
+                                                        timeout=None)
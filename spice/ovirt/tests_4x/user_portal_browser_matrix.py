@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+import logging
+
+from autotest.client.shared import error
+
+from spice.lib import act
+from spice.lib import stest
+from spice.lib import utils
+
+from spice.ovirt.lib4x import matrix
+from spice.ovirt.lib4x.user_portal import user_login
+
+logger = logging.getLogger(__name__)
+
+
+@error.context_aware
+def run(vt_test, test_params, env):
+    """Steps:
+
+        - Start SeleniumHQ server on every client VM from matrix_clients.
+        - For every browser from matrix_browsers and every user from
+          matrix_users, concurrently: login to user portal, open basic tab,
+          read VMs list, sign out.
+        - Fail if any cell fails.
+
+    Parameters
+    ----------
+    vt_test : avocado.core.plugins.vt.VirtTest
+        QEMU test object.
+    test_params : virttest.utils_params.Params
+        Dictionary with the test parameters.
+    env : virttest.utils_env.Env
+        Dictionary with test environment.
+
+    """
+    test = stest.SpiceTest(vt_test, test_params, env)
+    cfg = test.cfg
+    servers = []
+    for name in cfg.as_list("matrix_clients") or (cfg.client_vm,):
+        vmi = test.vm_info[name]
+        # Server is detached from the shell, see run_selenium(). The shell
+        # is closed right away, output is not collected.
+        ssn = act.new_ssn(vmi)
+        try:
+            act.run_selenium(vmi, ssn)
+        finally:
+            ssn.close()
+        port = vmi.vm.get_port(vmi.cfg.as_int("selenium_port"))
+        servers.append((vmi.vm.get_address(), port))
+    browsers = cfg.as_list("matrix_browsers") or (cfg.selenium_driver,)
+    users = [tuple(pair.split(':', 1))
+             for pair in cfg.as_list("matrix_users")]
+    users = users or [(cfg.ovirt_user, cfg.ovirt_password)]
+
+    def scenario(drv, cell):
+        login_page = user_login.UserLoginPage(drv)
+        home_page = login_page.login_user(username=cell.user,
+                                          password=cell.password,
+                                          domain=cfg.ovirt_profile,
+                                          autoconnect=False)
+        vms = home_page.go_to_basic_tab().get_vms_names()
+        home_page.sign_out_user()
+        return len(vms)
+
+    results = matrix.run(matrix.cells(browsers, servers, users), scenario,
+                         logdir=vt_test.logdir)
+    failed = matrix.log_results(results)
+    if failed:
+        raise utils.SpiceTestFail(test, "Browser matrix failed: %s." %
+                                  ', '.join(res.cell.label for res in failed))
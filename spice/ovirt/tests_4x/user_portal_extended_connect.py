@@ -23,9 +23,12 @@ from autotest.client.shared import error
 from spice.lib import act
 from spice.lib import stest
 
-from lib4x import driver
-from lib4x import vms_base
-from lib4x.user_portal import user_login
+from spice.ovirt.lib4x import capture
+from spice.ovirt.lib4x import rest
+from spice.ovirt.lib4x import sessions
+from spice.ovirt.lib4x import vms_base
+from spice.ovirt.lib4x.user_portal import user_home
+from spice.ovirt.lib4x.user_portal import user_login
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +43,8 @@ def run(vt_test, test_params, env):
         - Switch to extended tab.
         - Connect with remote-viewer to selected VM.
 
+    VM is started and stopped by REST API, only connection is done in UI.
+
     Parameters
     ----------
     vt_test : avocado.core.plugins.vt.VirtTest
@@ -57,40 +62,32 @@ def run(vt_test, test_params, env):
         act.run_selenium(vmi_c, ssn)
         vm_addr = test.vm_c.get_address()
         logger.info("VM addr: %s", vm_addr)
-        act.turn_firewall(vmi_c, "no")
         port = test.vm_c.get_port(int(cfg.selenium_port))
         act.info(vmi_c, "Use port to connect to selenium: %s.", port)
-        drv = driver.DriverFactory(cfg.selenium_driver,  # Browser name.
-                                   vm_addr,
-                                   port)
-        drv.maximize_window()
-        login_page = user_login.UserLoginPage(drv)
-        home_page = login_page.login_user(username=cfg.ovirt_user,
-                                          password=cfg.ovirt_password,
-                                          domain=cfg.ovirt_profile,
-                                          autoconnect=False)
-        ext_tab = home_page.go_to_extended_tab()
-        vms_tab = ext_tab.go_to_vms_tab()
-        shutdown_vm = False
-        if cfg.ovirt_vm_name:
-            vm = vms_tab.get_vm(cfg.ovirt_vm_name)
-        elif cfg.ovirt_pool_name:
-            vm = vms_tab.start_vm_from_pool(cfg.ovirt_pool_name)
-            shutdown_vm = True
-        if vm.is_down:
-            logger.info("Up VM: %s.", vm.name)
-            vms_tab.run_vm(vm.name)
-            vms_tab.wait_until_vm_starts_booting(vm.name)
-        console_options_dialog = vm.console_edit()
-        console_options_dialog.select_spice()
-        console_options_dialog.set_open_in_fullscreen(cfg.full_screen)
-        console_options_dialog.submit_and_wait_to_disappear(timeout=2)
-        vms_tab.wait_until_vm_is_up(vm.name)
-        vm.console()
-        vms_base.GuestAgentIsNotResponsiveDlg.ok_ignore(drv)
-        logging.info("remote-viewer is supposed now connected.")
-        if shutdown_vm:
-            vms_tab.power_off(vm.name)
-        home_page.sign_out_user()
-        drv.close()
+        pool = sessions.SessionPool.for_job(vt_test)
+        with pool.session(
+                cfg.selenium_driver, vm_addr, port, cfg.ovirt_user, 'user',
+                login=lambda drv: user_login.UserLoginPage(drv).login_user(
+                    username=cfg.ovirt_user, password=cfg.ovirt_password,
+                    domain=cfg.ovirt_profile, autoconnect=False),
+                home_page_cls=user_home.UserHomePage) as home_page:
+            drv = home_page.driver
+            with capture.recording(drv, vt_test.logdir, cfg.webdriver_capture,
+                                   cfg.webdriver_capture_steps), \
+                    rest.Client.from_cfg(cfg) as engine:
+                ext_tab = home_page.go_to_extended_tab()
+                vms_tab = ext_tab.go_to_vms_tab()
+                vm_rest, shutdown_vm = engine.prepare_vm(cfg.ovirt_vm_name,
+                                                         cfg.ovirt_pool_name)
+                vm = vms_tab.get_vm(vm_rest.name)
+                console_options_dialog = vm.console_edit()
+                console_options_dialog.select_spice()
+                console_options_dialog.set_open_in_fullscreen(cfg.full_screen)
+                console_options_dialog.submit_and_wait_to_disappear(timeout=2)
+                engine.wait_for_status(vm.name, rest.STATUS_UP)
+                vm.console()
+                vms_base.GuestAgentIsNotResponsiveDlg.ok_ignore(drv)
+                logging.info("remote-viewer is supposed now connected.")
+                if shutdown_vm:
+                    engine.stop_vm(vm.name)
         act.rv_chk_con(vmi_c)  # Check connection on client.
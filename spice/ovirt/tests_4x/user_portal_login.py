@@ -23,8 +23,9 @@ from autotest.client.shared import error
 from spice.lib import act
 from spice.lib import stest
 
-from lib4x import driver
-from lib4x.user_portal import user_login
+from spice.ovirt.lib4x import capture
+from spice.ovirt.lib4x import driver
+from spice.ovirt.lib4x.user_portal import user_login
 
 logger = logging.getLogger(__name__)
 
@@ -50,15 +51,16 @@ def run(vt_test, test_params, env):
         act.run_selenium(vmi, ssn)
         vm_addr = test.vm.get_address()
         logger.info("VM addr: %s", vm_addr)
-        act.turn_firewall(vmi, "no")
         port = vmi.vm.get_port(int(cfg.selenium_port))
         drv = driver.DriverFactory(cfg.selenium_driver,
                                    vm_addr,
                                    port)
         drv.maximize_window()
-        login_page = user_login.UserLoginPage(drv)
-        home_page = login_page.login_user(username=cfg.ovirt_user,
-                                          password=cfg.ovirt_password,
-                                          domain=cfg.ovirt_profile,
-                                          autoconnect=False)
-        home_page.sign_out_user()
+        with capture.recording(drv, vt_test.logdir, cfg.webdriver_capture,
+                               cfg.webdriver_capture_steps):
+            login_page = user_login.UserLoginPage(drv)
+            home_page = login_page.login_user(username=cfg.ovirt_user,
+                                              password=cfg.ovirt_password,
+                                              domain=cfg.ovirt_profile,
+                                              autoconnect=False)
+            home_page.sign_out_user()
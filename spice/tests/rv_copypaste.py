@@ -83,15 +83,13 @@ def run(vt_test, test_params, env):
         dst_img = os.path.join(act.dst_dir(src), cfg.test_image)
         act.imggen(src, dst_img, cfg.test_image_size)
         act.img2cb(src, dst_img)
-        act.cb2img(src, cfg.dump_img)
+        digest_src = act.cb2digest(src)
         try:
-            act.cb2img(dst, cfg.dump_img)
+            digest_dst = act.cb2digest(dst)
         except aexpect.exceptions.ShellCmdError:
             logger.info('Cannot paste from buffer.')
         else:
-            md5src = act.md5sum(src, cfg.dump_img)
-            md5dst = act.md5sum(dst, cfg.dump_img)
-            if md5src == md5dst:
+            if digest_src == digest_dst:
                 success = True
 
     if cfg.negative and success or not cfg.negative and not success:
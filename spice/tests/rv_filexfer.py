@@ -20,16 +20,124 @@ Funcional only for rhel7 guest now.
 """
 
 import os
+import re
+import json
 import logging
 import aexpect
 
 from spice.lib import stest
 from spice.lib import utils
 from spice.lib import act
+from spice.lib import vmsnap
 
 
 logger = logging.getLogger(__name__)
 
+BENCH_DIR = "xfer_bench"
+"""Directory at client home with generated files for benchmark."""
+BENCH_RESULTS_FILE = "xfer_bench.json"
+"""Where to store benchmark results. Location is test log dir."""
+DIALOG_RE = r"DIALOG (SHOWN|HIDDEN) (\d+\.\d+)"
+"""Progress dialog event printed by helper_xf.py --timeline."""
+GEN_KBPS = 10 * 1024
+"""Slowest expected write rate of generated files, KB/s."""
+
+
+def parse_matrix(matrix):
+    """Parse files matrix.
+
+    Parameters
+    ----------
+    matrix : str
+        Space separated items COUNTxKBYTES, e.g.: "50x16 2x512000".
+
+    Returns
+    -------
+    list
+        Pairs (file name, kbytes).
+
+    """
+    files = []
+    for item in matrix.split():
+        count, kbytes = [int(x) for x in item.lower().split("x")]
+        for _ in range(count):
+            files.append(("xfer_%03d_%dk.bin" % (len(files), kbytes), kbytes))
+    return files
+
+
+def mbps(size, duration):
+    """Transfer rate in MB/s or None if it cannot be computed."""
+    if size is None or not duration or duration <= 0:
+        return None
+    return float(size) / duration / 1024 / 1024
+
+
+def bench(test, dst_script, downloads_g):
+    """Transfer a matrix of files dropped as one multi-selection. Measure
+    per-file and aggregate throughput at guest, and a progress dialog
+    timeline at client. Results are stored as JSON to the test log dir.
+
+    Notes
+    -----
+    Files times are from guest clock, dialog times are from client clock.
+
+    """
+    cfg = test.cfg
+    vmi_c = test.vmi_c
+    vmi_g = test.vmi_g
+    timeout = int(cfg.xfer_timeout)
+    files = parse_matrix(cfg.xfer_bench)
+    bench_dir = os.path.join(act.home_dir(vmi_c), BENCH_DIR)
+    act.run(vmi_c, utils.Cmd("rm", "-rf", bench_dir))
+    act.run(vmi_c, utils.Cmd("mkdir", "-p", bench_dir))
+    for fname, kbytes in files:
+        act.gen_rnd_file(vmi_c, os.path.join(bench_dir, fname), kbytes,
+                         timeout=60 + kbytes // GEN_KBPS)
+    names = [fname for fname, _ in files]
+    cmd = utils.Cmd("nautilus", bench_dir)
+    cmd.append_raw("2>/dev/null &")
+    act.run(vmi_c, cmd)
+    cmd = utils.Cmd(dst_script, "--timeline", str(timeout), *names)
+    watcher = act.xfer_watch_start(vmi_g, downloads_g)
+    try:
+        out = act.run(vmi_c, cmd, timeout=timeout + 60)
+        xfers = act.xfer_watch_wait(vmi_g, watcher, names, timeout=timeout)
+    finally:
+        act.xfer_watch_stop(vmi_g, watcher)
+    results = {"matrix": cfg.xfer_bench, "files": [], "dialog": []}
+    bad = []
+    for fname, kbytes in files:
+        xfer = xfers[fname]
+        if xfer["size"] != kbytes * 1024:
+            bad.append(fname)
+        duration = None
+        if xfer["start"]:
+            duration = xfer["end"] - xfer["start"]
+        results["files"].append({"name": fname,
+                                 "size": xfer["size"],
+                                 "start": xfer["start"],
+                                 "end": xfer["end"],
+                                 "duration": duration,
+                                 "mbps": mbps(xfer["size"], duration)})
+    starts = [x["start"] for x in xfers.values() if x["start"]]
+    total = sum(x["size"] for x in xfers.values())
+    duration = None
+    if starts:
+        duration = max(x["end"] for x in xfers.values()) - min(starts)
+    results["total_bytes"] = total
+    results["duration"] = duration
+    results["aggregate_mbps"] = mbps(total, duration)
+    for state, ev_time in re.findall(DIALOG_RE, out):
+        results["dialog"].append({"state": state, "time": float(ev_time)})
+    logger.info("Transferred %s files, %s bytes, %.3f s, %s MB/s.",
+                len(files), total, duration or 0, results["aggregate_mbps"])
+    with open(os.path.join(test.vt_test.logdir, BENCH_RESULTS_FILE),
+              "w") as fd:
+        json.dump(results, fd, indent=4, sort_keys=True)
+    if bad:
+        raise utils.SpiceTestFail(test, "Files have wrong size: %s." %
+                                  ", ".join(bad))
+
 
 def run(vt_test, test_params, env):
     """Run remote-viewer at client VM.
@@ -50,18 +158,19 @@ def run(vt_test, test_params, env):
     vmi_g = test.vmi_g
     homedir_g = act.home_dir(vmi_g)
     success = False
-    act.turn_accessibility(vmi_c)
+    steps = [("turn_accessibility",)]
     if utils.vm_is_rhel6(test.vm_c):
         # Activate accessibility for rhel6, BZ#1340160 for rhel7
-        act.reset_gui(vmi_c)
+        steps.append(("reset_gui",))
+    # Nautilus cannot be docked to side when default resolution
+    steps.append(("set_resolution", "1280x1024"))
+    if not utils.vm_is_rhel8(test.vm_c):
+        steps.append(("install_rpm", vmi_c.cfg.dogtail_rpm))
+    vmsnap.setup(test, vmi_c, steps)
     act.x_active(vmi_c)
     act.x_active(vmi_g)
     ssn = act.new_ssn(vmi_c)
     act.rv_connect(vmi_c, ssn)
-    # Nautilus cannot be docked to side when default resolution
-    act.set_resolution(vmi_c, "1280x1024")
-    if not utils.vm_is_rhel8(test.vm_c):
-        act.install_rpm(vmi_c, vmi_c.cfg.dogtail_rpm)
     dst_script = act.chk_deps(vmi_c, cfg.helper_c)
     if cfg.locked:
         # enable screen lock
@@ -72,6 +181,11 @@ def run(vt_test, test_params, env):
         cmd = utils.Cmd('loginctl', 'lock-sessions')
         act.run(vmi_g, cmd, admin=True)
         logging.info('Locking gnome session on guest')
+    if cfg.xfer_bench:
+        downloads_g = os.path.join(homedir_g, 'Downloads')
+        act.run(vmi_g, utils.Cmd('mkdir', '-p', downloads_g))
+        bench(test, dst_script, downloads_g)
+        return
     if 'generate' in cfg.test_xfer_file:
         if cfg.copy_img:
             test_xfer_file = 'test.png'
@@ -89,28 +203,37 @@ def run(vt_test, test_params, env):
         cmd = utils.Cmd(dst_script, cfg.xfer_args, test_xfer_file)
     else:
         cmd = utils.Cmd(dst_script, test_xfer_file)
-    logger.info('Sending command to client: %s', cmd)
-    try:
-        act.run(vmi_c, cmd)
-    except aexpect.exceptions.ShellCmdError:
-        logger.info('Cannot transfer a file.')
-        utils.SpiceTestFail(test, "Test failed.")
-    md5src = act.md5sum(vmi_c, test_xfer_file)
+    downloads_g = os.path.join(homedir_g, 'Downloads')
+    act.run(vmi_g, utils.Cmd('mkdir', '-p', downloads_g))
+    watcher = act.xfer_watch_start(vmi_g, downloads_g)
     try:
-        md5dst = act.md5sum(vmi_g, os.path.join(homedir_g, 'Downloads',
-                                                test_xfer_file))
-    except aexpect.exceptions.ShellCmdError:
-        logger.info('File is not transferred.')
-        md5dst = None
-    if md5src == md5dst:
-        logger.info('%s transferred to guest VM', test_xfer_file)
-        cmd1 = utils.Cmd('lsof')
-        cmd2 = utils.Cmd('grep', '-q', '-s', test_xfer_file)
-        cmd = utils.combine(cmd1, '|', cmd2)
-        status, _ = act.rstatus(vmi_g, cmd)
-        if status:
-            logger.info('Transferred file %s is closed.', test_xfer_file)
+        logger.info('Sending command to client: %s', cmd)
+        try:
+            act.run(vmi_c, cmd)
+        except aexpect.exceptions.ShellCmdError:
+            logger.info('Cannot transfer a file.')
+            utils.SpiceTestFail(test, "Test failed.")
+        try:
+            xfer = act.xfer_watch_wait(vmi_g, watcher, [test_xfer_file],
+                                       timeout=int(cfg.xfer_timeout))
+        except utils.SpiceUtilsError as excp:
+            logger.info('File is not transferred: %s', excp)
+            xfer = None
+    finally:
+        act.xfer_watch_stop(vmi_g, watcher)
+    if xfer:
+        xfer = xfer[test_xfer_file]
+        # File is closed: it was reported by IN_CLOSE_WRITE/IN_MOVED_TO.
+        md5src = act.md5sum(vmi_c, test_xfer_file)
+        md5dst = act.md5sum(vmi_g, os.path.join(downloads_g, test_xfer_file))
+        if md5src == md5dst:
+            logger.info('%s transferred to guest VM', test_xfer_file)
             success = True
+        if xfer['start'] and xfer['end'] > xfer['start']:
+            duration = xfer['end'] - xfer['start']
+            logger.info('Transfer of %s bytes took %.3f s: %.2f MB/s.',
+                        xfer['size'], duration,
+                        xfer['size'] / duration / 1024 / 1024)
     elif cfg.xfer_args == '--negative':
         logger.info('File %s was not transferred.', test_xfer_file)
         success = True
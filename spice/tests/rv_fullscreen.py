@@ -20,6 +20,8 @@ will take the resolution of the client.
 import logging
 from spice.lib import act
 from spice.lib import stest
+from spice.lib import utils
+from spice.lib import capture
 
 
 logger = logging.getLogger(__name__)
@@ -51,6 +53,12 @@ def run(vt_test, test_params, env):
         act.rv_chk_con(test.vmi_c)
         res_g = act.get_display_resolution(test.vmi_g)[0]
         res_c = act.get_display_resolution(test.vmi_c)[0]
+        if cfg.display_similarity:
+            sim = capture.compare_displays(test)[0]
+            if sim < float(cfg.display_similarity):
+                raise utils.SpiceTestFail(
+                    test, "Client shows different picture than guest: "
+                    "similarity %.4f < %s." % (sim, cfg.display_similarity))
     logger.info("Target: %s, client: %s, guest: %s.", res_target, res_c, res_g)
     err_info = "Guest res should have adjusted to client, but it hasn't."
     assert res_target == res_c == res_g, err_info
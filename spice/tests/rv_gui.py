@@ -32,6 +32,7 @@ import traceback
 from spice.lib import stest
 from spice.lib import utils
 from spice.lib import act
+from spice.lib import vmsnap
 
 
 logger = logging.getLogger(__name__)
@@ -63,18 +64,19 @@ def run(vt_test, test_params, env):
     # Screen lock is now disabled in kickstart file for source QCOW images of
     # SPICE-QE team (https://gitlab.cee.redhat.com/spiceqe/install-compose/ks).
     # act.lock_scr_off(vmi_c)
-    act.turn_accessibility(vmi_c)
-    act.x_active(vmi_c)
-    act.x_active(vmi_g)
+    steps = [("turn_accessibility",)]
     if utils.vm_is_rhel8(vm_c):
-        act.set_alt_python(vmi_c, "/usr/bin/python3")
+        steps.append(("set_alt_python", "/usr/bin/python3"))
     else:
-        act.install_rpm(vmi_c, test.cfg_c.epel_rpm)
-        act.install_rpm(vmi_c, test.cfg_c.dogtail_rpm)
-        act.install_rpm(vmi_c, "xdotool")
+        steps.append(("install_rpm", test.cfg_c.epel_rpm))
+        steps.append(("install_rpm", test.cfg_c.dogtail_rpm))
+        steps.append(("install_rpm", "xdotool"))
     if utils.vm_is_rhel6(vm_c):
         # Activate accessibility for rhel6
-        act.reset_gui(vmi_c)
+        steps.append(("reset_gui",))
+    vmsnap.setup(test, vmi_c, steps)
+    act.x_active(vmi_c)
+    act.x_active(vmi_g)
 
     # Copy tests to client VM.
     # Some tests could require established RV session, some of them, don't.
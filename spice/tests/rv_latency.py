@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+#
+# See LICENSE for more details.
+
+"""Measure display update latency: time between the guest paints a frame and
+the frame appears in remote-viewer at client.
+
+Guest shows a full-screen marker and toggles its color. Marker script reports
+guest time when the frame is painted. Client frames are grabbed until the new
+color appears in the middle of remote-viewer window. Guest time is converted
+to host time with a clock offset measured before the test.
+
+Results are stored to display_latency.json in the test log dir.
+
+"""
+
+import os
+import json
+import logging
+
+import numpy  # pylint: disable=F0401
+
+from spice.lib import act
+from spice.lib import stest
+from spice.lib import utils
+from spice.lib import capture
+
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 95, 99)
+"""Reported percentiles."""
+PATCH = 16
+"""Side of a region in the middle of remote-viewer window to watch."""
+RESULTS_FILE = "display_latency.json"
+"""Where to store results. Location is test log dir."""
+COMPRESSION_KEYS = ("spice_image_compression",
+                    "spice_jpeg_wan_compression",
+                    "spice_zlib_glz_wan_compression")
+"""Guest options that are reported with results."""
+
+
+def summary(latencies):
+    """Statistics of latency samples.
+
+    Parameters
+    ----------
+    latencies : list
+        Latencies in seconds.
+
+    Returns
+    -------
+    dict
+        Values in milliseconds.
+
+    """
+    if not latencies:
+        return {}
+    arr = numpy.array(latencies) * 1000
+    stats = {"min": float(arr.min()),
+             "max": float(arr.max()),
+             "mean": float(arr.mean())}
+    for perc, val in zip(PERCENTILES, numpy.percentile(arr, PERCENTILES)):
+        stats["p%d" % perc] = float(val)
+    return stats
+
+
+def run(vt_test, test_params, env):
+    """Run remote-viewer at client VM and measure display latency.
+
+    Parameters
+    ----------
+    vt_test : avocado.core.plugins.vt.VirtTest
+        QEMU test object.
+    test_params : virttest.utils_params.Params
+        Dictionary with the test parameters.
+    env : virttest.utils_env.Env
+        Dictionary with test environment.
+
+    """
+    test = stest.ClientGuestTest(vt_test, test_params, env)
+    cfg = test.cfg
+    iterations = int(cfg.latency_iterations or 1000)
+    timeout = float(cfg.latency_timeout or 10)
+    act.x_active(test.vmi_c)
+    act.x_active(test.vmi_g)
+    latencies = []
+    grab_times = []
+    lost = 0
+    with act.new_ssn_context(test.vmi_c, name="Remote Viewer") as ssn:
+        act.rv_connect(test.vmi_c, ssn)
+        act.rv_chk_con(test.vmi_c)
+        marker = act.marker_start(test.vmi_g)
+        try:
+            offset, clock_err = act.marker_clock(test.vmi_g, marker)
+            x, y, width, height = capture.find_rv_window(test.vmi_c)
+            box = (x + (width - PATCH) // 2, y + (height - PATCH) // 2,
+                   PATCH, PATCH)
+            for i in range(iterations):
+                color = (i + 1) % 2
+                rgb = act.marker_set(test.vmi_g, marker, color)
+                try:
+                    seen, grab_time = capture.wait_for_color(
+                        test.vmi_c, box, rgb, timeout)
+                except capture.CaptureError as excp:
+                    logger.info("Iteration %s: %s", i, excp)
+                    lost += 1
+                    seen = None
+                painted = act.marker_painted(test.vmi_g, marker, color)
+                if seen is None:
+                    continue
+                latencies.append(seen - (painted - offset))
+                grab_times.append(grab_time)
+        finally:
+            act.marker_stop(test.vmi_g, marker)
+    results = {
+        "iterations": iterations,
+        "lost": lost,
+        "clock_error_ms": clock_err * 1000,
+        "grab_ms": summary(grab_times),
+        "latency_ms": summary(latencies),
+    }
+    for key in COMPRESSION_KEYS:
+        results[key] = test.cfg_g.get(key, "")
+    logger.info("Display latency: %s", results)
+    with open(os.path.join(vt_test.logdir, RESULTS_FILE), "w") as fd:
+        json.dump(results, fd, indent=4, sort_keys=True)
+    if lost:
+        raise utils.SpiceTestFail(test, "Client did not show %s of %s frames."
+                                  % (lost, iterations))
@@ -32,6 +32,7 @@ import os
 import aexpect
 from virttest import utils_misc
 from virttest import utils_spice
+from spice.lib import vmsnap
 
 
 def deploy_tests_linux(vm, cfg):
@@ -225,4 +226,8 @@ def run_rv_setup(test, params, env):
 
     for vm in params.get("vms").split():
         logging.info("Setting up VM: " + vm)
+        if params.get("vm_snapshot") == "yes":
+            # Snapshots saved before setup would revert it.
+            vmsnap.drop(env.get_vm(vm),
+                        params.get("vm_snapshot_tag", vmsnap.SNAPSHOT_TAG))
         setup_vm(test, params, env, env.get_vm(vm))